@@ -6,30 +6,61 @@ by interpreting natural language queries and converting them into structured fil
 The agent uses LLM for understanding user input and interacts with an MCP client
 for retrieving car data.
 
+langchain and the Ollama client are only imported when the extraction chain is first
+built, which starts in the background as soon as the conversation begins, so the
+agent greets the user without waiting for them.
+
 Dependencies:
     - colorama: For terminal color output
     - dotenv: For environment variable management
-    - langchain: For LLM prompt handling
+    - langchain: For LLM prompt handling (imported lazily)
     - local_ollama: For LLM implementation
+    - scheduler: For prioritized and rate limited LLM calls
     - mcp_client: For car data retrieval
+    - admission: For the server's rejections of overloading searches
+    - recorder: For recording conversation turns for load tests
+    - ranking: For showing the best deals first
 """
 
 import asyncio
 import json
 import re
+import threading
+import time
 
 from colorama import Fore, init
 from dotenv import load_dotenv
-from langchain.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 
-from car_mcp.agent.local_ollama import llm
+from car_mcp import config
+from car_mcp.agent.local_ollama import get_llm
+from car_mcp.agent.recorder import TurnRecorder
+from car_mcp.agent.scheduler import Priority, get_scheduler
+from car_mcp.database import ranking
+from car_mcp.mcp.admission import Rejected
 from car_mcp.mcp.client import MCPClient
 
 init(autoreset=True)
 
 load_dotenv()
 
+EXTRACTION_PROMPT = """
+            Extrai os critérios de busca para automóveis do seguinte texto e se já houver critérios, atualiza-os:
+            Texto do usuário: {user_input}
+            Critérios atuais: {current_filters}
+
+            Responda em formato JSON puro, sem usar blocos de código (sem ```json ou ```), apenas o objeto JSON com os seguintes campos:
+            - new_filters: objeto com os novos filtros identificados (brand, model, year_min, year_max, fuel, price_min, price_max, color, transmission)
+            - need_more_info: booleano indicando se você precisa fazer mais perguntas
+            - next_question: se need_more_info for true, qual pergunta fazer em seguida
+            """
+
+REJECTION_MESSAGES = {
+    "overloaded": "O servidor está ocupado no momento. Tente a busca novamente em instantes.",
+    "rate_limited": "Você fez muitas buscas seguidas. Aguarde um pouco e tente de novo.",
+    "too_expensive": "Essa busca retornaria carros demais. Pode adicionar mais critérios?",
+    "timeout": "A busca demorou demais. Pode adicionar mais critérios?",
+}
+
 
 class VirtualAgent:
     """
@@ -39,8 +70,20 @@ class VirtualAgent:
     interpreting natural language queries and presenting results in a user-friendly format.
     """
 
-    def __init__(self):
+    def __init__(self, scheduler=None):
         self.client = MCPClient()
+        # Shared by default so that all agents together respect Ollama's parallel limit.
+        self.scheduler = scheduler or get_scheduler()
+        # Only a scheduler handed to this agent is its to close; the shared one
+        # keeps serving the other conversations.
+        self._owns_scheduler = scheduler is not None
+        self._chain = None
+        self._chain_lock = threading.Lock()
+        self.recorder = (
+            TurnRecorder(config.AGENT_RECORD_PATH) if config.AGENT_RECORD_PATH else None
+        )
+        self._tool_calls = None
+        self.client.on_tool_call = self._on_tool_call
 
     async def start_loop(self):
         """
@@ -58,19 +101,36 @@ class VirtualAgent:
             f"{Fore.GREEN}Como posso ajudar você hoje? Está procurando algum carro específico?"
         )
 
+        asyncio.get_running_loop().run_in_executor(None, self._warm_up)
+        self.client.start_watching()
+
         filters = {}
         end_loop = False
 
         while not end_loop:
-            user_input = input(f"{Fore.BLUE}Você: ")
+            # Read in a thread so background tasks (warm-up, cache notifications)
+            # keep running while the user types.
+            user_input = await asyncio.to_thread(input, f"{Fore.BLUE}Você: ")
 
             if user_input.lower() in ["sair", "finalizar", "tchau"]:
                 print(f"{Fore.GREEN}Assistente: Foi um prazer ajudar! Até a próxima.")
+                self.client.stop_watching()
+                if self._owns_scheduler:
+                    await self.scheduler.close()
                 break
 
-            new_filters, need_more_info, next_question = self._analyze_entry(
-                user_input, filters
-            )
+            turn_started = time.perf_counter()
+            turn = {"user_input": user_input, "current_filters": dict(filters)}
+            self._tool_calls = turn["tool_calls"] = []
+
+            new_filters, need_more_info, next_question = await self.extract(user_input, filters)
+
+            turn["extraction"] = {
+                "new_filters": new_filters,
+                "need_more_info": need_more_info,
+                "next_question": next_question,
+            }
+            turn["timings"] = {"llm": time.perf_counter() - turn_started}
 
             filters.update(new_filters)
 
@@ -81,13 +141,28 @@ class VirtualAgent:
                 for key, value in filters.items():
                     print(f"{Fore.CYAN} - {key}: {value}")
 
-                mcp_server_response = await self.client.process_query(filters)
+                try:
+                    mcp_server_response, relaxed = await self.client.process_query_relaxed(
+                        filters
+                    )
+                except Rejected as e:
+                    print(f"{Fore.GREEN}Assistente: {REJECTION_MESSAGES[e.reason]}")
+                    self._record_turn(turn, turn_started)
+                    continue
+
+                if mcp_server_response and relaxed:
+                    print(
+                        f"{Fore.GREEN}Assistente: Não encontrei veículos com todos os critérios, então flexibilizei: {', '.join(relaxed)}."
+                    )
 
                 if mcp_server_response:
                     print(
                         f"{Fore.GREEN}Assistente: Encontrei {len(mcp_server_response)} veículos que correspondem à sua busca:"
                     )
-                    for i, car in enumerate(mcp_server_response[:5], 1):
+                    best_deals = ranking.top_k(
+                        mcp_server_response, 5, ranking.resolve_weights()
+                    )
+                    for i, (car, _) in enumerate(best_deals, 1):
                         print(
                             f"{Fore.YELLOW}{i}. {car.brand} {car.model} {car.year} {car.motorization} {car.fuel} - {car.color}"
                         )
@@ -109,6 +184,79 @@ class VirtualAgent:
             elif need_more_info and next_question:
                 print(f"{Fore.GREEN}Assistente: {next_question}")
 
+            self._record_turn(turn, turn_started)
+
+    async def extract(self, user_input, current_filters, priority=Priority.INTERACTIVE):
+        """
+        Extract search criteria from user input through the inference scheduler.
+
+        Args:
+            user_input (str): The user's natural language input
+            current_filters (dict): Currently active search filters
+            priority (Priority, optional): Scheduling priority. Defaults to INTERACTIVE.
+
+        Returns:
+            tuple: New filters, whether more information is needed and the next
+                   question, as returned by `_analyze_entry`.
+        """
+        try:
+            return await self.scheduler.submit(
+                self._analyze_entry, user_input, current_filters, priority=priority
+            )
+        except TimeoutError:
+            return (
+                {},
+                True,
+                "Desculpe, demorei demais para entender sua solicitação. Pode repetir?",
+            )
+
+    def _on_tool_call(self, call):
+        if self._tool_calls is not None:
+            self._tool_calls.append(call)
+
+    def _record_turn(self, turn, started):
+        """
+        Append a finished turn to the conversation log, when recording is enabled.
+
+        Args:
+            turn (dict): The turn's input, extraction, tool calls and LLM timing.
+            started (float): `time.perf_counter()` value at the start of the turn.
+        """
+        self._tool_calls = None
+        if self.recorder is None:
+            return
+
+        turn["timings"]["mcp"] = sum(call["duration"] for call in turn["tool_calls"])
+        turn["timings"]["turn"] = time.perf_counter() - started
+        self.recorder.record(turn, started)
+
+    def _get_chain(self):
+        """
+        Build the LLM extraction chain on first use.
+
+        Returns:
+            Runnable: The prompt | llm | output parser chain.
+        """
+        with self._chain_lock:
+            if self._chain is None:
+                from langchain_core.output_parsers import StrOutputParser
+                from langchain_core.prompts import PromptTemplate
+
+                prompt = PromptTemplate(
+                    template=EXTRACTION_PROMPT,
+                    input_variables=["user_input", "current_filters"]
+                )
+                self._chain = prompt | get_llm() | StrOutputParser()
+
+            return self._chain
+
+    def _warm_up(self):
+        try:
+            self._get_chain()
+        except Exception:
+            # The first turn builds the chain again and reports the error to the user.
+            pass
+
     def _analyze_entry(self, user_input, current_filters):
         """
         Analyze user input to extract car search criteria.
@@ -127,23 +275,7 @@ class VirtualAgent:
                 - str: Next question to ask if more info is needed
         """
         try:
-            prompt_template = """
-            Extrai os critérios de busca para automóveis do seguinte texto e se já houver critérios, atualiza-os:
-            Texto do usuário: {user_input}
-            Critérios atuais: {current_filters}
-
-            Responda em formato JSON puro, sem usar blocos de código (sem ```json ou ```), apenas o objeto JSON com os seguintes campos:
-            - new_filters: objeto com os novos filtros identificados (brand, model, year_min, year_max, fuel, price_min, price_max, color, transmission)
-            - need_more_info: booleano indicando se você precisa fazer mais perguntas
-            - next_question: se need_more_info for true, qual pergunta fazer em seguida
-            """
-
-            prompt = PromptTemplate(
-                template=prompt_template,
-                input_variables=["user_input", "current_filters"]
-            )
-            
-            chain = prompt | llm | StrOutputParser()
+            chain = self._get_chain()
             response = chain.invoke({
                 "user_input": user_input if user_input else "",
                 "current_filters": current_filters if current_filters else ""
@@ -6,24 +6,38 @@ It sets up the model with specific parameters from the config module, including
 temperature, repeat penalty, and timeout settings. The model is configured to stop
 generation at specific tokens to maintain conversation format.
 
+The client is created on the first call to `get_llm`, so importing this module does
+not import langchain_ollama.
+
 Dependencies:
     - config: Local configuration module for Ollama settings
-    - langchain_ollama: For OllamaLLM implementation
+    - langchain_ollama: For OllamaLLM implementation (imported lazily)
 """
 
-from langchain_ollama import OllamaLLM
+from functools import lru_cache
 
 from car_mcp import config
 
-llm = OllamaLLM(
-    model=config.OLLAMA_MODEL,
-    base_url=config.OLLAMA_BASE_URL,
-    temperature=config.OLLAMA_TEMPERATURE,
-    repeat_penalty=config.OLLAMA_REPEAT_PENALTY,
-    timeout=config.OLLAMA_TIMEOUT,
-    stop=[
-        "\n\n",
-        "Human:",
-        "Assistant:",
-    ],
-)
+
+@lru_cache(maxsize=1)
+def get_llm():
+    """
+    Return the shared Ollama LLM client, creating it on first use.
+
+    Returns:
+        langchain_ollama.OllamaLLM: The configured LLM client.
+    """
+    from langchain_ollama import OllamaLLM
+
+    return OllamaLLM(
+        model=config.OLLAMA_MODEL,
+        base_url=config.OLLAMA_BASE_URL,
+        temperature=config.OLLAMA_TEMPERATURE,
+        repeat_penalty=config.OLLAMA_REPEAT_PENALTY,
+        timeout=config.OLLAMA_TIMEOUT,
+        stop=[
+            "\n\n",
+            "Human:",
+            "Assistant:",
+        ],
+    )
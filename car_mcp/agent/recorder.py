@@ -0,0 +1,92 @@
+"""
+Conversation recorder for load testing.
+
+When `config.AGENT_RECORD_PATH` is set, the virtual agent appends one JSON line per
+conversation turn to that file: the user input, the filters before the turn, what
+the LLM extracted, every MCP tool call with its arguments and duration, and the
+time spent in each stage. `scripts/replay.py` replays such logs against an MCP
+server to reproduce production load.
+
+Record format (one JSON object per line):
+    {"session": "3f2a9c1b", "turn": 1, "offset": 12.4, "timestamp": 1760000000.0,
+     "user_input": "...", "current_filters": {...},
+     "extraction": {"new_filters": {...}, "need_more_info": false, "next_question": "..."},
+     "tool_calls": [{"tool": "fetch_data", "arguments": {...}, "duration": 0.031,
+                     "cached": false}],
+     "timings": {"llm": 1.8, "mcp": 0.031, "turn": 1.84}}
+
+`offset` is the number of seconds between the start of the session and the start of
+the turn, so that replays pace turns by when the user sent them.
+
+Dependencies:
+    - json: For the JSONL log
+    - uuid: For session identifiers
+"""
+
+import json
+import threading
+import time
+import uuid
+
+
+class TurnRecorder:
+    """
+    Appends the turns of one conversation to a JSONL log.
+
+    Attributes:
+        path (str): Path of the log file; records are appended.
+        session (str): Identifier of the recorded conversation.
+    """
+
+    def __init__(self, path, session=None):
+        self.path = path
+        self.session = session or uuid.uuid4().hex[:8]
+        self._started = time.perf_counter()
+        self._turns = 0
+        self._lock = threading.Lock()
+
+    def record(self, turn, started=None):
+        """
+        Append a turn to the log.
+
+        Args:
+            turn (dict): The turn fields (user_input, current_filters, extraction,
+                tool_calls, timings); session, turn number and offsets are added.
+            started (float, optional): `time.perf_counter()` value at the start of the
+                turn. Defaults to now.
+        """
+        if started is None:
+            started = time.perf_counter()
+        with self._lock:
+            self._turns += 1
+            line = {
+                "session": self.session,
+                "turn": self._turns,
+                "offset": round(started - self._started, 6),
+                "timestamp": time.time(),
+                **turn,
+            }
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+
+
+def load_sessions(path):
+    """
+    Read a JSONL log and group its turns by conversation.
+
+    Args:
+        path (str): Path of a log written by `TurnRecorder`.
+
+    Returns:
+        dict[str, list[dict]]: The turns of every session, in turn order.
+    """
+    sessions = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                turn = json.loads(line)
+                sessions.setdefault(turn["session"], []).append(turn)
+
+    for turns in sessions.values():
+        turns.sort(key=lambda turn: turn["turn"])
+    return sessions
@@ -0,0 +1,251 @@
+"""
+Inference scheduler module for Ollama requests.
+
+This module provides an asyncio based scheduler that sits between the virtual agents
+and the Ollama LLM. Requests are dispatched in priority order (interactive turns
+before background work) and limited to the number of requests Ollama can process in
+parallel. When the scheduler is idle, the first request waits a small window so that
+requests arriving together are ordered by priority rather than arrival; each request
+is still sent to Ollama as a call of its own. Every call runs with a timeout derived
+from the Ollama configuration, and the time spent waiting in the queue is reported
+separately from the generation time.
+
+The in-flight limit only holds if every caller in the process shares one scheduler,
+returned by `get_scheduler`.
+
+Dependencies:
+    - asyncio: For the dispatch loop and concurrency control
+    - config: Local configuration module for Ollama settings
+"""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from enum import IntEnum
+
+from car_mcp import config
+
+
+_scheduler = None
+
+
+class Priority(IntEnum):
+    """Scheduling priority of an inference request. Lower values run first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class InferenceTiming:
+    """
+    Timing information of a single scheduled inference call.
+
+    Attributes:
+        priority (Priority): The priority the request was submitted with.
+        queue_wait (float): Seconds spent waiting for a free slot.
+        generation (float): Seconds spent running the call itself.
+        timed_out (bool): Whether the call exceeded its timeout.
+    """
+
+    def __init__(self, priority, queue_wait, generation, timed_out=False):
+        self.priority = priority
+        self.queue_wait = queue_wait
+        self.generation = generation
+        self.timed_out = timed_out
+
+    def to_dict(self):
+        """Converts the `InferenceTiming` instance to a dictionary."""
+        return {
+            "priority": self.priority.name.lower(),
+            "queue_wait": self.queue_wait,
+            "generation": self.generation,
+            "timed_out": self.timed_out,
+        }
+
+
+class InferenceScheduler:
+    """
+    Priority scheduler for blocking LLM calls.
+
+    Submitted callables are queued by priority and dispatched to worker threads,
+    never exceeding `max_in_flight` concurrent calls.
+    """
+
+    def __init__(self, max_in_flight=None, batch_window=None, timeout=None, history=100):
+        self._max_in_flight = max_in_flight or config.OLLAMA_NUM_PARALLEL
+        self._batch_window = (
+            batch_window
+            if batch_window is not None
+            else config.OLLAMA_BATCH_WINDOW_MS / 1000
+        )
+        self._timeout = timeout or config.OLLAMA_TIMEOUT
+        self._sequence = itertools.count()
+        self._loop = None
+        self._queue = None
+        self._slots = None
+        self._dispatcher = None
+        self._running = set()
+        self.timings = deque(maxlen=history)
+
+    async def submit(self, func, *args, priority=Priority.INTERACTIVE, timeout=None):
+        """
+        Schedule a blocking call and wait for its result.
+
+        Args:
+            func (callable): The blocking function to run, usually an LLM chain invocation.
+            *args: Positional arguments passed to `func`.
+            priority (Priority, optional): Scheduling priority. Defaults to INTERACTIVE.
+            timeout (float, optional): Timeout in seconds for the call itself.
+                Defaults to `config.OLLAMA_TIMEOUT`.
+
+        Returns:
+            Any: The value returned by `func`.
+
+        Raises:
+            TimeoutError: If the call does not finish within the timeout.
+        """
+        self._ensure_dispatcher()
+        future = asyncio.get_running_loop().create_future()
+        entry = (
+            priority,
+            next(self._sequence),
+            time.perf_counter(),
+            func,
+            args,
+            timeout or self._timeout,
+            future,
+        )
+        self._queue.put_nowait(entry)
+        return await future
+
+    def summary(self):
+        """
+        Summarize the recorded timings.
+
+        Returns:
+            dict: Number of calls, timeouts and the average queue wait and generation
+                  time in seconds.
+        """
+        calls = len(self.timings)
+        return {
+            "calls": calls,
+            "timed_out": sum(1 for timing in self.timings if timing.timed_out),
+            "avg_queue_wait": (
+                sum(timing.queue_wait for timing in self.timings) / calls if calls else 0.0
+            ),
+            "avg_generation": (
+                sum(timing.generation for timing in self.timings) / calls if calls else 0.0
+            ),
+        }
+
+    async def close(self):
+        """
+        Stop the dispatch loop once every queued request has been dispatched.
+
+        Requests already running are left to finish, and requests queued by other
+        callers are not stranded.
+        """
+        if self._dispatcher is not None:
+            if not self._dispatcher.done():
+                await self._queue.join()
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+
+    def _ensure_dispatcher(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queues and semaphores belong to the loop they are used in. Within a loop
+            # they are kept across restarts, so calls still running from before
+            # `close` release their slots to the same semaphore.
+            self._loop = loop
+            self._queue = asyncio.PriorityQueue()
+            self._slots = asyncio.Semaphore(self._max_in_flight)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch_loop())
+
+    async def _dispatch_loop(self):
+        while True:
+            await self._slots.acquire()
+            entry = None
+            dispatched = False
+            try:
+                entry = await self._queue.get()
+
+                if self._batch_window > 0 and self._queue.empty():
+                    # First request after an idle period: give concurrent turns a chance
+                    # to arrive so they are dispatched by priority, not arrival order.
+                    await asyncio.sleep(self._batch_window)
+                    self._queue.put_nowait(entry)
+                    entry = self._queue.get_nowait()
+                    self._queue.task_done()
+
+                task = asyncio.create_task(self._run(entry))
+                dispatched = True
+                self._queue.task_done()
+            finally:
+                if not dispatched:
+                    # Cancelled before the slot was handed to a call: give it back, and
+                    # requeue the request for the next dispatch loop.
+                    self._slots.release()
+                    if entry is not None:
+                        self._queue.put_nowait(entry)
+                        self._queue.task_done()
+
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, entry):
+        priority, _, enqueued_at, func, args, timeout, future = entry
+        started_at = time.perf_counter()
+        work = asyncio.ensure_future(asyncio.to_thread(func, *args))
+
+        try:
+            try:
+                result = await asyncio.wait_for(asyncio.shield(work), timeout)
+            except TimeoutError:
+                self._record(priority, enqueued_at, started_at, timed_out=True)
+                if not future.done():
+                    future.set_exception(
+                        TimeoutError(f"Inference call exceeded {timeout} seconds")
+                    )
+                # Keep the slot until the thread actually finishes so Ollama never
+                # sees more than `max_in_flight` concurrent requests.
+                await asyncio.gather(work, return_exceptions=True)
+            except Exception as e:
+                self._record(priority, enqueued_at, started_at)
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self._record(priority, enqueued_at, started_at)
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def _record(self, priority, enqueued_at, started_at, timed_out=False):
+        self.timings.append(
+            InferenceTiming(
+                priority,
+                queue_wait=started_at - enqueued_at,
+                generation=time.perf_counter() - started_at,
+                timed_out=timed_out,
+            )
+        )
+
+
+def get_scheduler():
+    """
+    Return the scheduler shared by every agent of the process.
+
+    Returns:
+        InferenceScheduler: The process-wide scheduler, created on first use.
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = InferenceScheduler()
+    return _scheduler
@@ -9,6 +9,65 @@ Environment Variables:
     OLLAMA_TEMPERATURE (float): Temperature setting for response generation (default: 0.7)
     OLLAMA_REPEAT_PENALTY (float): Penalty for repeated content (default: 1.1)
     OLLAMA_TIMEOUT (int): Timeout in seconds for Ollama API calls (default: 120)
+    OLLAMA_NUM_PARALLEL (int): Maximum number of in-flight Ollama requests, matching
+        the server's OLLAMA_NUM_PARALLEL setting (default: 4)
+    OLLAMA_BATCH_WINDOW_MS (int): Time window in milliseconds an idle inference scheduler
+        waits so that requests arriving together are dispatched by priority (default: 10)
+    AGENT_RECORD_PATH (str): JSONL file the virtual agent appends every conversation
+        turn to, for replay with scripts/replay.py; empty disables recording (default: empty)
+    DB_URL (str): SQLAlchemy URL of the car database (default: sqlite:///data/cars.db)
+    DB_READ_ONLY (bool): Open the database read-only, immutable and memory-mapped in
+        the MCP server, for use with snapshot ingestion (default: false)
+    DB_SNAPSHOT_MODE (bool): Make ingestion build a new database file and atomically
+        swap it in instead of writing to the live file (default: false)
+    DB_MMAP_SIZE (int): SQLite mmap_size in bytes for read-only connections
+        (default: 268435456)
+    SQL_ECHO (bool): Log every SQL statement issued by SQLAlchemy (default: false)
+    DB_SUMMARIES (bool): Maintain per (brand, fuel, transmission, status) summary
+        tables at insert time and answer covered queries from them (default: false)
+    DB_SUMMARY_TOP_N (int): Number of cheapest car ids kept per summary bucket (default: 20)
+    DB_PARTITIONS (int): Number of SQLite files the catalog is split across by brand
+        hash; DB_URL names the catalog and partition files get a .p<N> suffix
+        (default: 1, a single file)
+    DB_FANOUT_WORKERS (int): Threads used to query partitions in parallel, 0 meaning
+        one per partition (default: 0)
+    MCP_SERVER_URL (str): URL of the MCP server endpoint (default: http://localhost:8000/sse)
+    MCP_TRANSPORT (str): Transport used by the MCP server and client, 'sse' or
+        'streamable-http' (default: sse)
+    MCP_HOST (str): Interface the MCP server binds to (default: 127.0.0.1)
+    MCP_PORT (int): Port the MCP server listens on (default: 8000)
+    MCP_WORKERS (int): Number of uvicorn worker processes for the streamable-http
+        transport (default: 1)
+    MCP_SHUTDOWN_TIMEOUT (int): Seconds in-flight requests are given to finish on
+        shutdown (default: 10)
+    MCP_WIRE_ENCODING (str): Encoding requested for fetch_data payloads, 'json' or
+        'columnar' (default: json)
+    MCP_CACHE_SIZE (int): Number of query results the MCP client keeps in its LRU
+        cache, 0 disabling it (default: 128)
+    MCP_PROFILING (bool): Register the profile_server admin tool, which profiles
+        fetch_data calls on demand (default: false)
+    MCP_PROFILE_DIR (str): Directory profiling results are written to (default: profiles)
+    MCP_VERSION_POLL_INTERVAL (float): Seconds between the MCP server's checks of the
+        inventory version it notifies subscribed clients about (default: 1.0)
+    MCP_MAX_CONCURRENT (int): Tool calls the MCP server runs at the same time, 0 for
+        no limit (default: 8)
+    MCP_MAX_QUEUE (int): Tool calls allowed to wait for a free slot; further calls are
+        shed (default: 32)
+    MCP_QUEUE_TIMEOUT (float): Seconds a tool call may wait for a free slot before it
+        is shed (default: 5.0)
+    MCP_RATE_LIMIT (float): Tool calls per second allowed for each client, identified
+        by its address, 0 for no limit (default: 0)
+    MCP_RATE_BURST (int): Tool calls a client may make in a burst above its rate
+        (default: 20)
+    MCP_TRUSTED_PROXIES (list[str]): Comma-separated addresses of reverse proxies
+        whose X-Client-Id header identifies the client for rate limiting; the header
+        is ignored from any other peer (default: empty)
+    MCP_CALL_TIMEOUT (float): Seconds a tool call's database queries may run before
+        they are interrupted, 0 for no deadline (default: 10.0)
+    MCP_MAX_ROWS (int): Estimated number of cars above which a search is expensive,
+        0 disabling cost checks (default: 10000)
+    MCP_COST_POLICY (str): What happens to expensive searches, 'limit' (return the
+        first MCP_MAX_ROWS cars, flagged as truncated) or 'reject' (default: limit)
 """
 
 import os
@@ -18,5 +77,42 @@ OLLAMA_BASE_URL=os.getenv("OLLAMA_BASE_URL", "")
 OLLAMA_TEMPERATURE=float(os.getenv("OLLAMA_TEMPERATURE", "0.7"))
 OLLAMA_REPEAT_PENALTY=float(os.getenv("OLLAMA_REPEAT_PENALTY", "1.1"))
 OLLAMA_TIMEOUT=int(os.getenv("OLLAMA_TIMEOUT", "120"))
+OLLAMA_NUM_PARALLEL=int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+OLLAMA_BATCH_WINDOW_MS=int(os.getenv("OLLAMA_BATCH_WINDOW_MS", "10"))
+
+AGENT_RECORD_PATH=os.getenv("AGENT_RECORD_PATH", "")
+
+DB_URL=os.getenv("DB_URL", "sqlite:///data/cars.db")
+DB_READ_ONLY=os.getenv("DB_READ_ONLY", "false").lower() == "true"
+DB_SNAPSHOT_MODE=os.getenv("DB_SNAPSHOT_MODE", "false").lower() == "true"
+DB_MMAP_SIZE=int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQL_ECHO=os.getenv("SQL_ECHO", "false").lower() == "true"
+DB_SUMMARIES=os.getenv("DB_SUMMARIES", "false").lower() == "true"
+DB_SUMMARY_TOP_N=int(os.getenv("DB_SUMMARY_TOP_N", "20"))
+DB_PARTITIONS=int(os.getenv("DB_PARTITIONS", "1"))
+DB_FANOUT_WORKERS=int(os.getenv("DB_FANOUT_WORKERS", "0"))
 
 MCP_SERVER_URL=os.getenv("MCP_SERVER_URL", "http://localhost:8000/sse")
+MCP_WIRE_ENCODING=os.getenv("MCP_WIRE_ENCODING", "json")
+MCP_TRANSPORT=os.getenv("MCP_TRANSPORT", "sse")
+MCP_HOST=os.getenv("MCP_HOST", "127.0.0.1")
+MCP_PORT=int(os.getenv("MCP_PORT", "8000"))
+MCP_WORKERS=int(os.getenv("MCP_WORKERS", "1"))
+MCP_SHUTDOWN_TIMEOUT=int(os.getenv("MCP_SHUTDOWN_TIMEOUT", "10"))
+MCP_CACHE_SIZE=int(os.getenv("MCP_CACHE_SIZE", "128"))
+MCP_PROFILING=os.getenv("MCP_PROFILING", "false").lower() == "true"
+MCP_PROFILE_DIR=os.getenv("MCP_PROFILE_DIR", "profiles")
+MCP_VERSION_POLL_INTERVAL=float(os.getenv("MCP_VERSION_POLL_INTERVAL", "1.0"))
+MCP_MAX_CONCURRENT=int(os.getenv("MCP_MAX_CONCURRENT", "8"))
+MCP_MAX_QUEUE=int(os.getenv("MCP_MAX_QUEUE", "32"))
+MCP_QUEUE_TIMEOUT=float(os.getenv("MCP_QUEUE_TIMEOUT", "5.0"))
+MCP_RATE_LIMIT=float(os.getenv("MCP_RATE_LIMIT", "0"))
+MCP_RATE_BURST=int(os.getenv("MCP_RATE_BURST", "20"))
+MCP_TRUSTED_PROXIES=[
+    address.strip()
+    for address in os.getenv("MCP_TRUSTED_PROXIES", "").split(",")
+    if address.strip()
+]
+MCP_CALL_TIMEOUT=float(os.getenv("MCP_CALL_TIMEOUT", "10.0"))
+MCP_MAX_ROWS=int(os.getenv("MCP_MAX_ROWS", "10000"))
+MCP_COST_POLICY=os.getenv("MCP_COST_POLICY", "limit")
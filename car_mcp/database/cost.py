@@ -0,0 +1,177 @@
+"""
+Row count estimation for search filters.
+
+The MCP server uses these estimates to reject or limit searches that would return
+most of the catalog before running them. `TableStats` keeps the number of cars and a
+uniform random sample of them, drawn through the primary key index so gathering it
+costs a few thousand index lookups instead of full table scans. A search is
+estimated by evaluating its filters on the sample, with the same matching rules as
+the SQL conditions, and scaling the matching fraction to the table size; correlated
+filters (a brand and its typical price range) are therefore estimated correctly.
+Tables smaller than the sample are read whole and estimated exactly. Range bounds
+are converted with `float()`, as the relaxation does; a bound that cannot be
+converted leaves the search without an estimate.
+
+Statistics are cached by `DatabaseManager` until the inventory version changes.
+numpy is only imported once statistics are built, so that importing the database
+layer stays fast.
+
+Dependencies:
+    - numpy: For evaluating filters on the sample column by column (imported lazily)
+    - random: For drawing the sample
+    - sqlalchemy: For reading the sample
+    - filters: For the supported filter fields
+    - car: For the Car model
+"""
+
+import random
+
+from sqlalchemy import func, select
+
+from car_mcp.database.filters import RANGE_FIELDS, TEXT_FIELDS, active_filters
+from car_mcp.models.car import Car
+
+SAMPLE_SIZE = 10000
+# Ids looked up per query, below SQLite's bound parameter limit.
+SAMPLE_CHUNK = 900
+
+
+class TableStats:
+    """
+    Number of cars and a random sample of the `car` table used to estimate result sizes.
+
+    Attributes:
+        total (int): Number of cars.
+        size (int): Number of sampled cars.
+    """
+
+    def __init__(self, total, rows):
+        import numpy as np
+
+        self.total = total
+        self.size = len(rows)
+        self._text = {}
+        for position, field in enumerate(TEXT_FIELDS):
+            values, codes = np.unique(
+                [str(row[position]).lower() for row in rows], return_inverse=True
+            )
+            self._text[field] = (values, codes.reshape(-1))
+
+        numeric = np.array(
+            [row[len(TEXT_FIELDS):] for row in rows], dtype=np.float64
+        ).reshape(-1, 2)
+        self._ranges = {"year": numeric[:, 0], "price": numeric[:, 1]}
+
+    @classmethod
+    def collect(cls, session, sample_size=SAMPLE_SIZE, seed=0):
+        """
+        Count the cars and sample the `car` table.
+
+        Args:
+            session (sqlalchemy.orm.Session): Session bound to the database.
+            sample_size (int, optional): Number of cars to sample. Defaults to SAMPLE_SIZE.
+            seed (int, optional): Seed of the sample. Defaults to 0.
+
+        Returns:
+            TableStats: The statistics.
+        """
+        columns = [getattr(Car, field) for field in TEXT_FIELDS] + [Car.year, Car.price]
+        total, low, high = session.execute(
+            select(func.count(Car.id), func.min(Car.id), func.max(Car.id))
+        ).one()
+
+        if total <= sample_size:
+            return cls(total, session.execute(select(*columns)).all())
+
+        # Ids may have gaps; draw proportionally more of them, within reason.
+        span = high - low + 1
+        draws = min(span, sample_size * span // total, 4 * sample_size)
+        ids = random.Random(seed).sample(range(low, high + 1), draws)
+
+        rows = []
+        for start in range(0, len(ids), SAMPLE_CHUNK):
+            chunk = ids[start:start + SAMPLE_CHUNK]
+            rows.extend(session.execute(select(*columns).where(Car.id.in_(chunk))).all())
+        return cls(total, rows)
+
+    def selectivity(self, filters):
+        """
+        Estimate the fraction of cars matching a set of filters.
+
+        Args:
+            filters (dict): Search criteria as accepted by `DatabaseManager.search`.
+
+        Returns:
+            float | None: The fraction of sampled cars matching, between 0 and 1, or None
+                when a range bound is not a number.
+        """
+        filters = active_filters(filters)
+        bounds = {}
+        for name in RANGE_FIELDS:
+            if name in filters:
+                try:
+                    bounds[name] = float(filters[name])
+                except (TypeError, ValueError):
+                    return None
+
+        if not self.size:
+            return 0.0
+
+        import numpy as np
+
+        matching = np.ones(self.size, dtype=bool)
+        for field in TEXT_FIELDS:
+            if field not in filters:
+                continue
+            wanted = filters[field]
+            if not isinstance(wanted, list):
+                wanted = [wanted]
+            wanted = [str(item).lower() for item in wanted]
+
+            values, codes = self._text[field]
+            matches_value = np.array(
+                [any(item in value for item in wanted) for value in values], dtype=bool
+            )
+            matching &= matches_value[codes]
+
+        for name, (column, bound) in RANGE_FIELDS.items():
+            if name not in bounds:
+                continue
+            if bound == "min":
+                matching &= self._ranges[column] >= bounds[name]
+            else:
+                matching &= self._ranges[column] <= bounds[name]
+
+        return float(matching.mean())
+
+    def estimate(self, filters):
+        """
+        Estimate the number of cars matching a set of filters.
+
+        Args:
+            filters (dict): Search criteria as accepted by `DatabaseManager.search`.
+
+        Returns:
+            int | None: The estimated number of matching cars, None when it cannot be
+                estimated.
+        """
+        selectivity = self.selectivity(filters)
+        if selectivity is None:
+            return None
+        return round(self.total * selectivity)
+
+
+def add_estimates(estimates):
+    """
+    Add up row count estimates.
+
+    Args:
+        estimates (Iterable[int | None]): Estimates, None for the unknown ones.
+
+    Returns:
+        int | None: The total, None when any of the estimates is unknown.
+    """
+    estimates = list(estimates)
+    if any(estimate is None for estimate in estimates):
+        return None
+    return sum(estimates)
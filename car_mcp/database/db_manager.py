@@ -4,21 +4,206 @@ Database management module for the car inventory system.
 This module provides database operations for storing and retrieving car information
 using SQLAlchemy ORM. It supports SQLite database operations with logging capabilities.
 
+Engines are shared by every `DatabaseManager` pointing at the same database. In
+read-only mode the SQLite file is opened with `mode=ro&immutable=1` and memory-mapped,
+so readers never take locks. Read-only engines are keyed on the file identity: when a
+new snapshot is atomically swapped in (see snapshot.py), the next `DatabaseManager`
+opens the new file while queries already running finish on the old one.
+
+Queries run inside `query_deadline(seconds)` are interrupted by SQLite once the
+deadline passes: every connection checked out in that context gets a progress
+handler comparing the clock with the deadline, and the interrupted statement is
+reported as `QueryTimeout`. The deadline is a context variable, so it follows the
+work into `asyncio.to_thread` and the partition fan-out.
+
 Dependencies:
     - logging: For SQL query logging
+    - os: For detecting snapshot swaps
+    - sqlite3: For read-only connections
     - sqlalchemy: For database operations
+    - filters: For turning search filters into SQL conditions
+    - summaries: For the optional materialized summaries
+    - relaxation: For zero-result filter relaxation
+    - ranking: For top-k best deal searches
+    - cost: For estimating the number of cars a search returns
     - car: For Car model and Base classes
 """
 
+import contextvars
 import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from functools import lru_cache
 
-from sqlalchemy import and_, create_engine
+from sqlalchemy import and_, create_engine, event, func, literal, select, text, union_all
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
 
+from car_mcp import config
+from car_mcp.database import cost, ranking, relaxation, summaries
+from car_mcp.database.filters import build_conditions
 from car_mcp.models.car import Base, Car
+from car_mcp.models.car_summary import CarSummary
+
+_engines = {}
+_engines_lock = threading.Lock()
+_summaries_ready = weakref.WeakKeyDictionary()
+_table_stats = weakref.WeakKeyDictionary()
+_deadline = contextvars.ContextVar("query_deadline", default=None)
+
+# SQLite limits the number of terms in a compound SELECT (500 by default).
+MAX_UNION_TERMS = 100
+
+# SQLite virtual machine instructions between two deadline checks.
+DEADLINE_CHECK_STEPS = 10000
+
+
+class QueryTimeout(Exception):
+    """Raised when a query is interrupted by the deadline set with `query_deadline`."""
+
+
+@contextmanager
+def query_deadline(seconds):
+    """
+    Interrupt the queries run in the enclosed block after a number of seconds.
+
+    Args:
+        seconds (float): Time allowed from now, 0 or None for no deadline.
+
+    Raises:
+        QueryTimeout: If a query was interrupted because the deadline passed.
+    """
+    deadline = time.monotonic() + seconds if seconds else None
+    token = _deadline.set(deadline)
+    try:
+        yield
+    except OperationalError as e:
+        if deadline is None or "interrupted" not in str(e.orig):
+            raise
+        raise QueryTimeout(f"Query interrupted after {seconds}s") from e
+    finally:
+        _deadline.reset(token)
+
+
+def _apply_deadline(dbapi_connection, connection_record, connection_proxy):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+
+    deadline = _deadline.get()
+    if deadline is None:
+        dbapi_connection.set_progress_handler(None, 0)
+    else:
+        dbapi_connection.set_progress_handler(
+            lambda: time.monotonic() > deadline, DEADLINE_CHECK_STEPS
+        )
+
+
+@lru_cache(maxsize=1)
+def _configure_sql_logging():
+    logging.basicConfig()
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.DEBUG)
+
+
+def _file_identity(path):
+    stat = os.stat(path)
+    return stat.st_dev, stat.st_ino
+
+
+def _create_read_only_engine(path):
+    uri = f"file:{os.path.abspath(path)}?mode=ro&immutable=1"
+    engine = create_engine(
+        "sqlite://",
+        creator=lambda: sqlite3.connect(uri, uri=True, check_same_thread=False),
+        echo=config.SQL_ECHO,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        dbapi_connection.execute(f"PRAGMA mmap_size={int(config.DB_MMAP_SIZE)}")
+
+    return engine
+
+
+def get_engine(db_url, read_only=False):
+    """
+    Return the shared engine for a database, creating it on first use.
+
+    Args:
+        db_url (str): SQLAlchemy database URL.
+        read_only (bool, optional): Open the SQLite file read-only, immutable and
+            memory-mapped. Defaults to False.
+
+    Returns:
+        tuple: The engine and a boolean telling whether it was just created.
+    """
+    if config.SQL_ECHO:
+        _configure_sql_logging()
+
+    identity = _file_identity(make_url(db_url).database) if read_only else None
+    key = (db_url, read_only)
+
+    with _engines_lock:
+        cached = _engines.get(key)
+        if cached is not None and cached[1] == identity:
+            return cached[0], False
+
+        if read_only:
+            engine = _create_read_only_engine(make_url(db_url).database)
+        else:
+            engine = create_engine(db_url, echo=config.SQL_ECHO)
+        event.listen(engine, "checkout", _apply_deadline)
+        _engines[key] = (engine, identity)
+
+    if cached is not None:
+        # A new snapshot was swapped in; idle connections to the old file are closed
+        # and the ones still in use are released when their queries finish.
+        cached[0].dispose()
+
+    return engine, True
+
+
+def dispose_engine(db_url, read_only=False):
+    """
+    Close and forget the shared engine of a database, if there is one.
+
+    Args:
+        db_url (str): SQLAlchemy database URL.
+        read_only (bool, optional): Whether the read-only engine is targeted. Defaults to False.
+    """
+    with _engines_lock:
+        cached = _engines.pop((db_url, read_only), None)
+
+    if cached is not None:
+        cached[0].dispose()
+
 
-logging.basicConfig()
-logging.getLogger("sqlalchemy.engine").setLevel(logging.DEBUG)
+def has_cars(db_url):
+    """
+    Check whether a database holds cars, without creating or modifying anything.
+
+    Unlike `DatabaseManager`, which creates missing files and tables, the file is
+    opened read-only, so a probe against a missing or uninitialized database fails.
+
+    Args:
+        db_url (str): SQLAlchemy URL of the SQLite database.
+
+    Returns:
+        bool: Whether the `car` table has at least one row.
+
+    Raises:
+        sqlite3.Error: If the file cannot be opened or has no `car` table.
+    """
+    uri = f"file:{os.path.abspath(make_url(db_url).database)}?mode=ro"
+    connection = sqlite3.connect(uri, uri=True)
+    try:
+        return bool(connection.execute("SELECT EXISTS (SELECT 1 FROM car)").fetchone()[0])
+    finally:
+        connection.close()
 
 
 class DatabaseManager:
@@ -29,21 +214,55 @@ class DatabaseManager:
     data insertion, searching, and retrieval operations.
     """
 
-    def __init__(self, db_url="sqlite:///data/cars.db"):
-        self._engine = create_engine(db_url, echo=True)
-        Base.metadata.create_all(bind=self._engine)
+    def __init__(self, db_url=None, read_only=False, use_summaries=None):
+        self._db_url = db_url or config.DB_URL
+        self._read_only = read_only
+        self._engine, created = get_engine(self._db_url, read_only)
+        if created and not read_only:
+            Base.metadata.create_all(bind=self._engine)
+            # create_all skips the indexes of tables that already exist.
+            for index in Car.__table__.indexes:
+                index.create(bind=self._engine, checkfirst=True)
         self._session = sessionmaker(bind=self._engine)
+        self._use_summaries = (
+            config.DB_SUMMARIES if use_summaries is None else use_summaries
+        )
+        if self._use_summaries and self._engine not in _summaries_ready:
+            self._prepare_summaries(self.version())
 
     def insert(self, df):
         """
-        Insert car data from a DataFrame into the database.
+        Insert car data from a DataFrame into the database and bump the inventory version.
+
+        When summaries are enabled, the summary buckets touched by the new rows are
+        recomputed afterwards.
 
         Args:
             df (pandas.DataFrame): DataFrame containing car information to be inserted.
         """
         df.to_sql("car", self._engine, if_exists="append", index=False)
+        with self._engine.begin() as connection:
+            version = connection.exec_driver_sql("PRAGMA user_version").scalar()
+            connection.exec_driver_sql(f"PRAGMA user_version = {int(version) + 1}")
+
+        if self._use_summaries:
+            keys = df[list(summaries.SUMMARY_KEY)].astype(object)
+            keys = keys.where(keys.notna(), None)
+            with self._session() as session:
+                version = summaries.refresh_summaries(
+                    session,
+                    config.DB_SUMMARY_TOP_N,
+                    buckets=list(keys.itertuples(index=False, name=None)),
+                )
+            _summaries_ready[self._engine] = (version, True)
+
+    def rebuild_summaries(self):
+        """Recompute every summary bucket from the `car` table."""
+        with self._session() as session:
+            version = summaries.refresh_summaries(session, config.DB_SUMMARY_TOP_N)
+        _summaries_ready[self._engine] = (version, True)
 
-    def search(self, filters):
+    def search(self, filters, limit=None):
         """
         Search for cars based on specified filters.
 
@@ -58,47 +277,339 @@ class DatabaseManager:
                 - year_max: Maximum year (int)
                 - price_min: Minimum price (float)
                 - price_max: Maximum price (float)
+            limit (int, optional): Maximum number of cars to return. Defaults to None,
+                returning every match.
 
         Returns:
             list: List of Car objects matching the search criteria.
         """
-        query = self._session().query(Car)
-
-        conditions = []
-        for campo in ["brand", "model", "fuel", "color", "transmission"]:
-            if campo in filters and filters[campo] is not None:
-                valor = filters[campo]
-                if isinstance(valor, list):
-                    if len(valor) > 0:
-                        or_conditions = []
-                        for item in valor:
-                            or_conditions.append(getattr(Car, campo).ilike(f"%{item}%"))
-                        if or_conditions:
-                            from sqlalchemy import or_
-                            conditions.append(or_(*or_conditions))
-                else:
-                    conditions.append(getattr(Car, campo).ilike(f"%{valor}%"))
-
-        if filters["year_min"] is not None and "year_min" in filters:
-            conditions.append(Car.year >= filters["year_min"])
+        session = self._session()
 
-        if filters["year_max"] is not None and "year_max" in filters:
-            conditions.append(Car.year <= filters["year_max"])
+        if self._summaries_available():
+            resultados = summaries.search_from_summaries(session, filters)
+            if resultados is not None:
+                session.close()
+                return resultados[:limit]
 
-        if filters["price_min"] is not None and "price_min" in filters:
-            conditions.append(Car.price >= filters["price_min"])
-
-        if filters["price_max"] is not None and "price_max" in filters:
-            conditions.append(Car.price <= filters["price_max"])
+        query = session.query(Car)
 
+        conditions = build_conditions(filters)
         if conditions:
             query = query.filter(and_(*conditions))
+        if limit is not None:
+            query = query.limit(limit)
 
         resultados = query.all()
-        self._session().close()
+        session.close()
 
         return resultados
 
+    def search_many(self, filters_list):
+        """
+        Run several searches at once over a single connection.
+
+        Each filter set becomes one branch of a UNION ALL tagged with its index, and
+        the cars are loaded by joining on it, so a car matched by several filter sets
+        is only loaded once.
+
+        Args:
+            filters_list (list[dict]): Search criteria as accepted by `search`; None
+                matches every car, like an empty dictionary.
+
+        Returns:
+            dict: Lists of Car objects keyed by the index of their filter set. Cars
+                  shared by several result sets are the same objects.
+        """
+        filters_list = [filters or {} for filters in filters_list]
+        results = {index: [] for index in range(len(filters_list))}
+
+        with self._session() as session:
+            for start in range(0, len(filters_list), MAX_UNION_TERMS):
+                branches = []
+                for index in range(start, min(start + MAX_UNION_TERMS, len(filters_list))):
+                    branch = select(Car.id.label("car_id"), literal(index).label("request"))
+                    conditions = build_conditions(filters_list[index])
+                    if conditions:
+                        branch = branch.where(and_(*conditions))
+                    branches.append(branch)
+
+                tagged = union_all(*branches).subquery()
+                rows = session.execute(
+                    select(Car, tagged.c.request)
+                    .join(tagged, Car.id == tagged.c.car_id)
+                    .order_by(tagged.c.request)
+                ).all()
+
+                for car, request in rows:
+                    results[request].append(car)
+
+        return results
+
+    def search_relaxed(self, filters, limit=None):
+        """
+        Search for cars, relaxing the filters if nothing matches them exactly.
+
+        The original filters and their relaxed versions (wider price and year ranges,
+        then no color, then no transmission) are evaluated in a single SQL statement.
+
+        Args:
+            filters (dict): Search criteria as accepted by `search`.
+            limit (int, optional): Maximum number of cars to return. Defaults to None.
+
+        Returns:
+            tuple: The list of Car objects of the closest non-empty candidate and the
+                   list of relaxed constraint names (empty if no relaxation was needed).
+        """
+        with self._session() as session:
+            return relaxation.search_relaxed(session, filters, limit=limit)
+
+    def relaxation_level(self, filters):
+        """
+        Find how far the filters must be relaxed before they match a car.
+
+        Args:
+            filters (dict): Search criteria as accepted by `search`.
+
+        Returns:
+            int | None: Index of the closest matching candidate in
+                        `relaxation.relaxation_candidates(filters)`, None if none matches.
+        """
+        with self._session() as session:
+            return relaxation.closest_level(session, filters)
+
+    def search_ranked(self, filters, k=5, ranking_name=ranking.DEFAULT_RANKING, weights=None):
+        """
+        Search for the best deals among the cars matching the filters.
+
+        Cars are scored by a weighted sum of price, mileage, age and missing equipment
+        and only the k best are loaded, using `ORDER BY ... LIMIT` in SQLite.
+
+        Args:
+            filters (dict): Search criteria as accepted by `search`.
+            k (int, optional): Number of cars to return. Defaults to 5.
+            ranking_name (str, optional): Named ranking, 'best_value' (default) or 'cheapest'.
+            weights (dict, optional): Score weights overriding the ones of the ranking.
+
+        Returns:
+            list[tuple]: (Car, score) pairs, best deal (lowest score) first.
+
+        Raises:
+            ValueError: If the ranking or a weighted score term is unknown, or k is below 1.
+        """
+        ranking.check_k(k)
+        weights = ranking.resolve_weights(ranking_name, weights)
+        with self._session() as session:
+            return ranking.search_ranked(session, filters, k, weights)
+
+    def facets(self, filters):
+        """
+        Summarize the cars matching the filters per (brand, fuel, transmission, status).
+
+        Covered filters (brand, fuel, transmission and price) are answered from the
+        summary table when summaries are enabled; otherwise the `car` table is aggregated.
+
+        Args:
+            filters (dict): Search criteria as accepted by `search`.
+
+        Returns:
+            dict: 'buckets' with one dictionary per bucket (count, min/max/percentile
+                  prices and the cheapest car ids) and 'source', either 'summary' or 'base'.
+        """
+        with self._session() as session:
+            if self._summaries_available():
+                buckets = summaries.facets_from_summaries(session, filters)
+                if buckets is not None:
+                    return {"source": "summary", "buckets": buckets}
+
+            query = session.query(
+                Car.brand, Car.fuel, Car.transmission, Car.status, Car.id, Car.price
+            )
+            conditions = build_conditions(filters)
+            if conditions:
+                query = query.filter(and_(*conditions))
+
+            return {
+                "source": "base",
+                "buckets": summaries.summarize(query.all(), config.DB_SUMMARY_TOP_N),
+            }
+
+    def estimate_rows(self, filters):
+        """
+        Estimate the number of cars a search would return, without running it.
+
+        The statistics of the database are gathered on first use and again after
+        every change of the inventory version.
+
+        Args:
+            filters (dict): Search criteria as accepted by `search`.
+
+        Returns:
+            int | None: The estimated number of matching cars, None when a range bound
+                is not a number.
+        """
+        return self._table_stats().estimate(filters)
+
+    def estimate_many(self, filter_sets):
+        """
+        Estimate the number of cars each of several searches would return.
+
+        The statistics are looked up once for all the searches.
+
+        Args:
+            filter_sets (list[dict]): Search criteria as accepted by `search`.
+
+        Returns:
+            list[int | None]: The estimated number of matching cars of each search, in
+                order; None for the searches that cannot be estimated.
+        """
+        stats = self._table_stats()
+        return [stats.estimate(filters) for filters in filter_sets]
+
+    def _table_stats(self):
+        version = self.version()
+        cached = _table_stats.get(self._engine)
+        if cached is None or cached[0] != version:
+            with self._session() as session:
+                cached = (version, cost.TableStats.collect(session))
+            _table_stats[self._engine] = cached
+        return cached[1]
+
+    def _summaries_available(self):
+        if not self._use_summaries:
+            return False
+
+        version = self.version()
+        checked = _summaries_ready.get(self._engine)
+        if checked is None or checked[0] != version:
+            # Cars were written without maintaining the summaries.
+            self._prepare_summaries(version)
+        return _summaries_ready[self._engine][1]
+
+    def _prepare_summaries(self, version):
+        legacy = False
+        with self._session() as session:
+            has_cars = session.query(Car.id).first() is not None
+            try:
+                summarized = summaries.summarized_version(session)
+            except OperationalError:
+                legacy, summarized = True, None
+
+        if summarized == version or (summarized is None and not has_cars and not legacy):
+            _summaries_ready[self._engine] = (version, True)
+            return
+        if self._read_only:
+            logging.getLogger(__name__).warning(
+                "Summary table is missing or stale in a read-only database; "
+                "searching the car table."
+            )
+            _summaries_ready[self._engine] = (version, False)
+            return
+
+        if legacy:
+            CarSummary.__table__.drop(bind=self._engine)
+            CarSummary.__table__.create(bind=self._engine)
+        self.rebuild_summaries()
+
+    def ping(self):
+        """
+        Check that the database can be reached.
+
+        Raises:
+            sqlalchemy.exc.SQLAlchemyError: If a connection cannot be established.
+        """
+        with self._engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    def fetch_columns(self, columns, after_id=0):
+        """
+        Read raw column values of the cars inserted after a given id.
+
+        Args:
+            columns (Iterable[str]): Names of the `car` columns to read.
+            after_id (int, optional): Only cars with a greater id are read. Defaults to 0.
+
+        Returns:
+            dict: A list of values per column, ordered by car id.
+        """
+        columns = tuple(columns)
+        with self._session() as session:
+            rows = session.execute(
+                select(*[getattr(Car, column) for column in columns])
+                .where(Car.id > after_id)
+                .order_by(Car.id)
+            ).all()
+
+        values = list(zip(*rows)) if rows else [()] * len(columns)
+        return {column: list(value) for column, value in zip(columns, values)}
+
+    def get_cars(self, ids):
+        """
+        Retrieve cars by id, in the order the ids are given.
+
+        Args:
+            ids (Iterable[int]): Ids of the cars to retrieve.
+
+        Returns:
+            list: Car objects for the ids that exist.
+        """
+        ids = list(ids)
+        with self._session() as session:
+            cars = {car.id: car for car in session.query(Car).filter(Car.id.in_(ids)).all()}
+        return [cars[car_id] for car_id in ids if car_id in cars]
+
+    def version(self):
+        """
+        Return the inventory version, bumped by every insert.
+
+        The version is kept in SQLite's `user_version` header field, so it is shared
+        by every process and carried over by snapshots.
+
+        Returns:
+            int: The inventory version, 0 for a database nothing was inserted into.
+        """
+        with self._engine.connect() as connection:
+            return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+    def source(self):
+        """
+        Identify the database file currently read.
+
+        Returns:
+            tuple: The device and inode of the SQLite file, which change when a new
+                snapshot is swapped in.
+        """
+        return _file_identity(make_url(self._db_url).database)
+
+    def max_id(self):
+        """
+        Return the highest car id in the database.
+
+        Returns:
+            int: The highest id, or 0 when the database is empty.
+        """
+        with self._session() as session:
+            return session.execute(select(func.max(Car.id))).scalar() or 0
+
+    def brands(self):
+        """
+        List the distinct brands in the database.
+
+        Returns:
+            set[str]: The brands of the stored cars.
+        """
+        with self._session() as session:
+            return set(session.execute(select(Car.brand).distinct()).scalars())
+
+    def count(self):
+        """
+        Count the cars in the database.
+
+        Returns:
+            int: Number of rows in the `car` table.
+        """
+        with self._session() as session:
+            return session.query(Car).count()
+
     def get_all_cars(self):
         """
         Retrieve all cars from the database.
@@ -106,6 +617,5 @@ class DatabaseManager:
         Returns:
             list: List of all Car objects in the database.
         """
-        cars = self._session().query(Car).all()
-        self._session().close()
-        return cars
+        with self._session() as session:
+            return session.query(Car).all()
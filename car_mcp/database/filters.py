@@ -0,0 +1,82 @@
+"""
+Search filter helpers for the car inventory system.
+
+This module turns the filter dictionaries produced by the virtual agent into
+SQLAlchemy conditions, so every query path (plain search, summaries, ...) applies
+exactly the same matching rules.
+
+Dependencies:
+    - sqlalchemy: For building the SQL conditions
+    - car: For the Car model
+"""
+
+from sqlalchemy import or_
+
+from car_mcp.models.car import Car
+
+TEXT_FIELDS = ("brand", "model", "fuel", "color", "transmission")
+RANGE_FIELDS = {
+    "year_min": ("year", "min"),
+    "year_max": ("year", "max"),
+    "price_min": ("price", "min"),
+    "price_max": ("price", "max"),
+}
+
+
+def active_filters(filters):
+    """
+    Keep only the supported filters that actually constrain the search.
+
+    Args:
+        filters (dict): Search criteria as accepted by `DatabaseManager.search`.
+
+    Returns:
+        dict: The filters whose value is neither None nor an empty list.
+    """
+    return {
+        campo: valor
+        for campo, valor in filters.items()
+        if (campo in TEXT_FIELDS or campo in RANGE_FIELDS)
+        and valor is not None
+        and valor != []
+    }
+
+
+def build_conditions(filters, model=Car, text_fields=TEXT_FIELDS, range_fields=RANGE_FIELDS):
+    """
+    Build the SQL conditions for a set of search filters.
+
+    Text fields match case-insensitively on substrings; a list of values matches any
+    of them. Range fields are inclusive bounds.
+
+    Args:
+        filters (dict): Search criteria as accepted by `DatabaseManager.search`.
+        model (type, optional): Mapped class the columns are taken from. Defaults to Car.
+        text_fields (tuple, optional): Text filters to apply. Defaults to TEXT_FIELDS.
+        range_fields (dict, optional): Range filters to apply. Defaults to RANGE_FIELDS.
+
+    Returns:
+        list: SQLAlchemy conditions to be combined with AND.
+    """
+    conditions = []
+    for campo in text_fields:
+        valor = filters.get(campo)
+        if valor is None:
+            continue
+        if isinstance(valor, list):
+            if len(valor) > 0:
+                conditions.append(
+                    or_(*[getattr(model, campo).ilike(f"%{item}%") for item in valor])
+                )
+        else:
+            conditions.append(getattr(model, campo).ilike(f"%{valor}%"))
+
+    for campo, (column, bound) in range_fields.items():
+        if filters.get(campo) is None:
+            continue
+        if bound == "min":
+            conditions.append(getattr(model, column) >= filters[campo])
+        else:
+            conditions.append(getattr(model, column) <= filters[campo])
+
+    return conditions
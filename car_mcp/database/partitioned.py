@@ -0,0 +1,445 @@
+"""
+Partitioned storage for the car inventory system.
+
+`PartitionedCatalog` splits the catalog across several SQLite files, each managed by
+its own `DatabaseManager`. Cars are routed to a partition by a stable hash of their
+brand, so every (brand, fuel, transmission, status) summary bucket lives in a single
+partition and facets can simply be concatenated.
+
+Queries fan out to the partitions in parallel on a shared thread pool (sqlite3
+releases the GIL while a statement runs) with the filters, and the LIMIT of ranked
+queries, pushed down to every partition. Ordered results are combined with a k-way
+merge. Brand filters match substrings, so a partition is skipped only when none of
+its brands matches the filter; the brands of each partition are cached until its
+file changes.
+
+Car ids are assigned by the catalog at insert time, so they are unique and
+increasing across partitions. Partition queries run in a copy of the caller's
+context, so a `query_deadline` set by the caller applies to them.
+
+Dependencies:
+    - concurrent.futures: For the fan-out thread pool
+    - contextvars: For running partition queries in the caller's context
+    - heapq: For merging ordered partition results
+    - zlib: For the stable brand hash
+    - sqlalchemy: For deriving the partition URLs
+    - db_manager: For the operations on each partition
+    - relaxation, ranking: For combining relaxed and ranked searches
+    - cost: For adding up the estimates of the partitions
+"""
+
+import contextvars
+import heapq
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.engine import make_url
+
+from car_mcp import config
+from car_mcp.database import cost, ranking, relaxation
+from car_mcp.database.db_manager import DatabaseManager
+
+_executors = {}
+_executors_lock = threading.Lock()
+_brand_directory = {}
+_brand_directory_lock = threading.Lock()
+
+
+def partition_urls(db_url, partitions):
+    """
+    Derive the URL of every partition file from the catalog URL.
+
+    Args:
+        db_url (str): SQLAlchemy URL of the catalog, e.g. sqlite:///data/cars.db.
+        partitions (int): Number of partitions.
+
+    Returns:
+        list[str]: One URL per partition, e.g. sqlite:///data/cars.p0.db.
+    """
+    url = make_url(db_url)
+    root, extension = os.path.splitext(url.database)
+    return [
+        url.set(database=f"{root}.p{partition}{extension}").render_as_string(
+            hide_password=False
+        )
+        for partition in range(partitions)
+    ]
+
+
+def partition_of(brand, partitions):
+    """
+    Return the partition a brand is stored in.
+
+    Args:
+        brand (str): The car brand.
+        partitions (int): Number of partitions.
+
+    Returns:
+        int: The partition index, stable across processes and runs.
+    """
+    return zlib.crc32(brand.strip().lower().encode("utf-8")) % partitions
+
+
+def _executor(workers):
+    with _executors_lock:
+        if workers not in _executors:
+            _executors[workers] = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="car-partition"
+            )
+        return _executors[workers]
+
+
+def _in_context(call):
+    # Every call gets its own copy: a context cannot be entered by two threads at once.
+    context = contextvars.copy_context()
+    return lambda *args: context.copy().run(call, *args)
+
+
+class PartitionedCatalog:
+    """
+    Manages a car catalog split across several SQLite files.
+
+    Exposes the query methods of `DatabaseManager`, answering each one by fanning
+    out to the partitions and merging their results.
+
+    Attributes:
+        partitions (list[DatabaseManager]): The manager of every partition.
+    """
+
+    def __init__(self, db_url=None, partitions=None, read_only=False, use_summaries=None):
+        self._urls = partition_urls(db_url or config.DB_URL, partitions or config.DB_PARTITIONS)
+        self.partitions = [
+            DatabaseManager(url, read_only=read_only, use_summaries=use_summaries)
+            for url in self._urls
+        ]
+        self._pool = _executor(config.DB_FANOUT_WORKERS or len(self.partitions))
+
+    def split(self, df):
+        """
+        Assign catalog-wide ids to new cars and group them by partition.
+
+        Args:
+            df (pandas.DataFrame): DataFrame containing car information.
+
+        Returns:
+            list[tuple]: (partition URL, DataFrame) pairs for the partitions receiving cars.
+        """
+        df = df.copy()
+        if "id" not in df.columns:
+            start = max(self._fan_out(lambda partition: partition.max_id())) + 1
+            df.insert(0, "id", range(start, start + len(df)))
+
+        routes = df["brand"].map(lambda brand: partition_of(brand, len(self.partitions)))
+        return [(self._urls[index], part) for index, part in df.groupby(routes, sort=True)]
+
+    def insert(self, df):
+        """
+        Insert car data from a DataFrame, routing every car to its brand's partition.
+
+        Args:
+            df (pandas.DataFrame): DataFrame containing car information to be inserted.
+        """
+        managers = dict(zip(self._urls, self.partitions))
+        for url, part in self.split(df):
+            managers[url].insert(part)
+
+    def rebuild_summaries(self):
+        """Recompute the summary buckets of every partition."""
+        self._fan_out(lambda partition: partition.rebuild_summaries())
+
+    def search(self, filters, limit=None):
+        """
+        Search every partition that can hold matching cars.
+
+        Args:
+            filters (dict): Search criteria as accepted by `DatabaseManager.search`.
+            limit (int, optional): Maximum number of cars to return, pushed down to
+                every partition. Defaults to None.
+
+        Returns:
+            list: Car objects matching the search criteria.
+        """
+        results = self._fan_out(lambda partition: partition.search(filters, limit), filters)
+        return [car for result in results for car in result][:limit]
+
+    def search_many(self, filters_list):
+        """
+        Run several searches at once, sending each partition only the filter sets it
+        can match.
+
+        Args:
+            filters_list (list[dict]): Search criteria as accepted by `search`; None
+                matches every car, like an empty dictionary.
+
+        Returns:
+            dict: Lists of Car objects keyed by the index of their filter set.
+        """
+        filters_list = [filters or {} for filters in filters_list]
+        routed = [
+            [
+                index
+                for index, filters in enumerate(filters_list)
+                if self._may_match(shard, filters)
+            ]
+            for shard in range(len(self.partitions))
+        ]
+
+        def _search(partition, indexes):
+            found = partition.search_many([filters_list[index] for index in indexes])
+            return {indexes[position]: cars for position, cars in found.items()}
+
+        futures = [
+            self._pool.submit(_in_context(_search), partition, indexes)
+            for partition, indexes in zip(self.partitions, routed)
+            if indexes
+        ]
+        results = {index: [] for index in range(len(filters_list))}
+        for future in futures:
+            for index, cars in future.result().items():
+                results[index].extend(cars)
+        return results
+
+    def search_relaxed(self, filters, limit=None):
+        """
+        Search with the closest relaxed filters that match a car in any partition.
+
+        Every partition first reports the closest candidate it matches; the cars of
+        the overall closest candidate are then loaded from the partitions matching it.
+
+        Args:
+            filters (dict): Search criteria as accepted by `search`.
+            limit (int, optional): Maximum number of cars to return. Defaults to None.
+
+        Returns:
+            tuple: The list of Car objects and the list of relaxed constraint names.
+        """
+        candidates = relaxation.relaxation_candidates(filters)
+        partitions = self._pruned(filters)
+        levels = list(
+            self._pool.map(
+                _in_context(lambda partition: partition.relaxation_level(filters)), partitions
+            )
+        )
+
+        found = [level for level in levels if level is not None]
+        if not found:
+            return [], []
+
+        closest = min(found)
+        matching = [partition for partition, level in zip(partitions, levels) if level == closest]
+        candidate, relaxed = candidates[closest]
+        results = self._pool.map(
+            _in_context(lambda partition: partition.search(candidate, limit)), matching
+        )
+        return [car for result in results for car in result][:limit], relaxed
+
+    def search_ranked(self, filters, k=5, ranking_name=ranking.DEFAULT_RANKING, weights=None):
+        """
+        Search for the best deals, keeping the k best of every partition and merging them.
+
+        Args:
+            filters (dict): Search criteria as accepted by `search`.
+            k (int, optional): Number of cars to return. Defaults to 5.
+            ranking_name (str, optional): Named ranking, 'best_value' (default) or 'cheapest'.
+            weights (dict, optional): Score weights overriding the ones of the ranking.
+
+        Returns:
+            list[tuple]: (Car, score) pairs, best deal first.
+
+        Raises:
+            ValueError: If the ranking or a weighted score term is unknown, or k is below 1.
+        """
+        ranking.check_k(k)
+        ranking.resolve_weights(ranking_name, weights)
+        results = self._fan_out(
+            lambda partition: partition.search_ranked(filters, k, ranking_name, weights), filters
+        )
+        merged = heapq.merge(*results, key=lambda ranked: (ranked[1], ranked[0].id))
+        return list(merged)[:k]
+
+    def facets(self, filters):
+        """
+        Summarize the matching cars per bucket; every bucket lives in one partition.
+
+        Args:
+            filters (dict): Search criteria as accepted by `search`.
+
+        Returns:
+            dict: 'buckets' of every partition and 'source', 'summary' only when every
+                  partition answered from its summaries.
+        """
+        results = self._fan_out(lambda partition: partition.facets(filters), filters)
+        sources = {result["source"] for result in results}
+        return {
+            "source": "summary" if sources == {"summary"} else "base",
+            "buckets": [bucket for result in results for bucket in result["buckets"]],
+        }
+
+    def fetch_columns(self, columns, after_id=0):
+        """
+        Read raw column values of the cars inserted after a given id, in id order.
+
+        Args:
+            columns (Iterable[str]): Names of the `car` columns to read; must include 'id'.
+            after_id (int, optional): Only cars with a greater id are read. Defaults to 0.
+
+        Returns:
+            dict: A list of values per column, ordered by car id.
+        """
+        columns = tuple(columns)
+        results = self._fan_out(lambda partition: partition.fetch_columns(columns, after_id))
+        rows = heapq.merge(
+            *[zip(*(result[column] for column in columns)) for result in results],
+            key=lambda row: row[columns.index("id")],
+        )
+        values = list(zip(*rows)) or [()] * len(columns)
+        return {column: list(value) for column, value in zip(columns, values)}
+
+    def get_cars(self, ids):
+        """
+        Retrieve cars by id, in the order the ids are given.
+
+        Args:
+            ids (Iterable[int]): Ids of the cars to retrieve.
+
+        Returns:
+            list: Car objects for the ids that exist.
+        """
+        ids = list(ids)
+        results = self._fan_out(lambda partition: partition.get_cars(ids))
+        cars = {car.id: car for result in results for car in result}
+        return [cars[car_id] for car_id in ids if car_id in cars]
+
+    def estimate_rows(self, filters):
+        """
+        Estimate the number of cars a search would return, without running it.
+
+        Args:
+            filters (dict): Search criteria as accepted by `search`.
+
+        Returns:
+            int | None: The sum of the estimates of the partitions that can hold matching
+                cars, None when a range bound is not a number.
+        """
+        return cost.add_estimates(
+            self._fan_out(lambda partition: partition.estimate_rows(filters), filters)
+        )
+
+    def estimate_many(self, filter_sets):
+        """
+        Estimate the number of cars each of several searches would return.
+
+        Every partition is visited once for all the searches.
+
+        Args:
+            filter_sets (list[dict]): Search criteria as accepted by `search`.
+
+        Returns:
+            list[int | None]: The estimated number of matching cars of each search, in
+                order; None for the searches that cannot be estimated.
+        """
+        per_partition = self._fan_out(lambda partition: partition.estimate_many(filter_sets))
+        return [cost.add_estimates(estimates) for estimates in zip(*per_partition)]
+
+    def ping(self):
+        """
+        Check that every partition can be reached.
+
+        Raises:
+            sqlalchemy.exc.SQLAlchemyError: If a partition cannot be reached.
+        """
+        self._fan_out(lambda partition: partition.ping())
+
+    def version(self):
+        """
+        Return the inventory version of the catalog.
+
+        Returns:
+            int: The sum of the partition versions, which grows with every insert.
+        """
+        return sum(self._fan_out(lambda partition: partition.version()))
+
+    def source(self):
+        """
+        Identify the partition files currently read.
+
+        Returns:
+            tuple: The `DatabaseManager.source` of every partition.
+        """
+        return tuple(self._fan_out(lambda partition: partition.source()))
+
+    def count(self):
+        """
+        Count the cars in every partition.
+
+        Returns:
+            int: Number of cars in the catalog.
+        """
+        return sum(self._fan_out(lambda partition: partition.count()))
+
+    def get_all_cars(self):
+        """
+        Retrieve all cars from every partition.
+
+        Returns:
+            list: List of all Car objects in the catalog.
+        """
+        results = self._fan_out(lambda partition: partition.get_all_cars())
+        return [car for result in results for car in result]
+
+    def _fan_out(self, call, filters=None):
+        partitions = self.partitions if filters is None else self._pruned(filters)
+        return list(self._pool.map(_in_context(call), partitions))
+
+    def _pruned(self, filters):
+        return [
+            partition
+            for shard, partition in enumerate(self.partitions)
+            if self._may_match(shard, filters)
+        ]
+
+    def _may_match(self, shard, filters):
+        wanted = filters.get("brand")
+        if wanted is None or wanted == []:
+            return True
+        if not isinstance(wanted, list):
+            wanted = [wanted]
+
+        brands = self._brands(shard)
+        return any(
+            str(value).lower() in brand.lower() for value in wanted for brand in brands
+        )
+
+    def _brands(self, shard):
+        url = self._urls[shard]
+        try:
+            stat = os.stat(make_url(url).database)
+        except OSError:
+            return self.partitions[shard].brands()
+
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with _brand_directory_lock:
+            cached = _brand_directory.get(url)
+        if cached is None or cached[0] != version:
+            # Read outside the lock: concurrent misses may both query, never block.
+            cached = (version, self.partitions[shard].brands())
+            with _brand_directory_lock:
+                _brand_directory[url] = cached
+        return cached[1]
+
+
+def open_catalog(read_only=False):
+    """
+    Open the configured catalog: partitioned when `config.DB_PARTITIONS` > 1.
+
+    Args:
+        read_only (bool, optional): Open the database files read-only. Defaults to False.
+
+    Returns:
+        DatabaseManager | PartitionedCatalog: The catalog manager.
+    """
+    if config.DB_PARTITIONS > 1:
+        return PartitionedCatalog(read_only=read_only)
+    return DatabaseManager(read_only=read_only)
@@ -0,0 +1,198 @@
+"""
+Top-k "best deal" ranking for car searches.
+
+A car's score is a weighted sum of its price, mileage, age and missing equipment,
+each expressed in a comparable unit (R$ 10,000, 10,000 km, one year, one missing
+item). Lower scores are better deals. The same score is computed in SQL, where
+`ORDER BY score LIMIT k` lets SQLite keep only the k best rows while scanning, and
+in Python over cars already in memory, where a heap of size k does the same. Both
+run in O(n log k) instead of sorting every match.
+
+Terms with a zero weight are left out of the expression, so the 'cheapest' ranking
+orders by the bare price column and is served by the price index in key order.
+
+Dependencies:
+    - heapq: For partial selection of in-memory cars
+    - sqlalchemy: For building the ranked query
+    - filters: For turning search filters into SQL conditions
+    - car: For the Car model
+"""
+
+import heapq
+
+from sqlalchemy import and_, cast, func, literal, select
+from sqlalchemy.types import Float
+
+from car_mcp.database.filters import build_conditions
+from car_mcp.models.car import Car
+
+# Term name -> (Car column, unit, direction). A direction of 1 penalizes high values,
+# -1 penalizes low values (an older car or a missing item).
+SCORE_TERMS = {
+    "price": ("price", 10000.0, 1),
+    "mileage": ("mileage", 10000.0, 1),
+    "year": ("year", 1.0, -1),
+    "air_conditioning": ("air_conditioning", 1.0, -1),
+    "electric_steering": ("electric_steering", 1.0, -1),
+}
+
+RANKINGS = {
+    "cheapest": {"price": 1.0},
+    "best_value": {
+        "price": 1.0,
+        "mileage": 0.5,
+        "year": 0.5,
+        "air_conditioning": 1.0,
+        "electric_steering": 0.5,
+    },
+}
+DEFAULT_RANKING = "best_value"
+
+
+def resolve_weights(ranking=DEFAULT_RANKING, weights=None):
+    """
+    Return the score weights of a named ranking, optionally overridden.
+
+    Args:
+        ranking (str, optional): Name of a ranking in RANKINGS. Defaults to 'best_value'.
+        weights (dict, optional): Weights per term of SCORE_TERMS replacing the
+            ones of the ranking. Defaults to None.
+
+    Returns:
+        dict: The non-zero weights keyed by term name.
+
+    Raises:
+        ValueError: If the ranking or a weighted term is unknown, or no term is weighted.
+    """
+    if ranking not in RANKINGS:
+        raise ValueError(f"Unknown ranking '{ranking}', expected one of {sorted(RANKINGS)}")
+
+    resolved = dict(RANKINGS[ranking])
+    resolved.update(weights or {})
+
+    unknown = set(resolved) - set(SCORE_TERMS)
+    if unknown:
+        raise ValueError(f"Unknown score terms {sorted(unknown)}, expected {sorted(SCORE_TERMS)}")
+
+    resolved = {term: float(weight) for term, weight in resolved.items() if weight}
+    if not resolved:
+        raise ValueError("At least one score term needs a non-zero weight")
+    return resolved
+
+
+def check_k(k):
+    """
+    Validate the number of cars a ranked search returns.
+
+    A negative SQL `LIMIT` means no limit at all, so it is rejected rather than passed on.
+
+    Args:
+        k (int): Number of cars requested.
+
+    Returns:
+        int: k, unchanged.
+
+    Raises:
+        ValueError: If k is not an integer of at least 1.
+    """
+    if isinstance(k, bool) or not isinstance(k, int) or k < 1:
+        raise ValueError(f"k must be a positive integer, got {k!r}")
+    return k
+
+
+def _price_only(weights):
+    return set(weights) == {"price"} and weights["price"] > 0
+
+
+def score_expression(weights, model=Car):
+    """
+    Build the SQL expression of the score.
+
+    When price is the only positively weighted term the score is the bare price
+    column, so that the price index can serve `ORDER BY` directly. Missing values
+    count as 0, as in `score`.
+
+    Args:
+        weights (dict): Weights as returned by `resolve_weights`.
+        model (type, optional): Mapped class the columns are taken from. Defaults to Car.
+
+    Returns:
+        sqlalchemy.sql.ColumnElement: The score of a row, lower is better.
+    """
+    if _price_only(weights):
+        return model.price
+
+    expression = literal(0.0)
+    for term, weight in weights.items():
+        column, unit, direction = SCORE_TERMS[term]
+        value = cast(func.coalesce(getattr(model, column), 0), Float)
+        expression = expression + value * (direction * weight / unit)
+    return expression
+
+
+def score(car, weights):
+    """
+    Compute the score of a car in memory, matching `score_expression`.
+
+    Args:
+        car (Car): The car to score.
+        weights (dict): Weights as returned by `resolve_weights`.
+
+    Returns:
+        float: The score of the car, lower is better.
+    """
+    if _price_only(weights):
+        return float(car.price)
+
+    total = 0.0
+    for term, weight in weights.items():
+        column, unit, direction = SCORE_TERMS[term]
+        total += float(getattr(car, column) or 0) * (direction * weight / unit)
+    return total
+
+
+def top_k(cars, k, weights):
+    """
+    Select the k best deals among cars already in memory.
+
+    Args:
+        cars (Iterable[Car]): The candidate cars.
+        k (int): Number of cars to keep.
+        weights (dict): Weights as returned by `resolve_weights`.
+
+    Returns:
+        list[tuple]: (car, score) pairs, best first. Ties are broken by car id.
+
+    Raises:
+        ValueError: If k is below 1.
+    """
+    check_k(k)
+    scored = ((score(car, weights), car.id or 0, index, car) for index, car in enumerate(cars))
+    return [(car, value) for value, _, _, car in heapq.nsmallest(k, scored)]
+
+
+def search_ranked(session, filters, k, weights):
+    """
+    Search for the k best deals matching the filters.
+
+    Args:
+        session (sqlalchemy.orm.Session): Session bound to the database.
+        filters (dict): Search criteria as accepted by `DatabaseManager.search`.
+        k (int): Number of cars to return.
+        weights (dict): Weights as returned by `resolve_weights`.
+
+    Returns:
+        list[tuple]: (car, score) pairs, best first. Ties are broken by car id.
+
+    Raises:
+        ValueError: If k is below 1.
+    """
+    check_k(k)
+    expression = score_expression(weights)
+    query = select(Car, expression.label("score"))
+    conditions = build_conditions(filters)
+    if conditions:
+        query = query.where(and_(*conditions))
+
+    rows = session.execute(query.order_by(expression, Car.id).limit(k)).all()
+    return [(car, float(value)) for car, value in rows]
@@ -0,0 +1,131 @@
+"""
+Zero-result filter relaxation for car searches.
+
+When a search returns nothing, the filters are relaxed step by step: the price and
+year ranges are widened, then the color and finally the transmission constraints are
+dropped. Every step includes the previous ones, so each candidate matches a superset
+of the cars matched by the one before it. All candidates are evaluated together in a
+single SQL statement that tags each car with the first candidate it satisfies and
+keeps only the cars of the closest non-empty candidate.
+
+Dependencies:
+    - sqlalchemy: For building the batched query
+    - filters: For turning search filters into SQL conditions
+    - car: For the Car model
+"""
+
+from sqlalchemy import and_, case, func, select, true
+
+from car_mcp.database.filters import active_filters, build_conditions
+from car_mcp.models.car import Car
+
+RELAXATION_STEPS = (
+    {"price": 0.10, "year": 1, "drop": ()},
+    {"price": 0.25, "year": 2, "drop": ()},
+    {"price": 0.25, "year": 2, "drop": ("color",)},
+    {"price": 0.25, "year": 2, "drop": ("color", "transmission")},
+)
+
+
+def _relax(filters, step):
+    relaxed = dict(filters)
+    changed = []
+
+    if relaxed.get("price_min") is not None and step["price"]:
+        relaxed["price_min"] = float(relaxed["price_min"]) * (1 - step["price"])
+        changed.append("price_min")
+    if relaxed.get("price_max") is not None and step["price"]:
+        relaxed["price_max"] = float(relaxed["price_max"]) * (1 + step["price"])
+        changed.append("price_max")
+    if relaxed.get("year_min") is not None and step["year"]:
+        relaxed["year_min"] = int(relaxed["year_min"]) - step["year"]
+        changed.append("year_min")
+    if relaxed.get("year_max") is not None and step["year"]:
+        relaxed["year_max"] = int(relaxed["year_max"]) + step["year"]
+        changed.append("year_max")
+    for campo in step["drop"]:
+        if relaxed.pop(campo, None) is not None:
+            changed.append(campo)
+
+    return relaxed, changed
+
+
+def relaxation_candidates(filters, steps=RELAXATION_STEPS):
+    """
+    List the original filters followed by their progressively relaxed versions.
+
+    Steps that do not change anything (e.g. widening a price range that was not
+    given) are skipped.
+
+    Args:
+        filters (dict): Search criteria as accepted by `DatabaseManager.search`.
+        steps (tuple, optional): Relaxation steps. Defaults to RELAXATION_STEPS.
+
+    Returns:
+        list[tuple]: (filters, relaxed constraint names) pairs, starting with the
+                     original filters and an empty list.
+    """
+    filters = active_filters(filters)
+    candidates = [(filters, [])]
+
+    for step in steps:
+        relaxed, changed = _relax(filters, step)
+        if changed and relaxed != candidates[-1][0]:
+            candidates.append((relaxed, changed))
+
+    return candidates
+
+
+def _levels(candidates):
+    matches = []
+    for candidate, _ in candidates:
+        conditions = build_conditions(candidate)
+        matches.append(and_(*conditions) if conditions else true())
+
+    level = case(*[(match, index) for index, match in enumerate(matches)], else_=None)
+    return level, matches[-1]
+
+
+def closest_level(session, filters, steps=RELAXATION_STEPS):
+    """
+    Find the closest candidate filter set that matches at least one car.
+
+    Args:
+        session (sqlalchemy.orm.Session): Session bound to the database.
+        filters (dict): Search criteria as accepted by `DatabaseManager.search`.
+        steps (tuple, optional): Relaxation steps. Defaults to RELAXATION_STEPS.
+
+    Returns:
+        int | None: The index of the candidate in `relaxation_candidates(filters, steps)`,
+                    or None when not even the loosest candidate matches.
+    """
+    level, loosest = _levels(relaxation_candidates(filters, steps))
+    return session.execute(select(func.min(level)).where(loosest)).scalar()
+
+
+def search_relaxed(session, filters, steps=RELAXATION_STEPS, limit=None):
+    """
+    Search with the closest candidate filter set that returns at least one car.
+
+    Args:
+        session (sqlalchemy.orm.Session): Session bound to the database.
+        filters (dict): Search criteria as accepted by `DatabaseManager.search`.
+        steps (tuple, optional): Relaxation steps. Defaults to RELAXATION_STEPS.
+        limit (int, optional): Maximum number of cars to return. Defaults to None.
+
+    Returns:
+        tuple: The list of matching Car objects and the list of relaxed constraint
+               names (empty when the original filters matched or nothing matched).
+    """
+    candidates = relaxation_candidates(filters, steps)
+    level, loosest = _levels(candidates)
+    closest = select(func.min(level)).where(loosest).scalar_subquery()
+
+    rows = session.execute(
+        select(Car, level.label("level")).where(loosest, level == closest).limit(limit)
+    ).all()
+
+    if not rows:
+        return [], []
+
+    return [car for car, _ in rows], candidates[rows[0].level][1]
@@ -0,0 +1,232 @@
+"""
+Similar car recommendations with vectorized nearest-neighbour search.
+
+The `SimilarityIndex` keeps an in-memory NumPy feature matrix of the `car` table:
+numeric features (price, year, mileage, motorization, doors) scaled by their
+standard deviation, boolean features and dictionary-encoded categorical features
+(brand, fuel, transmission, color, status). The distance between two cars is the
+squared euclidean distance over the scaled numeric and boolean features plus, for
+every categorical feature, 2 when the values differ, which is exactly the squared
+distance between their one-hot encodings without materializing the one-hot columns.
+
+Missing numeric values are replaced by the mean of their feature before scaling.
+
+Features are stored column by column, so queries accumulate the distance to every
+car one feature at a time over contiguous arrays, in place, and select the top-k
+with `argpartition`, so only k rows are sorted. When the inventory version changed
+since the previous refresh, `refresh` appends the cars inserted since then in place.
+The inventory only grows by inserts with increasing ids, so the index is reloaded
+from scratch only when it cannot be trusted: cars were deleted (the table holds
+fewer cars than the index plus the new ones, which a lower highest id implies too)
+or another database file, such as a new snapshot, is being read. Refreshes are
+serialized per index, and a reload is built aside and swapped in, so queries keep
+using the current index meanwhile.
+
+Dependencies:
+    - numpy: For the feature matrix and distance computation
+    - db_manager: For reading the car table
+"""
+
+import threading
+
+import numpy as np
+
+NUMERIC_FEATURES = ("price", "year", "mileage", "motorization", "doors")
+BOOLEAN_FEATURES = ("air_conditioning", "electric_steering")
+CATEGORICAL_FEATURES = ("brand", "fuel", "transmission", "color", "status")
+FEATURES = NUMERIC_FEATURES + BOOLEAN_FEATURES + CATEGORICAL_FEATURES
+
+# Attributes replaced when `refresh` swaps a rebuilt index in.
+_STATE = (
+    "size", "last_id", "source", "_ids", "_numeric", "_categorical",
+    "_vocabularies", "_sums", "_squares", "_positions",
+)
+
+
+class SimilarityIndex:
+    """
+    In-memory nearest-neighbour index over the car table.
+
+    Attributes:
+        size (int): Number of cars in the index.
+        last_id (int): Highest car id loaded so far.
+        version (int | None): Inventory version of the last refresh, None before it.
+        source (tuple | None): Database file the index was loaded from, None before
+            the first refresh.
+    """
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.last_id = 0
+        self.version = None
+        self.source = None
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._numeric = np.zeros(
+            (len(NUMERIC_FEATURES) + len(BOOLEAN_FEATURES), capacity), dtype=np.float32
+        )
+        self._categorical = np.zeros((len(CATEGORICAL_FEATURES), capacity), dtype=np.int32)
+        self._vocabularies = [{} for _ in CATEGORICAL_FEATURES]
+        self._sums = np.zeros(len(self._numeric), dtype=np.float64)
+        self._squares = np.zeros(len(self._numeric), dtype=np.float64)
+        self._positions = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self, db_manager):
+        """
+        Bring the index up to date if the inventory version changed since the last refresh.
+
+        The cars inserted since the last refresh are appended. When cars were deleted
+        or another database file is read, the whole index is rebuilt aside and
+        swapped in, so queries running meanwhile see the previous one.
+
+        Args:
+            db_manager (DatabaseManager): Manager of the database to read from.
+
+        Returns:
+            int: Number of cars loaded, 0 when the index was up to date.
+        """
+        with self._refresh_lock:
+            version = db_manager.version()
+            if version == self.version:
+                return 0
+
+            source = db_manager.source()
+            if source == self.source:
+                columns = db_manager.fetch_columns(("id",) + FEATURES, after_id=self.last_id)
+                # Cars inserted between the two reads only cause a needless reload.
+                if self.size + len(columns["id"]) == db_manager.count():
+                    added = self.append(columns)
+                    self.version = version
+                    return added
+
+            columns = db_manager.fetch_columns(("id",) + FEATURES)
+            fresh = SimilarityIndex(capacity=max(len(columns["id"]), 1))
+            fresh.append(columns)
+            fresh.source = source
+            with self._lock:
+                for name in _STATE:
+                    setattr(self, name, getattr(fresh, name))
+                self.version = version
+            return self.size
+
+    def append(self, columns):
+        """
+        Append cars to the index.
+
+        Args:
+            columns (dict): Sequences keyed by 'id' and every name in FEATURES, with
+                ids in increasing order.
+
+        Returns:
+            int: Number of cars added to the index.
+        """
+        total = len(columns["id"])
+        if total == 0:
+            return 0
+
+        # None becomes NaN.
+        numeric = np.vstack(
+            [
+                np.asarray(columns[name], dtype=np.float32)
+                for name in NUMERIC_FEATURES + BOOLEAN_FEATURES
+            ]
+        )
+
+        with self._lock:
+            missing = np.isnan(numeric)
+            if missing.any():
+                known = (~missing).sum(axis=1)
+                sums = self._sums + np.nansum(numeric, axis=1, dtype=np.float64)
+                counts = self.size + known
+                means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+                numeric = np.where(missing, means[:, None].astype(np.float32), numeric)
+
+            # The vocabularies are shared with concurrent appends.
+            categorical = np.vstack(
+                [
+                    np.fromiter(
+                        (vocabulary.setdefault(value, len(vocabulary)) for value in columns[name]),
+                        dtype=np.int32,
+                        count=total,
+                    )
+                    for name, vocabulary in zip(CATEGORICAL_FEATURES, self._vocabularies)
+                ]
+            )
+
+            self._reserve(self.size + total)
+            end = self.size + total
+            self._ids[self.size:end] = columns["id"]
+            self._numeric[:, self.size:end] = numeric
+            self._categorical[:, self.size:end] = categorical
+            self._sums += numeric.sum(axis=1, dtype=np.float64)
+            self._squares += np.square(numeric, dtype=np.float64).sum(axis=1)
+            for position, car_id in enumerate(columns["id"], start=self.size):
+                self._positions[int(car_id)] = position
+            self.size = end
+            self.last_id = int(self._ids[end - 1])
+
+        return total
+
+    def nearest(self, car_id, k=5):
+        """
+        Find the cars most similar to a given car.
+
+        Args:
+            car_id (int): Id of the reference car.
+            k (int, optional): Number of similar cars to return. Defaults to 5.
+
+        Returns:
+            list[tuple]: (car id, distance) pairs, closest first, excluding the
+                         reference car itself.
+
+        Raises:
+            KeyError: If the car is not in the index.
+        """
+        with self._lock:
+            position = self._positions[int(car_id)]
+            k = min(k, self.size - 1)
+            if k <= 0:
+                return []
+
+            weights = np.square(self._inverse_scale())
+            distances = np.zeros(self.size, dtype=np.float32)
+            scratch = np.empty(self.size, dtype=np.float32)
+            for feature, weight in zip(self._numeric[:, : self.size], weights):
+                if weight == 0:
+                    continue
+                np.subtract(feature, feature[position], out=scratch)
+                np.square(scratch, out=scratch)
+                scratch *= weight
+                distances += scratch
+            for feature in self._categorical[:, : self.size]:
+                np.not_equal(feature, feature[position], out=scratch)
+                scratch *= 2.0
+                distances += scratch
+            distances[position] = np.inf
+
+            candidates = np.argpartition(distances, k - 1)[:k]
+            candidates = candidates[np.argsort(distances[candidates])]
+
+            return [(int(self._ids[i]), float(distances[i])) for i in candidates]
+
+    def _inverse_scale(self):
+        mean = self._sums / self.size
+        variance = np.maximum(self._squares / self.size - mean**2, 0.0)
+        deviation = np.sqrt(variance)
+        inverse = np.zeros_like(deviation)
+        np.divide(1.0, deviation, out=inverse, where=deviation > 0)
+        return inverse.astype(np.float32)
+
+    def _reserve(self, capacity):
+        if capacity <= len(self._ids):
+            return
+        capacity = max(capacity, 2 * len(self._ids))
+        self._ids = np.resize(self._ids, capacity)
+        self._numeric = self._grow(self._numeric, capacity)
+        self._categorical = self._grow(self._categorical, capacity)
+
+    def _grow(self, matrix, capacity):
+        grown = np.zeros((len(matrix), capacity), dtype=matrix.dtype)
+        grown[:, : self.size] = matrix[:, : self.size]
+        return grown
@@ -0,0 +1,79 @@
+"""
+Snapshot ingestion module for the car inventory system.
+
+Instead of appending rows to the database file the MCP server is reading from,
+snapshot ingestion copies the live database with SQLite's online backup API, loads
+the new rows into the copy and atomically replaces the live file with it. Readers
+opened with `DatabaseManager(read_only=True)` keep serving from the previous file
+until they pick up the new one, so searches never wait on bulk loads.
+
+Publishers hold an exclusive lock on a `<database>.lock` file next to the database
+from the copy to the swap: concurrent ingestions run one after the other, each one
+copying the snapshot the previous one published, so no rows are lost.
+
+Dependencies:
+    - fcntl: For the publisher lock
+    - os: For the atomic file swap
+    - sqlite3: For the online backup API
+    - db_manager: For loading rows into the new snapshot
+"""
+
+import fcntl
+import os
+import sqlite3
+from contextlib import contextmanager
+
+from sqlalchemy.engine import make_url
+
+from car_mcp import config
+from car_mcp.database.db_manager import DatabaseManager, dispose_engine
+
+
+@contextmanager
+def _publisher_lock(path):
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def publish_snapshot(df, db_url=None):
+    """
+    Build a new database snapshot containing `df` and atomically swap it in.
+
+    Waits for any other publisher of the same database to finish first.
+
+    Args:
+        df (pandas.DataFrame): DataFrame containing car information to be inserted.
+        db_url (str, optional): SQLAlchemy URL of the live SQLite database.
+            Defaults to `config.DB_URL`.
+
+    Returns:
+        str: Path of the published database file.
+    """
+    path = make_url(db_url or config.DB_URL).database
+    building_path = f"{path}.building-{os.getpid()}"
+    building_url = f"sqlite:///{building_path}"
+
+    with _publisher_lock(path):
+        if os.path.exists(building_path):
+            os.remove(building_path)
+
+        if os.path.exists(path):
+            source = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+            target = sqlite3.connect(building_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+
+        try:
+            DatabaseManager(building_url).insert(df)
+        finally:
+            dispose_engine(building_url)
+
+        os.replace(building_path, path)
+    return path
@@ -0,0 +1,240 @@
+"""
+Materialized summaries for common browse queries.
+
+The `car_summary` table keeps, for every (brand, fuel, transmission, status) bucket,
+the number of cars, price statistics and the ids of the cheapest cars. Queries that
+only filter on brand, fuel, transmission and price ("brand X under price Y") are
+answered from it: buckets whose price range misses the filter are skipped without
+touching the `car` table, and buckets that are small, or whose matching cars are all
+among the cheapest ones, are resolved through primary key lookups of their cheapest
+ids. Anything else falls back to the base table.
+
+Every refreshed bucket records the inventory version (`PRAGMA user_version`) it was
+computed at, so summaries left behind by a writer that did not maintain them can be
+detected and rebuilt.
+
+Dependencies:
+    - json: For storing the cheapest car ids
+    - sqlalchemy: For database operations
+    - filters: For applying the search filters to the summary buckets
+    - car, car_summary: For the Car and CarSummary models
+"""
+
+import json
+import math
+from collections import defaultdict
+
+from sqlalchemy import and_, func, or_, text, tuple_
+
+from car_mcp.database.filters import RANGE_FIELDS, active_filters, build_conditions
+from car_mcp.models.car import Car
+from car_mcp.models.car_summary import CarSummary
+
+SUMMARY_KEY = ("brand", "fuel", "transmission", "status")
+SUMMARY_TEXT_FIELDS = ("brand", "fuel", "transmission")
+PRICE_FIELDS = {campo: RANGE_FIELDS[campo] for campo in ("price_min", "price_max")}
+COVERED_FIELDS = set(SUMMARY_TEXT_FIELDS) | set(PRICE_FIELDS)
+
+
+def _percentile(prices, fraction):
+    return prices[max(0, math.ceil(fraction * len(prices)) - 1)]
+
+
+def summarize(rows, top_n):
+    """
+    Group car rows into summary buckets.
+
+    Args:
+        rows (Iterable[tuple]): (brand, fuel, transmission, status, id, price) tuples.
+        top_n (int): Number of cheapest car ids kept per bucket.
+
+    Returns:
+        list[dict]: One dictionary per bucket with the `CarSummary` fields.
+    """
+    groups = defaultdict(list)
+    for brand, fuel, transmission, status, car_id, price in rows:
+        groups[(brand, fuel, transmission, status)].append((price, car_id))
+
+    buckets = []
+    for key, items in groups.items():
+        items.sort()
+        prices = [price for price, _ in items]
+        buckets.append(
+            {
+                **dict(zip(SUMMARY_KEY, key)),
+                "count": len(items),
+                "min_price": prices[0],
+                "max_price": prices[-1],
+                "p25_price": _percentile(prices, 0.25),
+                "median_price": _percentile(prices, 0.5),
+                "p75_price": _percentile(prices, 0.75),
+                "cheapest_ids": [car_id for _, car_id in items[:top_n]],
+                "cheapest_max_price": prices[: max(top_n, 1)][-1],
+            }
+        )
+
+    return buckets
+
+
+def _key_condition(model, keys):
+    """Match the rows of any of the bucket keys; `IN` never matches NULL components."""
+    columns = [getattr(model, field) for field in SUMMARY_KEY]
+    complete = [key for key in keys if None not in key]
+    conditions = [tuple_(*columns).in_(complete)] if complete else []
+    for key in keys:
+        if None in key:
+            conditions.append(
+                and_(*[
+                    column.is_(None) if value is None else column == value
+                    for column, value in zip(columns, key)
+                ])
+            )
+    return or_(*conditions)
+
+
+def summarized_version(session):
+    """
+    Return the inventory version the summaries were last refreshed at.
+
+    Args:
+        session (sqlalchemy.orm.Session): Session bound to the database.
+
+    Returns:
+        int | None: The highest version recorded by a bucket, None without summaries.
+
+    Raises:
+        sqlalchemy.exc.OperationalError: If the summary table predates recorded versions.
+    """
+    return session.query(func.max(CarSummary.version)).scalar()
+
+
+def refresh_summaries(session, top_n, buckets=None):
+    """
+    Recompute summary buckets from the `car` table and commit them.
+
+    Args:
+        session (sqlalchemy.orm.Session): Session bound to a writable database.
+        top_n (int): Number of cheapest car ids kept per bucket.
+        buckets (Iterable[tuple], optional): (brand, fuel, transmission, status) keys
+            to refresh, with None for missing values. Defaults to None, which rebuilds
+            every bucket.
+
+    Returns:
+        int: The inventory version recorded in the refreshed buckets.
+    """
+    version = session.execute(text("PRAGMA user_version")).scalar()
+    query = session.query(
+        Car.brand, Car.fuel, Car.transmission, Car.status, Car.id, Car.price
+    )
+    stale = session.query(CarSummary)
+
+    if buckets is not None:
+        keys = list(set(buckets))
+        if not keys:
+            return version
+        query = query.filter(_key_condition(Car, keys))
+        stale = stale.filter(_key_condition(CarSummary, keys))
+
+    stale.delete(synchronize_session=False)
+    session.add_all(
+        CarSummary(
+            **{**bucket, "cheapest_ids": json.dumps(bucket["cheapest_ids"])},
+            version=version,
+        )
+        for bucket in summarize(query.all(), top_n)
+    )
+    session.commit()
+    return version
+
+
+def _matching_buckets(session, filters):
+    conditions = build_conditions(filters, CarSummary, SUMMARY_TEXT_FIELDS, {})
+    query = session.query(CarSummary)
+    if conditions:
+        query = query.filter(and_(*conditions))
+    return query.all()
+
+
+def _price_bounds(filters):
+    return tuple(
+        float(filters[campo]) if filters.get(campo) is not None else None
+        for campo in ("price_min", "price_max")
+    )
+
+
+def _price_overlap(bucket, filters):
+    """Tell whether a bucket lies entirely inside, partly inside or outside the price filter."""
+    price_min, price_max = _price_bounds(filters)
+
+    if (price_min is not None and bucket.max_price < price_min) or (
+        price_max is not None and bucket.min_price > price_max
+    ):
+        return "none"
+    if (price_min is None or bucket.min_price >= price_min) and (
+        price_max is None or bucket.max_price <= price_max
+    ):
+        return "all"
+    return "partial"
+
+
+def search_from_summaries(session, filters):
+    """
+    Answer a search from the summaries when they cover it exactly.
+
+    Args:
+        session (sqlalchemy.orm.Session): Session bound to the database.
+        filters (dict): Search criteria as accepted by `DatabaseManager.search`.
+
+    Returns:
+        list[Car] | None: The matching cars, or None when the summaries cannot answer
+                          the query and the base table must be searched instead.
+    """
+    filters = active_filters(filters)
+    if not set(filters) <= COVERED_FIELDS:
+        return None
+
+    _, price_max = _price_bounds(filters)
+    ids = []
+    for bucket in _matching_buckets(session, filters):
+        if _price_overlap(bucket, filters) == "none":
+            continue
+        cheapest_ids = json.loads(bucket.cheapest_ids)
+        complete = len(cheapest_ids) == bucket.count or (
+            price_max is not None and price_max < bucket.cheapest_max_price
+        )
+        if not complete:
+            return None
+        ids.extend(cheapest_ids)
+
+    if not ids:
+        return []
+
+    conditions = build_conditions(filters, Car, (), PRICE_FIELDS)
+    return session.query(Car).filter(Car.id.in_(ids), *conditions).all()
+
+
+def facets_from_summaries(session, filters):
+    """
+    Compute facet buckets from the summaries when they cover the filters exactly.
+
+    Args:
+        session (sqlalchemy.orm.Session): Session bound to the database.
+        filters (dict): Search criteria as accepted by `DatabaseManager.search`.
+
+    Returns:
+        list[dict] | None: The matching buckets, or None when the base table must be
+                           aggregated instead.
+    """
+    filters = active_filters(filters)
+    if not set(filters) <= COVERED_FIELDS:
+        return None
+
+    buckets = []
+    for bucket in _matching_buckets(session, filters):
+        overlap = _price_overlap(bucket, filters)
+        if overlap == "partial":
+            return None
+        if overlap == "all":
+            buckets.append(bucket.to_dict())
+
+    return buckets
@@ -0,0 +1,287 @@
+"""
+Admission control for the MCP server's tool calls.
+
+A few broad searches can keep the database busy for everyone else, so every tool
+call goes through an `AdmissionController` before touching the database:
+
+    - rate limit: each client, identified by its address (or the X-Client-Id header
+      set by one of `config.MCP_TRUSTED_PROXIES`), gets a token bucket of
+      `config.MCP_RATE_BURST` calls refilled at `config.MCP_RATE_LIMIT` calls per
+      second;
+    - concurrency limit: at most `config.MCP_MAX_CONCURRENT` calls run at the same
+      time, up to `config.MCP_MAX_QUEUE` wait in FIFO order for a free slot and
+      calls waiting longer than `config.MCP_QUEUE_TIMEOUT` seconds are shed;
+    - cost: searches expected to return more than `config.MCP_MAX_ROWS` cars are
+      limited to that many cars or rejected, per `config.MCP_COST_POLICY`.
+
+Calls that are turned away raise `Rejected`, which the client receives as a tool
+error and re-raises with the same reason. Every decision is counted in
+`AdmissionController.counters`, served by the server's `/stats` route.
+
+Dependencies:
+    - asyncio: For the wait queue
+    - config: For the limits
+"""
+
+import asyncio
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from car_mcp import config
+
+REASONS = ("overloaded", "rate_limited", "too_expensive", "timeout")
+COUNTERS = (
+    "admitted",
+    "queued",
+    "shed_queue_full",
+    "shed_queue_timeout",
+    "rate_limited",
+    "rejected_cost",
+    "limited_cost",
+    "timed_out",
+)
+
+# Idle clients whose bucket is full again are forgotten past this many clients.
+MAX_TRACKED_CLIENTS = 1024
+
+_REJECTION = re.compile(rf"\b({'|'.join(REASONS)}): (.*)", re.DOTALL)
+
+
+class Rejected(Exception):
+    """
+    Raised when a tool call is turned away by admission control.
+
+    Attributes:
+        reason (str): 'overloaded', 'rate_limited', 'too_expensive' or 'timeout'.
+        detail (str): Human readable explanation.
+    """
+
+    def __init__(self, reason, detail):
+        super().__init__(f"{reason}: {detail}")
+        self.reason = reason
+        self.detail = detail
+
+    @classmethod
+    def from_error(cls, text):
+        """
+        Rebuild the exception from the text of a tool error.
+
+        Args:
+            text (str): Error text returned by the server.
+
+        Returns:
+            Rejected | None: The rejection, or None if the error is not one.
+        """
+        match = _REJECTION.search(text or "")
+        return cls(match.group(1), match.group(2)) if match else None
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        burst (int): Maximum number of tokens.
+        tokens (float): Tokens currently available.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def take(self):
+        """
+        Take a token if one is available.
+
+        Returns:
+            bool: Whether a token was taken.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def full(self):
+        """Whether the bucket has refilled completely, so forgetting it changes nothing."""
+        elapsed = time.monotonic() - self._updated
+        return self.tokens + elapsed * self.rate >= self.burst
+
+
+class AdmissionController:
+    """
+    Rate, concurrency and cost limits shared by the tool calls of one server process.
+
+    Attributes:
+        max_concurrent (int): Calls running at the same time, 0 for no limit.
+        max_queue (int): Calls allowed to wait for a free slot.
+        queue_timeout (float): Seconds a call may wait for a slot, 0 for no limit.
+        rate (float): Calls per second allowed per client, 0 for no limit.
+        burst (int): Calls a client may make in a burst.
+        max_rows (int): Estimated result size above which a search is expensive,
+            0 disabling cost checks.
+        policy (str): 'limit' or 'reject', applied to expensive searches.
+        counters (dict[str, int]): Number of calls per admission decision.
+    """
+
+    def __init__(
+        self,
+        max_concurrent=None,
+        max_queue=None,
+        queue_timeout=None,
+        rate=None,
+        burst=None,
+        max_rows=None,
+        policy=None,
+    ):
+        self.max_concurrent = (
+            config.MCP_MAX_CONCURRENT if max_concurrent is None else max_concurrent
+        )
+        self.max_queue = config.MCP_MAX_QUEUE if max_queue is None else max_queue
+        self.queue_timeout = (
+            config.MCP_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        )
+        self.rate = config.MCP_RATE_LIMIT if rate is None else rate
+        self.burst = config.MCP_RATE_BURST if burst is None else burst
+        self.max_rows = config.MCP_MAX_ROWS if max_rows is None else max_rows
+        self.policy = policy or config.MCP_COST_POLICY
+        if self.policy not in ("limit", "reject"):
+            raise ValueError(f"Unknown cost policy '{self.policy}', expected 'limit' or 'reject'")
+
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self._in_flight = 0
+        self._waiters = deque()
+        self._buckets = {}
+
+    @asynccontextmanager
+    async def admit(self, client="local"):
+        """
+        Hold a slot for the enclosed tool call.
+
+        Args:
+            client (str, optional): Identifier of the calling client. Defaults to 'local'.
+
+        Raises:
+            Rejected: If the client exceeded its rate or the server is overloaded.
+        """
+        self._check_rate(client)
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    def row_limit(self, estimate, can_limit=True):
+        """
+        Apply the cost policy to a search.
+
+        Args:
+            estimate (int | None): Estimated number of cars the search returns, None
+                when it cannot be estimated.
+            can_limit (bool, optional): Whether the search can be limited; expensive
+                searches that cannot are rejected whatever the policy. Defaults to True.
+
+        Returns:
+            int | None: The number of cars to return, None when the search is cheap or
+                has no estimate.
+
+        Raises:
+            Rejected: If the search is expensive and cannot be limited.
+        """
+        if not self.max_rows or estimate is None or estimate <= self.max_rows:
+            return None
+
+        if self.policy == "reject" or not can_limit:
+            self.counters["rejected_cost"] += 1
+            raise Rejected(
+                "too_expensive",
+                f"the search would return about {estimate} cars (limit {self.max_rows}); "
+                "add filters to narrow it down",
+            )
+
+        self.counters["limited_cost"] += 1
+        return self.max_rows
+
+    def stats(self):
+        """
+        Report the admission counters and the current load.
+
+        Returns:
+            dict: The counters, the calls running and the calls waiting for a slot.
+        """
+        return {**self.counters, "in_flight": self._in_flight, "waiting": len(self._waiters)}
+
+    def _check_rate(self, client):
+        if not self.rate:
+            return
+
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            if len(self._buckets) >= MAX_TRACKED_CLIENTS:
+                self._buckets = {
+                    known: kept for known, kept in self._buckets.items() if not kept.full()
+                }
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+
+        if not bucket.take():
+            self.counters["rate_limited"] += 1
+            raise Rejected(
+                "rate_limited", f"more than {self.rate} calls per second; retry later"
+            )
+
+    async def _acquire(self):
+        if not self.max_concurrent or (
+            self._in_flight < self.max_concurrent and not self._waiters
+        ):
+            self._in_flight += 1
+            self.counters["admitted"] += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.counters["shed_queue_full"] += 1
+            raise Rejected("overloaded", "too many calls waiting; retry later")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.counters["queued"] += 1
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout or None)
+        except asyncio.TimeoutError:
+            # The slot may have been handed over as the timeout fired: keep it then.
+            if not (waiter.done() and not waiter.cancelled()):
+                self._forget(waiter)
+                self.counters["shed_queue_timeout"] += 1
+                raise Rejected(
+                    "overloaded", f"no free slot within {self.queue_timeout}s; retry later"
+                ) from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the caller went away.
+                self._release()
+            else:
+                self._forget(waiter)
+            raise
+
+        self.counters["admitted"] += 1
+
+    def _release(self):
+        # Hand the slot over to the oldest waiter still waiting.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _forget(self, waiter):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
@@ -0,0 +1,128 @@
+"""
+Client-side cache of MCP query results.
+
+Results are cached after parsing, keyed on the tool name and its arguments in a
+canonical form, and tagged with the inventory version the server reported when they
+were fetched. An entry is only served while the version is unchanged; the client
+learns about new versions from the server's `inventory://version` resource
+notifications (see `MCPClient.start_watching`).
+
+Dependencies:
+    - collections: For the LRU ordering
+    - json: For the canonical cache keys
+"""
+
+import json
+from collections import OrderedDict
+
+INVENTORY_VERSION_URI = "inventory://version"
+
+
+def _canonical(value):
+    if isinstance(value, dict):
+        return {
+            key: _canonical(item)
+            for key, item in value.items()
+            if item is not None and item != []
+        }
+    if isinstance(value, list):
+        items = [_canonical(item) for item in value]
+        if all(isinstance(item, (str, int, float)) for item in items):
+            return sorted(items, key=lambda item: (isinstance(item, str), item))
+        return items
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def cache_key(name, arguments):
+    """
+    Build the cache key of a tool call.
+
+    Filters that do not constrain anything (None or an empty list) are dropped,
+    numbers are compared by value and lists of values are compared as sets, so
+    equivalent queries share one entry.
+
+    Args:
+        name (str): Name of the MCP tool.
+        arguments (dict): Arguments of the call.
+
+    Returns:
+        str: The canonical key.
+    """
+    return json.dumps([name, _canonical(arguments)], sort_keys=True, ensure_ascii=False)
+
+
+class ResultCache:
+    """
+    Least recently used cache of parsed query results tagged with an inventory version.
+
+    Attributes:
+        maxsize (int): Maximum number of entries, 0 disabling the cache.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that were not.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, version):
+        """
+        Return the result cached for a key at the given inventory version.
+
+        Args:
+            key (str): Key built by `cache_key`.
+            version (int): Current inventory version.
+
+        Returns:
+            object | None: The cached result, or None when it is missing or stale.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value, version):
+        """
+        Cache a result, evicting the least recently used entry when full.
+
+        Args:
+            key (str): Key built by `cache_key`.
+            value (object): Parsed result.
+            version (int): Inventory version the result was fetched at.
+        """
+        if self.maxsize <= 0:
+            return
+
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, version=None):
+        """
+        Drop the entries fetched at another inventory version.
+
+        Args:
+            version (int, optional): The current version. Defaults to None, which
+                drops every entry.
+
+        Returns:
+            int: Number of entries dropped.
+        """
+        stale = [key for key, (tagged, _) in self._entries.items() if tagged != version]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
@@ -2,33 +2,93 @@
 MCP (Model-Client-Protocol) client implementation for car search system.
 
 This module provides a client interface for communicating with the MCP server
-using Server-Sent Events (SSE). It handles data fetching and car object
-conversion for the automobile search system.
+using Server-Sent Events (SSE) or the Streamable HTTP transport. It handles data
+fetching and car object conversion for the automobile search system.
+
+Parsed results are kept in an LRU cache tagged with the server's inventory version.
+Over SSE, while `start_watching` keeps a session registered for `inventory://version`
+update notifications, repeated queries are answered without contacting the server
+and stale entries are dropped when the server notifies a new version. The stateless
+Streamable HTTP transport cannot push notifications, so there (or when the server
+does not offer them) every query still connects, but a cached result is reused after
+a cheap version check instead of running the search again.
 
 Dependencies:
+    - asyncio: For the background inventory watcher
     - json: For JSON data handling
+    - cache: For the versioned result cache
+    - admission: For the server's rejections of overloading calls
     - car: For Car model class
+    - codec: For decoding compact wire formats
     - mcp: For ClientSession implementation
     - mcp.client.sse: For SSE client functionality
+    - mcp.client.streamable_http: For Streamable HTTP client functionality
 """
 
+import asyncio
 import json
+import logging
+import time
 
-from mcp import ClientSession
+from mcp import ClientSession, McpError, types
 from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
 
 from car_mcp import config
+from car_mcp.mcp import codec
+from car_mcp.mcp.admission import Rejected
+from car_mcp.mcp.cache import INVENTORY_VERSION_URI, ResultCache, cache_key
 from car_mcp.models.car import Car
 
+logger = logging.getLogger(__name__)
+
+
+def _payload(response):
+    text = response.content[0].text
+    if response.isError:
+        raise Rejected.from_error(text) or RuntimeError(text)
+    return json.loads(text)
+
+
+def _parse_cars(data):
+    return [Car.from_dict(car) for car in codec.decode_cars(data)]
+
+
+def _parse_relaxed(data):
+    return _parse_cars(data), (data or {}).get("relaxed", [])
+
+
+def _parse_many(data):
+    cars = {}
+    for car_dict in codec.decode_cars(data):
+        car = Car.from_dict(car_dict)
+        cars[car.id] = car
+
+    results = (data or {}).get("results", {})
+    return {int(index): [cars[car_id] for car_id in ids] for index, ids in results.items()}
+
 
 class MCPClient:
     """
     Client class for handling MCP protocol communications.
     
     This class manages the connection to the MCP server and processes
-    queries for car data using Server-Sent Events.
+    queries for car data using Server-Sent Events or Streamable HTTP.
     """
 
+    def __init__(self, encoding=None, url=None, transport=None, cache_size=None):
+        self.encoding = encoding or config.MCP_WIRE_ENCODING
+        self.url = url or config.MCP_SERVER_URL
+        self.transport = transport or config.MCP_TRANSPORT
+        self.cache = ResultCache(
+            config.MCP_CACHE_SIZE if cache_size is None else cache_size
+        )
+        self._version = None
+        self._watching = False
+        self._watcher = None
+        # Called with {'tool', 'arguments', 'duration', 'cached'} after every tool call.
+        self.on_tool_call = None
+
     async def process_query(self, query):
         """
         Process a car search query through the MCP server.
@@ -42,18 +102,209 @@ class MCPClient:
             list[Car]: A list of Car objects matching the query criteria.
                       Returns an empty list if no matches are found or
                       if there's an error in the response.
+
+        Raises:
+            Rejected: If the server is overloaded or the query is too expensive.
         """
-        async with sse_client(url=config.MCP_SERVER_URL) as streams:
-            async with ClientSession(*streams) as session:
+        return await self._call_tool(
+            "fetch_data", {"filters": query, "encoding": self.encoding}, _parse_cars
+        )
+
+    async def process_query_relaxed(self, query):
+        """
+        Process a car search query, letting the server relax it if nothing matches.
+
+        Args:
+            query (dict): Search filters for querying car data.
+
+        Returns:
+            tuple: A list of Car objects and the list of constraint names the server
+                   relaxed to find them (empty when the query matched as given).
+
+        Raises:
+            Rejected: If the server is overloaded or the query is too expensive.
+        """
+        return await self._call_tool(
+            "fetch_data",
+            {"filters": query, "encoding": self.encoding, "relax": True},
+            _parse_relaxed,
+        )
+
+    async def process_best_deals(self, query, k=5, ranking="best_value"):
+        """
+        Fetch the best deals matching a car search query.
+
+        Args:
+            query (dict): Search filters for querying car data.
+            k (int, optional): Number of cars to return. Defaults to 5.
+            ranking (str, optional): 'best_value' (default) or 'cheapest'.
+
+        Returns:
+            list[Car]: Up to k Car objects, best deal first.
+        """
+        return await self._call_tool(
+            "fetch_best_deals",
+            {"filters": query, "k": k, "ranking": ranking, "encoding": self.encoding},
+            _parse_cars,
+        )
+
+    async def process_many(self, queries):
+        """
+        Process several car search queries with a single MCP call.
+
+        Args:
+            queries (list[dict]): Search filters, one dictionary per result set.
+
+        Returns:
+            dict[int, list[Car]]: The cars of each result set keyed by the index of its
+                                  query. A car matched by several queries is the same
+                                  Car object in every list.
+        """
+        return await self._call_tool(
+            "fetch_many", {"filters": queries, "encoding": self.encoding}, _parse_many
+        )
+
+    def start_watching(self):
+        """
+        Subscribe to inventory version notifications in the background.
+
+        Must be called from a running event loop. Only the SSE transport can receive
+        notifications; while the subscription is open, cached results are served
+        without contacting the server. On other transports, or if the server cannot
+        push notifications, this does nothing and every query checks the version.
+        """
+        if self.transport != "sse":
+            return
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.get_running_loop().create_task(self._watch())
+
+    def stop_watching(self):
+        """Cancel the background subscription started by `start_watching`."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    async def _watch(self):
+        updated = asyncio.Event()
+
+        async def on_message(message):
+            if isinstance(message, types.ServerNotification) and isinstance(
+                message.root, types.ResourceUpdatedNotification
+            ):
+                if str(message.root.params.uri) == INVENTORY_VERSION_URI:
+                    updated.set()
+
+        try:
+            async with self._connect() as streams:
+                async with ClientSession(*streams[:2], message_handler=on_message) as session:
+                    initialized = await session.initialize()
+                    if not await self._subscribe(session, initialized.capabilities):
+                        return
+                    self._set_version(await self._read_version(session))
+                    self._watching = True
+
+                    while True:
+                        await updated.wait()
+                        updated.clear()
+                        self._set_version(await self._read_version(session))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Inventory version subscription closed: %s", e)
+        finally:
+            self._watching = False
+
+    async def _subscribe(self, session, capabilities):
+        # Servers advertising resource subscriptions get the standard request; this
+        # server registers through its watch_inventory tool, which reports whether
+        # its transport can push notifications at all.
+        if capabilities.resources is not None and capabilities.resources.subscribe:
+            await session.subscribe_resource(INVENTORY_VERSION_URI)
+            return True
+
+        response = await session.call_tool("watch_inventory", arguments={})
+        try:
+            return bool(_payload(response).get("push"))
+        except (Rejected, RuntimeError, ValueError, IndexError, AttributeError):
+            logger.info("Server does not push inventory updates; checking per call")
+            return False
+
+    def _set_version(self, version):
+        if version != self._version:
+            self.cache.invalidate(version)
+        self._version = version
+
+    async def _read_version(self, session):
+        try:
+            result = await session.read_resource(INVENTORY_VERSION_URI)
+            return int(json.loads(result.contents[0].text)["version"])
+        except (McpError, TypeError, ValueError, KeyError, IndexError, AttributeError):
+            # Servers without the inventory resource are never cached.
+            return None
+
+    async def call_tool(self, name, arguments):
+        """
+        Call an MCP tool directly, bypassing the result cache.
+
+        Args:
+            name (str): Name of the tool.
+            arguments (dict): Arguments of the call.
+
+        Returns:
+            dict: The decoded JSON payload of the response.
+
+        Raises:
+            Rejected: If the server's admission control turned the call away.
+        """
+        async with self._connect() as streams:
+            async with ClientSession(*streams[:2]) as session:
+                await session.initialize()
+
+                response = await session.call_tool(name, arguments=arguments)
+
+        # Raised outside the transport's task group, which would wrap the exception.
+        return _payload(response)
+
+    async def _call_tool(self, name, arguments, parse):
+        started = time.perf_counter()
+        result, cached = await self._cached_call(name, arguments, parse)
+
+        if self.on_tool_call is not None:
+            self.on_tool_call(
+                {
+                    "tool": name,
+                    "arguments": arguments,
+                    "duration": time.perf_counter() - started,
+                    "cached": cached,
+                }
+            )
+        return result
+
+    async def _cached_call(self, name, arguments, parse):
+        key = cache_key(name, arguments)
+        if self._watching and self._version is not None:
+            cached = self.cache.get(key, self._version)
+            if cached is not None:
+                return cached, True
+
+        async with self._connect() as streams:
+            async with ClientSession(*streams[:2]) as session:
                 await session.initialize()
 
-                response = await session.call_tool(
-                    "fetch_data", arguments={"filters": query}
-                )
+                version = await self._read_version(session)
+                if version is not None and not self._watching:
+                    cached = self.cache.get(key, version)
+                    if cached is not None:
+                        return cached, True
 
-                data = json.loads(response.content[0].text)
+                response = await session.call_tool(name, arguments=arguments)
 
-                if data and "cars" in data:
-                    return [Car.from_dict(car) for car in data["cars"]]
+        result = parse(_payload(response))
+        if version is not None:
+            self.cache.put(key, result, version)
+        return result, False
 
-                return []
+    def _connect(self):
+        if self.transport == "streamable-http":
+            return streamablehttp_client(url=self.url)
+        return sse_client(url=self.url)
@@ -0,0 +1,109 @@
+"""
+Wire format codecs for car payloads exchanged between the MCP server and client.
+
+The default `json` encoding sends a list of car dictionaries, repeating every field
+name in every row. The `columnar` encoding sends one array per field instead and
+dictionary-encodes the categorical fields (brand, model, fuel, ...), so each
+distinct value is only sent once and rows reference it by index.
+
+Example of a columnar `fetch_data` response:
+    {
+        "encoding": "columnar",
+        "cars": {
+            "count": 2,
+            "fields": ["id", "brand", "price"],
+            "columns": {"id": [1, 2], "brand": [0, 0], "price": [100.0, 200.0]},
+            "dictionaries": {"brand": ["Toyota"]}
+        }
+    }
+
+Dependencies:
+    - json: For compact JSON serialization
+"""
+
+import json
+
+JSON_ENCODING = "json"
+COLUMNAR_ENCODING = "columnar"
+ENCODINGS = (JSON_ENCODING, COLUMNAR_ENCODING)
+
+CATEGORICAL_FIELDS = ("brand", "model", "fuel", "color", "transmission", "status")
+
+
+def encode_columnar(rows):
+    """
+    Encode a list of car dictionaries in the columnar format.
+
+    Args:
+        rows (list[dict]): Car dictionaries sharing the same keys, as produced by `Car.to_dict`.
+
+    Returns:
+        dict: The columnar payload.
+    """
+    fields = list(rows[0]) if rows else []
+    columns = {}
+    dictionaries = {}
+
+    for field in fields:
+        values = [row[field] for row in rows]
+        if field in CATEGORICAL_FIELDS:
+            index = {}
+            columns[field] = [index.setdefault(value, len(index)) for value in values]
+            dictionaries[field] = list(index)
+        else:
+            columns[field] = values
+
+    return {
+        "count": len(rows),
+        "fields": fields,
+        "columns": columns,
+        "dictionaries": dictionaries,
+    }
+
+
+def decode_columnar(payload):
+    """
+    Decode a columnar payload back into a list of car dictionaries.
+
+    Args:
+        payload (dict): A payload produced by `encode_columnar`.
+
+    Returns:
+        list[dict]: The decoded car dictionaries.
+    """
+    fields = payload["fields"]
+    dictionaries = payload.get("dictionaries", {})
+    columns = []
+
+    for field in fields:
+        column = payload["columns"][field]
+        if field in dictionaries:
+            lookup = dictionaries[field]
+            column = [lookup[code] for code in column]
+        columns.append(column)
+
+    return [dict(zip(fields, values)) for values in zip(*columns)]
+
+
+def dumps(payload):
+    """Serialize a payload as compact JSON text, without indentation or spaces."""
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def decode_cars(data):
+    """
+    Extract the car dictionaries from a `fetch_data` response in any supported encoding.
+
+    Args:
+        data (dict): The parsed tool response.
+
+    Returns:
+        list[dict]: The car dictionaries, or an empty list if the response has no cars.
+    """
+    if not data or "cars" not in data:
+        return []
+
+    if data.get("encoding") == COLUMNAR_ENCODING:
+        return decode_columnar(data["cars"])
+
+    return data["cars"]
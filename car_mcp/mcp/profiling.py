@@ -0,0 +1,310 @@
+"""
+On-demand profiling of the MCP server's fetch_data calls.
+
+A profiling session runs for a number of calls or seconds, whichever comes first.
+While it is active, every profiled call is run under cProfile, a sampler thread
+records the stack of the calling thread every few milliseconds, and the time spent
+in each phase of the call is measured:
+
+    - query: executing SQL statements (SQLAlchemy cursor execution events)
+    - hydration: the rest of the search, mostly fetching rows and building Car objects
+    - to_dict: converting Car objects to dictionaries
+    - encoding: encoding the response as JSON
+
+When the session ends, the cProfile statistics (`.pstats`, readable with
+`python -m pstats` or snakeviz), the sampled stacks in collapsed format (`.collapsed`,
+the input of flamegraph.pl and speedscope) and the phase timings (`.json`) are written
+to `config.MCP_PROFILE_DIR`. Nothing is hooked while no session is active.
+
+One call is profiled at a time. Phases are only timed on the profiled call's thread,
+and SQL statements only count when they run in its context, which the partition
+fan-out threads inherit, so concurrent unprofiled calls do not add to its timings.
+
+If cProfile cannot be enabled, typically because another profiler is active, calls
+are still timed and sampled and the error is reported in the session summary.
+
+Dependencies:
+    - cProfile: For deterministic profiling
+    - contextvars: For attributing SQL statements to the profiled call
+    - sqlalchemy: For timing SQL statement execution
+"""
+
+import contextvars
+import cProfile
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from car_mcp import config
+
+PHASES = ("query", "hydration", "to_dict", "encoding")
+
+_lock = threading.Lock()
+_session = None
+# Phase timings of the profiled call, set in its context only.
+_call = contextvars.ContextVar("profiled_call", default=None)
+
+
+class ProfileSession:
+    """
+    State of one profiling session.
+
+    Attributes:
+        calls (int): Number of calls to profile, 0 for no limit.
+        seconds (float): Duration of the session, 0 for no limit.
+        interval (float): Seconds between stack samples.
+        records (list[dict]): Phase timings of every profiled call, in seconds.
+        profile_error (str | None): Why cProfile could not be enabled, if it failed.
+    """
+
+    def __init__(self, calls=0, seconds=0.0, interval=0.001):
+        self.calls = calls
+        self.seconds = seconds
+        self.interval = interval
+        self.records = []
+        self.started = time.time()
+        self.profile = cProfile.Profile()
+        self.profile_error = None
+        self.samples = {}
+        self.current = None
+        self.thread_id = None
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._sample, name="profiling-sampler", daemon=True
+        )
+        self._timer = threading.Timer(seconds, stop) if seconds else None
+
+    def start(self):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        self._sampler.start()
+        if self._timer is not None:
+            self._timer.daemon = True
+            self._timer.start()
+
+    def finish(self):
+        self._stopped.set()
+        if self._sampler.is_alive() and self._sampler is not threading.current_thread():
+            self._sampler.join()
+        if self._timer is not None:
+            self._timer.cancel()
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    def done(self):
+        return bool(self.calls) and len(self.records) >= self.calls
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            thread_id = self.thread_id
+            if self.current is None or thread_id is None:
+                continue
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                filename = os.path.basename(code.co_filename)
+                stack.append(f"{code.co_name} ({filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            self.samples[key] = self.samples.get(key, 0) + 1
+
+    def summary(self):
+        """Summarize the phase timings of the profiled calls, in milliseconds."""
+        phases = {}
+        for name in ("total",) + PHASES:
+            values = sorted(record[name] * 1000 for record in self.records)
+            if not values:
+                continue
+            phases[name] = {
+                "total_ms": round(sum(values), 3),
+                "mean_ms": round(statistics.fmean(values), 3),
+                "p95_ms": round(values[max(0, int(len(values) * 0.95) - 1)], 3),
+            }
+        summary = {"calls": len(self.records), "phases": phases}
+        if self.profile_error is not None:
+            summary["profile_error"] = self.profile_error
+        return summary
+
+    def dump(self, directory):
+        """Write the pstats, collapsed stacks and phase timings, returning their paths."""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        prefix = os.path.join(directory, f"fetch_data-{stamp}")
+
+        paths = {
+            "pstats": f"{prefix}.pstats",
+            "collapsed": f"{prefix}.collapsed",
+            "phases": f"{prefix}.json",
+        }
+        self.profile.dump_stats(paths["pstats"])
+        with open(paths["collapsed"], "w", encoding="utf-8") as file:
+            for stack, count in sorted(self.samples.items()):
+                file.write(f"{stack} {count}\n")
+        with open(paths["phases"], "w", encoding="utf-8") as file:
+            json.dump({**self.summary(), "records": self.records}, file, indent=2)
+
+        return paths
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("profiling_started")
+    session = _session
+    if not started or session is None:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    record = _call.get()
+    with _lock:
+        if record is not None and record is session.current:
+            record["query"] += elapsed
+
+
+def start(calls=0, seconds=0.0, interval_ms=1.0):
+    """
+    Start a profiling session.
+
+    Args:
+        calls (int, optional): Stop after this many profiled calls, 0 for no limit.
+        seconds (float, optional): Stop after this many seconds, 0 for no limit.
+        interval_ms (float, optional): Milliseconds between stack samples. Defaults to 1.
+
+    Returns:
+        dict: The session status.
+
+    Raises:
+        ValueError: If a session is already running or it would never stop.
+    """
+    global _session
+    if not calls and not seconds:
+        raise ValueError("A profiling session needs a number of calls or seconds")
+
+    with _lock:
+        if _session is not None:
+            raise ValueError("A profiling session is already running")
+        _session = ProfileSession(calls, seconds, interval_ms / 1000)
+        _session.start()
+
+    return status()
+
+
+def stop():
+    """
+    Stop the running profiling session and write its results.
+
+    Returns:
+        dict | None: The phase summary and the paths of the written files, or None
+                     when no session was running.
+    """
+    global _session
+    with _lock:
+        session, _session = _session, None
+    if session is None:
+        return None
+
+    session.finish()
+    return {**session.summary(), "files": session.dump(config.MCP_PROFILE_DIR)}
+
+
+def status():
+    """
+    Describe the running profiling session.
+
+    Returns:
+        dict: 'active' and, for a running session, its limits and progress.
+    """
+    session = _session
+    if session is None:
+        return {"active": False}
+    described = {
+        "active": True,
+        "calls": len(session.records),
+        "max_calls": session.calls,
+        "elapsed_s": round(time.time() - session.started, 3),
+        "max_seconds": session.seconds,
+    }
+    if session.profile_error is not None:
+        described["profile_error"] = session.profile_error
+    return described
+
+
+@contextmanager
+def profiled():
+    """
+    Profile the enclosed call when a session is running.
+
+    Yields:
+        bool: Whether the call is being profiled.
+    """
+    session = _session
+    if session is None:
+        yield False
+        return
+
+    record = dict.fromkeys(("total", "search") + PHASES, 0.0)
+    with _lock:
+        claimed = session.current is None
+        if claimed:
+            session.current = record
+            session.thread_id = threading.get_ident()
+    if not claimed:
+        yield False
+        return
+    token = _call.set(record)
+
+    started = time.perf_counter()
+    try:
+        session.profile.enable()
+        enabled = True
+    except ValueError as e:
+        # Only one profiler can be active at a time; keep timing the call without it.
+        session.profile_error = str(e)
+        enabled = False
+    try:
+        yield True
+    finally:
+        if enabled:
+            session.profile.disable()
+        record["total"] = time.perf_counter() - started
+        _call.reset(token)
+        record["hydration"] = max(record.pop("search") - record["query"], 0.0)
+        with _lock:
+            session.current = None
+            session.records.append(record)
+        if session.done():
+            stop()
+
+
+@contextmanager
+def phase(name):
+    """
+    Time a phase of the profiled call; does nothing when no call is profiled.
+
+    Args:
+        name (str): 'search' (split into query and hydration), 'to_dict' or 'encoding'.
+    """
+    session = _session
+    record = None
+    if session is not None:
+        with _lock:
+            if session.thread_id == threading.get_ident():
+                record = session.current
+    if record is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record[name] += time.perf_counter() - started
@@ -2,23 +2,185 @@
 MCP (Model-Client-Protocol) server implementation for car search system.
 
 This module provides a FastMCP server that handles car data requests using
-Server-Sent Events (SSE). It exposes an endpoint for fetching car data based
-on specified filters.
+Server-Sent Events (SSE) or the stateless Streamable HTTP transport. It exposes
+an endpoint for fetching car data based on specified filters, ranked best deals,
+similar car recommendations, a readiness probe at `/ready` and admission
+counters at `/stats`.
+
+Every tool call goes through admission control (see admission.py): per-client rate
+limits, a concurrency limit with a bounded wait queue, and a cost check that limits
+or rejects searches estimated to return too many cars. The database work then runs
+in a worker thread under a deadline of `config.MCP_CALL_TIMEOUT` seconds, after
+which SQLite interrupts the query.
+
+The inventory version, bumped by every insert, is published as the
+`inventory://version` resource. Over SSE, where sessions are long-lived and the
+server can push messages, clients register with the `watch_inventory` tool and are
+sent a `resources/updated` notification when the version changes, which they use to
+drop cached results. The stateless Streamable HTTP app cannot push, so
+`watch_inventory` tells its clients to check the version on every call instead.
+
+The Streamable HTTP app is stateless, so it can be served by several uvicorn
+workers sharing the same SQLite database:
+    uvicorn car_mcp.mcp.server:create_app --factory --workers 4
 
 Dependencies:
-    - db_manager: For database operations
+    - config: For transport and deployment settings
+    - codec: For the compact columnar wire format
+    - cache: For the inventory version resource URI
+    - admission: For rate, concurrency and cost limits
+    - profiling: For on-demand profiling of fetch_data
+    - db_manager: For database operations and query deadlines
+    - relaxation: For estimating the cost of relaxed searches
+    - cost: For adding up the estimates of several searches
+    - partitioned: For catalogs split across several SQLite files
+    - similarity: For similar car recommendations, imported on first use
     - mcp.server.fastmcp: For FastMCP server implementation
+    - pydantic: For resource URIs and encoding profiled results
+    - starlette: For the readiness probe response
 """
 
-from mcp.server.fastmcp import FastMCP
+import asyncio
+import json
+import logging
+import threading
+import weakref
+
+from mcp.server.fastmcp import Context, FastMCP
+from pydantic import AnyUrl, TypeAdapter
+from starlette.responses import JSONResponse
+
+from car_mcp import config
+from car_mcp.database import cost, relaxation
+from car_mcp.database.db_manager import QueryTimeout, has_cars, query_deadline
+from car_mcp.database.partitioned import open_catalog, partition_urls
+from car_mcp.database.ranking import check_k
+from car_mcp.mcp import codec, profiling
+from car_mcp.mcp.admission import AdmissionController, Rejected
+from car_mcp.mcp.cache import INVENTORY_VERSION_URI
+
+mcp = FastMCP(
+    "car",
+    host=config.MCP_HOST,
+    port=config.MCP_PORT,
+    stateless_http=True,
+    json_response=True,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Encodes results as FastMCP does, to time the encoding phase of profiled calls.
+_json = TypeAdapter(dict)
+_similarity_index = None
+_similarity_lock = threading.Lock()
+_admission = None
+_subscribers = weakref.WeakSet()
+_version_watcher = None
+# Only the SSE transport keeps sessions open to push notifications on; set by main().
+_push_notifications = False
 
-from car_mcp.database.db_manager import DatabaseManager
 
-mcp = FastMCP("car")
+def _db_manager():
+    return open_catalog(read_only=config.DB_READ_ONLY)
+
+
+def _get_similarity_index():
+    global _similarity_index
+    with _similarity_lock:
+        if _similarity_index is None:
+            from car_mcp.database.similarity import SimilarityIndex
+
+            _similarity_index = SimilarityIndex()
+        return _similarity_index
+
+
+def _get_admission():
+    global _admission
+    if _admission is None:
+        _admission = AdmissionController()
+    return _admission
+
+
+def _client_id():
+    try:
+        request = mcp.get_context().request_context.request
+    except (LookupError, ValueError):
+        # Called outside of an MCP request, e.g. by a benchmark.
+        request = None
+    if request is None or request.client is None:
+        return "local"
+    # Clients could pick a fresh id per call, so only a trusted proxy may set it.
+    if request.client.host in config.MCP_TRUSTED_PROXIES:
+        return request.headers.get("x-client-id") or request.client.host
+    return request.client.host
+
+
+async def _admitted(call, *args):
+    """
+    Run the blocking part of a tool call in a worker thread, under admission control
+    and the per-call query deadline.
+
+    Raises:
+        Rejected: If the call was turned away or its queries ran past the deadline.
+    """
+    admission = _get_admission()
+    async with admission.admit(_client_id()):
+        try:
+            with query_deadline(config.MCP_CALL_TIMEOUT):
+                work = asyncio.ensure_future(asyncio.to_thread(call, *args))
+                try:
+                    return await asyncio.shield(work)
+                finally:
+                    if not work.done():
+                        # Cancelled, but the worker thread cannot be stopped: keep its
+                        # slot until it finishes so the concurrency limit holds.
+                        await _finished(work)
+        except QueryTimeout as e:
+            admission.counters["timed_out"] += 1
+            raise Rejected("timeout", f"{e}; narrow the search down") from e
+
+
+async def _finished(work):
+    while not work.done():
+        try:
+            await asyncio.wait({work})
+        except asyncio.CancelledError:
+            pass
+    if not work.cancelled():
+        # Nobody awaits the result any more; retrieve the error so it is not logged.
+        work.exception()
+
+
+def _row_limit(db_manager, filters, relax=False):
+    admission = _get_admission()
+    if not admission.max_rows:
+        return None
+
+    estimate = db_manager.estimate_rows(filters)
+    if relax and estimate == 0:
+        # Nothing matches as given, so the loosest relaxation bounds the result.
+        loosest, _ = relaxation.relaxation_candidates(filters)[-1]
+        estimate = db_manager.estimate_rows(loosest)
+    return admission.row_limit(estimate)
+
+
+def _encoded(rows, response, encoding):
+    if encoding == codec.COLUMNAR_ENCODING:
+        return codec.dumps(
+            {
+                "encoding": codec.COLUMNAR_ENCODING,
+                "cars": codec.encode_columnar(rows),
+                **response,
+            }
+        )
+    return {"cars": rows, **response}
 
 
 @mcp.tool("fetch_data")
-async def fetch_data(filters: dict):
+async def fetch_data(
+    filters: dict, encoding: str = codec.JSON_ENCODING, relax: bool = False
+):
     """
     Fetch car data from the database based on provided filters.
 
@@ -29,16 +191,381 @@ async def fetch_data(filters: dict):
     Args:
         filters (dict): Search criteria for filtering cars. Can include various
                        car attributes such as brand, model, year, etc.
+        encoding (str, optional): Wire format requested by the client, either
+                       'json' (default) or 'columnar'.
+        relax (bool, optional): When nothing matches, relax the filters (wider
+                       price/year ranges, then no color, then no transmission)
+                       and return the closest non-empty result. Defaults to False.
 
     Returns:
-        dict: A dictionary containing a list of car dictionaries under the 'cars' key.
+        dict | str: A dictionary containing a list of car dictionaries under the 'cars' key.
               Example: {'cars': [{'brand': 'Toyota', 'model': 'Corolla', ...}, ...]}
+              With relax, a 'relaxed' key lists the relaxed constraints.
+              When the search was estimated too expensive and limited to
+              `config.MCP_MAX_ROWS` cars, 'truncated' is true.
+              With the 'columnar' encoding, the compact JSON text of
+              {'encoding': 'columnar', 'cars': {...}} is returned instead.
+
+    Raises:
+        Rejected: If admission control turned the call away.
+    """
+    return await _admitted(_fetch_data, filters or {}, encoding, relax)
+
+
+def _fetch_data(filters, encoding, relax):
+    with profiling.profiled() as profiling_call:
+        db_manager = _db_manager()
+        response = {}
+
+        with profiling.phase("search"):
+            limit = _row_limit(db_manager, filters, relax)
+            if relax:
+                cars, response["relaxed"] = db_manager.search_relaxed(filters, limit=limit)
+            else:
+                cars = db_manager.search(filters, limit=limit)
+            if limit is not None and len(cars) >= limit:
+                response["truncated"] = True
+        with profiling.phase("to_dict"):
+            rows = [car.to_dict() for car in cars]
+
+        with profiling.phase("encoding"):
+            encoded = _encoded(rows, response, encoding)
+            if profiling_call and isinstance(encoded, dict):
+                # Encode as FastMCP will, only to time it; the dict is still returned.
+                _json.dump_json(encoded, fallback=str, indent=2)
+
+        return encoded
+
+
+@mcp.tool("fetch_many")
+async def fetch_many(filters: list[dict | None], encoding: str = codec.JSON_ENCODING):
+    """
+    Fetch car data for several filter sets in a single call.
+
+    This function is registered as an MCP tool. All filter sets are searched with one
+    query over a shared connection, and every car is sent once even when several
+    filter sets match it.
+
+    Args:
+        filters (list[dict]): Search criteria for each result set, as accepted by fetch_data.
+                       A null filter set matches every car, like an empty one.
+        encoding (str, optional): Wire format requested by the client, either
+                       'json' (default) or 'columnar'.
+
+    Returns:
+        dict | str: The unique car dictionaries under 'cars' and, under 'results', the
+              car ids of each result set keyed by the index of its filter set.
+              Example: {'cars': [{'id': 1, ...}, {'id': 7, ...}],
+                        'results': {'0': [1, 7], '1': [7]}}
+              With the 'columnar' encoding, the compact JSON text of the same
+              payload, with 'cars' encoded column by column, is returned instead.
+
+    Raises:
+        Rejected: If admission control turned the call away. Expensive filter sets
+            are rejected whatever the cost policy, since they cannot be limited.
+    """
+    filters = [filter_set or {} for filter_set in filters or []]
+    return await _admitted(_fetch_many, filters, encoding)
+
+
+def _fetch_many(filters, encoding):
+    db_manager = _db_manager()
+    admission = _get_admission()
+    if admission.max_rows:
+        admission.row_limit(
+            cost.add_estimates(db_manager.estimate_many(filters)), can_limit=False
+        )
+
+    results = db_manager.search_many(filters)
+
+    cars = {}
+    for result in results.values():
+        for car in result:
+            cars.setdefault(car.id, car)
+    rows = [car.to_dict() for car in cars.values()]
+    ids = {str(index): [car.id for car in result] for index, result in results.items()}
+    return _encoded(rows, {"results": ids}, encoding)
+
+
+@mcp.tool("fetch_best_deals")
+async def fetch_best_deals(
+    filters: dict,
+    k: int = 5,
+    ranking: str = "best_value",
+    weights: dict | None = None,
+    encoding: str = codec.JSON_ENCODING,
+):
+    """
+    Fetch the best deals among the cars matching the filters.
+
+    This function is registered as an MCP tool. Cars are ranked by a weighted score
+    of price, mileage, year and equipment and only the top k are sent.
+
+    Args:
+        filters (dict): Search criteria for filtering cars, as accepted by fetch_data.
+        k (int, optional): Number of cars to return. Defaults to 5.
+        ranking (str, optional): 'best_value' (default), weighing price, mileage, year,
+                       air conditioning and electric steering, or 'cheapest'.
+        weights (dict, optional): Weights overriding the ranking's, keyed by 'price',
+                       'mileage', 'year', 'air_conditioning' or 'electric_steering'.
+        encoding (str, optional): Wire format requested by the client, either
+                       'json' (default) or 'columnar'.
+
+    Returns:
+        dict | str: The car dictionaries under 'cars', best deal first, and their scores
+              (lower is better) under 'scores'.
+              Example: {'cars': [{'brand': 'Fiat', 'price': 30000.0, ...}], 'scores': [-1001.5]}
+              With the 'columnar' encoding, the compact JSON text of the same
+              payload, with 'cars' encoded column by column, is returned instead.
+    """
+    return await _admitted(_fetch_best_deals, filters or {}, k, ranking, weights, encoding)
+
+
+def _fetch_best_deals(filters, k, ranking, weights, encoding):
+    # Validated before the cost check: row_limit treats a negative k as unlimited.
+    k = check_k(k)
+    k = _get_admission().row_limit(k) or k
+    ranked = _db_manager().search_ranked(filters, k, ranking, weights)
+    rows = [car.to_dict() for car, _ in ranked]
+    return _encoded(rows, {"scores": [score for _, score in ranked]}, encoding)
+
+
+@mcp.tool("fetch_facets")
+async def fetch_facets(filters: dict):
+    """
+    Summarize the cars matching the filters per brand, fuel, transmission and status.
+
+    This function is registered as an MCP tool. Queries filtering only on brand,
+    fuel, transmission and price are answered from the precomputed summaries when
+    they are enabled; other filters are aggregated from the car table.
+
+    Args:
+        filters (dict): Search criteria for filtering cars, as accepted by fetch_data.
+
+    Returns:
+        dict: A dictionary with the 'buckets' list and the 'source' used to compute it.
+              Example: {'source': 'summary', 'buckets': [{'brand': 'Toyota', 'count': 12,
+              'min_price': 15000.0, 'median_price': 60000.0, 'cheapest_ids': [...], ...}]}
+    """
+    return await _admitted(lambda: _db_manager().facets(filters or {}))
+
+
+@mcp.tool("similar_cars")
+async def similar_cars(car_id: int, k: int = 5, encoding: str = codec.JSON_ENCODING):
+    """
+    Recommend the cars most similar to a given car.
+
+    This function is registered as an MCP tool. Similarity combines price, year,
+    mileage, motorization, doors and equipment, scaled by their spread, with the
+    brand, fuel, transmission, color and status. The in-memory index is loaded on
+    the first call and afterwards only reads the cars inserted since the last call;
+    it is reloaded when cars were deleted or a new snapshot is served.
+
+    Args:
+        car_id (int): Id of the reference car.
+        k (int, optional): Number of similar cars to return. Defaults to 5.
+        encoding (str, optional): Wire format requested by the client, either
+                       'json' (default) or 'columnar'.
+
+    Returns:
+        dict | str: The similar car dictionaries under 'cars', closest first, and their
+              distances to the reference car under 'distances'. Both lists are empty
+              when the car does not exist.
+              Example: {'cars': [{'id': 42, 'brand': 'Toyota', ...}], 'distances': [0.37]}
+              With the 'columnar' encoding, the compact JSON text of the same
+              payload, with 'cars' encoded column by column, is returned instead.
+    """
+    return await _admitted(_similar_cars, car_id, k, encoding)
+
+
+def _similar_cars(car_id, k, encoding):
+    k = _get_admission().row_limit(k) or k
+    db_manager = _db_manager()
+
+    # The index is shared by the worker threads; it serializes its own refreshes.
+    index = _get_similarity_index()
+    index.refresh(db_manager)
+    try:
+        neighbours = index.nearest(car_id, k)
+    except KeyError:
+        neighbours = []
+
+    distances = dict(neighbours)
+    cars = db_manager.get_cars(distances)
+    rows = [car.to_dict() for car in cars]
+    return _encoded(rows, {"distances": [distances[car.id] for car in cars]}, encoding)
+
+
+async def profile_server(action: str = "status", calls: int = 0, seconds: float = 0):
+    """
+    Control on-demand profiling of fetch_data (admin tool).
+
+    Registered as an MCP tool only when `config.MCP_PROFILING` is set. While a session
+    runs, fetch_data calls are profiled with cProfile and a stack sampler and their
+    query, ORM hydration, to_dict and JSON encoding phases are timed. The results are
+    written to `config.MCP_PROFILE_DIR` when the session ends.
+
+    Args:
+        action (str, optional): 'start', 'stop' or 'status' (default).
+        calls (int, optional): With 'start', stop after this many calls.
+        seconds (float, optional): With 'start', stop after this many seconds.
+
+    Returns:
+        dict: The session status; for 'stop', the phase summary and the written files.
+              Example: {'calls': 20, 'phases': {'query': {'mean_ms': 1.2, ...}, ...},
+                        'files': {'pstats': 'profiles/fetch_data-....pstats', ...}}
+    """
+    if action == "start":
+        return profiling.start(calls=calls, seconds=seconds)
+    if action == "stop":
+        # Writing the profiles is blocking file I/O.
+        return await asyncio.to_thread(profiling.stop) or {"active": False}
+    if action == "status":
+        return profiling.status()
+    raise ValueError(f"Unknown action '{action}', expected 'start', 'stop' or 'status'")
+
+
+if config.MCP_PROFILING:
+    mcp.tool("profile_server")(profile_server)
+
+
+@mcp.resource(INVENTORY_VERSION_URI, mime_type="application/json")
+def inventory_version():
+    """
+    Current inventory version, bumped every time cars are inserted.
+
+    Returns:
+        str: JSON text of {'version': <int>}.
+    """
+    return json.dumps({"version": _db_manager().version()})
+
+
+@mcp.tool("watch_inventory")
+async def watch_inventory(ctx: Context):
+    """
+    Register the calling session for inventory version update notifications.
+
+    This function is registered as an MCP tool. Over SSE, the session is sent a
+    `resources/updated` notification for `inventory://version` whenever the version
+    changes, until it is closed. The stateless Streamable HTTP transport cannot push
+    notifications, so nothing is registered and 'push' is false: clients must then
+    check the version before trusting cached results.
+
+    Returns:
+        dict: The current version and whether update notifications will be pushed.
+              Example: {'version': 3, 'push': True}
+    """
+    global _version_watcher
+    version = await asyncio.to_thread(lambda: _db_manager().version())
+    if not _push_notifications:
+        return {"version": version, "push": False}
+
+    _subscribers.add(ctx.session)
+    if _version_watcher is None or _version_watcher.done():
+        _version_watcher = asyncio.get_running_loop().create_task(_watch_version())
+    return {"version": version, "push": True}
+
+
+async def _watch_version():
+    """Poll the inventory version and notify the subscribed sessions when it changes."""
+    version = await asyncio.to_thread(lambda: _db_manager().version())
+
+    while _subscribers:
+        await asyncio.sleep(config.MCP_VERSION_POLL_INTERVAL)
+        try:
+            current = await asyncio.to_thread(lambda: _db_manager().version())
+        except Exception as e:
+            logger.warning("Could not read the inventory version: %s", e)
+            continue
+        if current == version:
+            continue
+
+        version = current
+        for session in list(_subscribers):
+            try:
+                await session.send_resource_updated(AnyUrl(INVENTORY_VERSION_URI))
+            except Exception:
+                _subscribers.discard(session)
+
+
+@mcp.custom_route("/ready", methods=["GET"])
+async def ready(request):
+    """
+    Readiness probe used by orchestrators and load balancers.
+
+    The database files are opened read-only, so probing never creates an empty
+    database in place of a missing one.
+
+    Returns:
+        JSONResponse: 200 with {'status': 'ready'} when the `car` table exists and
+                      has rows, 503 otherwise.
+    """
+    if config.DB_PARTITIONS > 1:
+        urls = partition_urls(config.DB_URL, config.DB_PARTITIONS)
+    else:
+        urls = [config.DB_URL]
+
+    try:
+        # Every partition must exist; a brand hash may leave some of them empty.
+        stocked = [await asyncio.to_thread(has_cars, url) for url in urls]
+    except Exception as e:
+        return JSONResponse({"status": "unavailable", "detail": str(e)}, status_code=503)
+    if not any(stocked):
+        return JSONResponse(
+            {"status": "unavailable", "detail": "the car table is empty"}, status_code=503
+        )
+
+    return JSONResponse({"status": "ready"})
+
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats(request):
+    """
+    Admission control counters of this server process.
+
+    Returns:
+        JSONResponse: {'admission': {'admitted': ..., 'shed_queue_full': ...,
+                      'timed_out': ..., 'in_flight': ..., 'waiting': ...}}
+    """
+    return JSONResponse({"admission": _get_admission().stats()})
+
+
+def create_app():
+    """
+    Build the stateless Streamable HTTP ASGI application.
+
+    Used as an uvicorn factory so that every worker process builds its own app.
+
+    Returns:
+        starlette.applications.Starlette: The ASGI application.
+    """
+    return mcp.streamable_http_app()
+
+
+def main():
+    """
+    Run the MCP server with the transport configured in `config.MCP_TRANSPORT`.
+
+    The streamable-http transport runs under uvicorn with `config.MCP_WORKERS`
+    processes, letting in-flight requests finish for up to
+    `config.MCP_SHUTDOWN_TIMEOUT` seconds on SIGTERM/SIGINT.
     """
-    db_manager = DatabaseManager()
-    cars = db_manager.search(filters or {})
+    global _push_notifications
+    if config.MCP_TRANSPORT == "streamable-http":
+        import uvicorn
 
-    return {"cars": [car.to_dict() for car in cars]}
+        uvicorn.run(
+            "car_mcp.mcp.server:create_app",
+            factory=True,
+            host=config.MCP_HOST,
+            port=config.MCP_PORT,
+            workers=config.MCP_WORKERS,
+            timeout_graceful_shutdown=config.MCP_SHUTDOWN_TIMEOUT,
+        )
+    else:
+        _push_notifications = True
+        mcp.run(transport="sse")
 
 
 if __name__ == "__main__":
-    mcp.run(transport="sse")
+    main()
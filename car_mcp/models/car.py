@@ -7,7 +7,7 @@ and electric steering. It also provides methods to create an instance from a dic
 convert an instance to a dictionary.
 """
 
-from sqlalchemy import Boolean, Column, Float, Integer, String
+from sqlalchemy import Boolean, Column, Float, Index, Integer, String
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -41,6 +41,10 @@ class Car(Base):
             Converts the `Car` instance to a dictionary.
     """
     __tablename__ = "car"
+    __table_args__ = (
+        # Serves price ranges and "cheapest first" top-k queries in index order.
+        Index("ix_car_price", "price"),
+    )
 
     id = Column("id", Integer, primary_key=True, autoincrement=True)
     brand = Column("brand", String(50), nullable=False)
@@ -0,0 +1,74 @@
+"""
+This module defines the `CarSummary` class, a precomputed summary of the `car` table.
+
+Each row summarizes one (brand, fuel, transmission, status) bucket with its number of
+cars, price statistics and the ids of its cheapest cars. The table is maintained by
+`DatabaseManager.insert` when summaries are enabled and lets common browse queries be
+answered without scanning the `car` table.
+"""
+
+import json
+
+from sqlalchemy import Column, Float, Integer, String, Text
+
+from car_mcp.models.car import Base
+
+
+class CarSummary(Base):
+    """
+    Represents the summary of one bucket of cars.
+
+    Attributes:
+        brand (str): The brand of the cars in the bucket.
+        fuel (str): The fuel type of the cars in the bucket.
+        transmission (str): The transmission type of the cars in the bucket.
+        status (str): The status of the cars in the bucket (e.g., Novo, Usado).
+        count (int): The number of cars in the bucket.
+        min_price (float): The lowest price in the bucket.
+        max_price (float): The highest price in the bucket.
+        p25_price (float): The 25th percentile price.
+        median_price (float): The median price.
+        p75_price (float): The 75th percentile price.
+        cheapest_ids (str): JSON list with the ids of the cheapest cars, cheapest first.
+        cheapest_max_price (float): The price of the last car in `cheapest_ids`. Every car
+            of the bucket cheaper than this is listed in `cheapest_ids`.
+        version (int): The inventory version (`PRAGMA user_version`) of the database
+            when the bucket was computed.
+
+    Methods:
+        to_dict() -> dict:
+            Converts the `CarSummary` instance to a dictionary.
+    """
+    __tablename__ = "car_summary"
+
+    brand = Column("brand", String(50), primary_key=True)
+    fuel = Column("fuel", String(20), primary_key=True)
+    transmission = Column("transmission", String(20), primary_key=True)
+    # Cars may have no status; NULL stays a bucket of its own.
+    status = Column("status", String, primary_key=True, nullable=True)
+    count = Column("count", Integer, nullable=False)
+    min_price = Column("min_price", Float, nullable=False)
+    max_price = Column("max_price", Float, nullable=False)
+    p25_price = Column("p25_price", Float, nullable=False)
+    median_price = Column("median_price", Float, nullable=False)
+    p75_price = Column("p75_price", Float, nullable=False)
+    cheapest_ids = Column("cheapest_ids", Text, nullable=False, default="[]")
+    cheapest_max_price = Column("cheapest_max_price", Float, nullable=False)
+    version = Column("version", Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        """Converts the `CarSummary` instance to a dictionary."""
+        return {
+            "brand": self.brand,
+            "fuel": self.fuel,
+            "transmission": self.transmission,
+            "status": self.status,
+            "count": self.count,
+            "min_price": self.min_price,
+            "max_price": self.max_price,
+            "p25_price": self.p25_price,
+            "median_price": self.median_price,
+            "p75_price": self.p75_price,
+            "cheapest_ids": json.loads(self.cheapest_ids),
+            "cheapest_max_price": self.cheapest_max_price,
+        }
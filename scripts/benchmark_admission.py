@@ -0,0 +1,102 @@
+"""
+Admission control benchmark.
+
+This script loads synthetic cars into a temporary database and runs, in process, a
+burst of broad `fetch_data` calls (no filters, a full table dump) together with
+narrow searches, first without admission control and then with the configured
+limits (concurrency limit and wait queue, cost estimation limiting broad searches
+to MCP_MAX_ROWS cars, per-call deadline). It prints the latency of the narrow
+searches that were served, how many were shed, the number of cars each broad call
+returned and the admission counters.
+
+Usage:
+    python -m scripts.benchmark_admission [--rows 200000] [--broad 4] [--narrow 20]
+
+Dependencies:
+    - pandas: For loading the synthetic data
+    - server: The fetch_data tool under test
+    - admission: AdmissionController under test
+    - sample_data: Synthetic car data
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+from car_mcp import config
+from car_mcp.database.db_manager import DatabaseManager
+from car_mcp.mcp import server
+from car_mcp.mcp.admission import AdmissionController, Rejected
+from scripts.sample_data import sample_cars
+
+NARROW_FILTERS = [
+    {"brand": "Toyota", "model": "Corolla", "year_min": 2021},
+    {"brand": "Fiat", "price_max": 40000},
+    {"fuel": "Diesel", "transmission": "Manual", "year_min": 2022},
+]
+
+
+async def _timed(filters):
+    started = time.perf_counter()
+    try:
+        result = await server.fetch_data(filters)
+    except Rejected as e:
+        return time.perf_counter() - started, e.reason
+    return time.perf_counter() - started, len(result["cars"])
+
+
+async def _scenario(broad, narrow):
+    calls = [_timed({}) for _ in range(broad)]
+    calls += [_timed(NARROW_FILTERS[i % len(NARROW_FILTERS)]) for i in range(narrow)]
+    results = await asyncio.gather(*calls)
+    return results[:broad], results[broad:]
+
+
+def main():
+    """Run both scenarios and print one line each, followed by the admission counters."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--broad", type=int, default=4)
+    parser.add_argument("--narrow", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        config.DB_URL = f"sqlite:///{os.path.join(directory, 'cars.db')}"
+        config.DB_PARTITIONS = 1
+        DatabaseManager(use_summaries=False).insert(
+            pd.DataFrame(sample_cars(args.rows, with_ids=False))
+        )
+
+        scenarios = [
+            ("unlimited", AdmissionController(max_concurrent=0, max_rows=0), 0),
+            ("admission", AdmissionController(), config.MCP_CALL_TIMEOUT),
+        ]
+        print(
+            f"{'scenario':<10} {'narrow p50':>11} {'narrow p95':>11} {'shed':>5} "
+            f"{'broad results':>28}"
+        )
+        for name, controller, call_timeout in scenarios:
+            server._admission = controller
+            config.MCP_CALL_TIMEOUT = call_timeout
+            broad, narrow = asyncio.run(_scenario(args.broad, args.narrow))
+
+            served = sorted(elapsed for elapsed, outcome in narrow if isinstance(outcome, int))
+            p50 = statistics.median(served) * 1000
+            p95 = served[max(0, int(len(served) * 0.95) - 1)] * 1000
+            shed = len(narrow) - len(served)
+            outcomes = ", ".join(str(outcome) for _, outcome in broad)
+            print(f"{name:<10} {p50:>9.1f}ms {p95:>9.1f}ms {shed:>5} {outcomes:>28}")
+
+        print(f"admission counters: {server._admission.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Partitioned catalog benchmark.
+
+This script loads the same synthetic cars into a single database and into a
+partitioned catalog, and compares the latency of broad searches, searches pinned to
+a brand (served by one partition) and ranked top-k searches (LIMIT pushed down to
+every partition, then merged).
+
+Usage:
+    python -m scripts.benchmark_partitions [--rows 200000] [--partitions 4] [--repeat 10]
+
+Dependencies:
+    - pandas: For loading the synthetic data
+    - db_manager, partitioned: Single database and partitioned catalog under test
+    - sample_data: Synthetic car data
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+from car_mcp.database.db_manager import DatabaseManager
+from car_mcp.database.partitioned import PartitionedCatalog
+from scripts.sample_data import sample_cars
+
+QUERIES = [
+    ("search", {"fuel": "Diesel", "price_max": 40000}),
+    ("search", {"brand": "Toyota", "year_min": 2020}),
+    ("search_ranked", {}),
+    ("search_ranked", {"brand": "Honda"}),
+]
+
+
+def _median_ms(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    """Run the benchmark and print one line per query."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    data_frame = pd.DataFrame(sample_cars(args.rows, with_ids=False))
+
+    with tempfile.TemporaryDirectory() as directory:
+        single = DatabaseManager(
+            f"sqlite:///{os.path.join(directory, 'single.db')}", use_summaries=False
+        )
+        catalog = PartitionedCatalog(
+            f"sqlite:///{os.path.join(directory, 'cars.db')}",
+            partitions=args.partitions,
+            use_summaries=False,
+        )
+        single.insert(data_frame)
+        catalog.insert(data_frame)
+
+        print(f"{'method':<14} {'filters':<40} {'single':>10} {'partitioned':>12}")
+        for method, filters in QUERIES:
+            single_ms = _median_ms(args.repeat, getattr(single, method), filters)
+            catalog_ms = _median_ms(args.repeat, getattr(catalog, method), filters)
+            print(f"{method:<14} {str(filters):<40} {single_ms:>8.1f}ms {catalog_ms:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Best deal ranking benchmark.
+
+This script loads synthetic cars into a temporary database and compares, for a few
+searches, fetching every match and sorting it in Python against the ranked search
+(`ORDER BY score LIMIT k` in SQLite) and the heap selection over cars in memory.
+
+Usage:
+    python -m scripts.benchmark_ranking [--rows 100000] [--k 5] [--repeat 10]
+
+Dependencies:
+    - pandas: For loading the synthetic data
+    - db_manager: DatabaseManager under test
+    - ranking: Score and heap selection under test
+    - sample_data: Synthetic car data
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+from car_mcp.database import ranking
+from car_mcp.database.db_manager import DatabaseManager
+from scripts.sample_data import sample_cars
+
+QUERIES = [
+    ("cheapest", {}),
+    ("cheapest", {"brand": "Toyota"}),
+    ("best_value", {}),
+    ("best_value", {"fuel": "Diesel", "price_max": 80000}),
+]
+
+
+def _median_ms(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def _search_and_sort(db_manager, filters, k, weights):
+    cars = db_manager.search(filters)
+    return sorted(cars, key=lambda car: (ranking.score(car, weights), car.id))[:k]
+
+
+def main():
+    """Run the benchmark and print one line per query."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_manager = DatabaseManager(
+            f"sqlite:///{os.path.join(directory, 'cars.db')}", use_summaries=False
+        )
+        db_manager.insert(pd.DataFrame(sample_cars(args.rows, with_ids=False)))
+
+        print(f"{'ranking':<12} {'filters':<42} {'sort all':>10} {'sql top-k':>10} {'heap':>10}")
+        for ranking_name, filters in QUERIES:
+            weights = ranking.resolve_weights(ranking_name)
+            sort_all = _median_ms(args.repeat, _search_and_sort, db_manager, filters, args.k, weights)
+            sql = _median_ms(
+                args.repeat, db_manager.search_ranked, filters, args.k, ranking_name
+            )
+            matches = db_manager.search(filters)
+            heap = _median_ms(args.repeat, ranking.top_k, matches, args.k, weights)
+            print(
+                f"{ranking_name:<12} {str(filters):<42} {sort_all:>8.1f}ms {sql:>8.1f}ms {heap:>8.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Similar car recommendation benchmark.
+
+This script fills a SimilarityIndex with synthetic cars in batches, the way
+incremental refreshes append newly inserted cars, and measures the latency of
+nearest-neighbour queries for random reference cars. The default of one million
+cars is the size the similar_cars tool is expected to answer in under 50 ms.
+
+Usage:
+    python -m scripts.benchmark_similarity [--rows 1000000] [--batch 100000] [--queries 50] [--k 5]
+
+Dependencies:
+    - similarity: SimilarityIndex under test
+    - sample_data: Synthetic car data
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from car_mcp.database.similarity import FEATURES, SimilarityIndex
+from scripts.sample_data import sample_cars
+
+
+def _columns(rows, first_id):
+    columns = {name: [row[name] for row in rows] for name in FEATURES}
+    columns["id"] = list(range(first_id, first_id + len(rows)))
+    return columns
+
+
+def main():
+    """Run the benchmark and print the append and query timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    index = SimilarityIndex()
+    appending = 0.0
+    while index.size < args.rows:
+        rows = sample_cars(min(args.batch, args.rows - index.size), with_ids=False)
+        columns = _columns(rows, index.last_id + 1)
+        started = time.perf_counter()
+        index.append(columns)
+        appending += time.perf_counter() - started
+
+    print(f"append: {index.size} cars in {appending * 1000:.0f} ms")
+
+    timings = []
+    for car_id in random.sample(range(1, index.size + 1), args.queries):
+        started = time.perf_counter()
+        index.nearest(car_id, args.k)
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    print(
+        f"nearest (k={args.k}): median {statistics.median(timings) * 1000:.1f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95) - 1] * 1000:.1f} ms "
+        f"over {args.queries} queries"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Cold start benchmark for the entry points.
+
+This script measures, with `python -X importtime`, how long importing the MCP server,
+the virtual agent and the database seeding script takes, lists the modules that
+dominate each import, and measures how long the MCP server takes from process start
+until its readiness probe answers.
+
+The server measurement needs data/cars.db in the current directory
+(see scripts/create_database.py).
+
+Usage:
+    python -m scripts.benchmark_startup [--runs 5] [--top 5] [--port 8310]
+
+Dependencies:
+    - httpx: For polling the readiness probe
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ENTRY_POINTS = ["car_mcp.mcp.server", "car_mcp.agent.agent", "scripts.create_database"]
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def _import_times(module):
+    """Return the cumulative import time of `module` and the self time of every module, in µs."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    self_times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        self_times[name] = int(self_us)
+        if name == module:
+            total = int(cumulative_us)
+    return total, self_times
+
+
+def _time_to_ready(port):
+    env = dict(os.environ, MCP_PORT=str(port))
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "car_mcp.mcp.server"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < 30:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/ready").status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        return None
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    """Run the benchmark and print the import and readiness timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8310)
+    args = parser.parse_args()
+
+    for module in ENTRY_POINTS:
+        totals = []
+        self_times = {}
+        for _ in range(args.runs):
+            total, run_self_times = _import_times(module)
+            totals.append(total)
+            for name, value in run_self_times.items():
+                self_times.setdefault(name, []).append(value)
+
+        print(f"{module}: import {statistics.median(totals) / 1000:.1f} ms (median of {args.runs})")
+        heaviest = sorted(
+            self_times.items(), key=lambda item: statistics.median(item[1]), reverse=True
+        )
+        for name, values in heaviest[: args.top]:
+            print(f"    {statistics.median(values) / 1000:>7.1f} ms  {name}")
+
+    readiness = [_time_to_ready(args.port) for _ in range(args.runs)]
+    if None in readiness:
+        print("car_mcp.mcp.server: readiness probe never answered 200 (is data/cars.db present?)")
+    else:
+        print(
+            f"car_mcp.mcp.server: ready after {statistics.median(readiness) * 1000:.0f} ms "
+            f"(median of {args.runs})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Materialized summaries benchmark.
+
+This script loads synthetic cars into two temporary databases, one with summaries
+enabled and one without, and compares the latency of typical browse queries
+("brand X under price Y", facet counts) answered from the summaries against the
+same queries on the base table.
+
+Usage:
+    python -m scripts.benchmark_summaries [--rows 100000] [--repeat 20]
+
+Dependencies:
+    - pandas: For loading the synthetic data
+    - db_manager: DatabaseManager under test
+    - sample_data: Synthetic car data
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+from car_mcp.database.db_manager import DatabaseManager
+from scripts.sample_data import sample_cars
+
+QUERIES = [
+    ("search", {"brand": "Toyota", "price_max": 6000}),
+    ("search", {"brand": "Honda", "fuel": "Diesel", "transmission": "CVT"}),
+    ("search", {"brand": "Tesla"}),
+    ("facets", {"brand": "Fiat"}),
+    ("facets", {}),
+]
+
+
+def _median_ms(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    """Run the benchmark and print one line per query."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    data_frame = pd.DataFrame(sample_cars(args.rows, with_ids=False))
+
+    with tempfile.TemporaryDirectory() as directory:
+        base = DatabaseManager(f"sqlite:///{os.path.join(directory, 'base.db')}", use_summaries=False)
+        summarized = DatabaseManager(
+            f"sqlite:///{os.path.join(directory, 'summaries.db')}", use_summaries=True
+        )
+        base.insert(data_frame)
+        summarized.insert(data_frame)
+
+        print(f"{'query':<60} {'base ms':>9} {'summary ms':>11} {'source':>8}")
+        for kind, filters in QUERIES:
+            base_ms = _median_ms(args.repeat, getattr(base, kind), filters)
+            summary_ms = _median_ms(args.repeat, getattr(summarized, kind), filters)
+            source = summarized.facets(filters)["source"] if kind == "facets" else ""
+            print(f"{kind + ' ' + str(filters):<60} {base_ms:>9.2f} {summary_ms:>11.2f} {source:>8}")
+
+
+if __name__ == "__main__":
+    main()
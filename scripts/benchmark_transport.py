@@ -0,0 +1,112 @@
+"""
+Transport throughput benchmark for the MCP server.
+
+This script starts the MCP server once with the SSE transport and once with the
+stateless Streamable HTTP transport (optionally with several uvicorn workers), waits
+for the readiness probe and then drives `fetch_data` with an increasing number of
+concurrent clients, printing throughput and latency for each combination.
+
+The database must already exist (see scripts/create_database.py) and the script must
+be run from the directory containing data/cars.db.
+
+Usage:
+    python -m scripts.benchmark_transport [--clients 1 4 16 32] [--requests 20] [--workers 4]
+
+Dependencies:
+    - httpx: For polling the readiness probe
+    - client: MCPClient used to issue the queries
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from car_mcp.mcp.client import MCPClient
+
+
+def _start_server(transport, port, workers):
+    env = dict(
+        os.environ,
+        MCP_TRANSPORT=transport,
+        MCP_PORT=str(port),
+        MCP_WORKERS=str(workers),
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "car_mcp.mcp.server"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/ready").status_code == 200:
+                return process
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+
+    process.terminate()
+    raise RuntimeError(f"{transport} server did not become ready on port {port}")
+
+
+async def _run_clients(client, total_clients, requests_per_client, filters):
+    latencies = []
+
+    async def worker():
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            await client.process_query(filters)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(total_clients)))
+    elapsed = time.perf_counter() - started
+
+    return len(latencies) / elapsed, statistics.median(latencies)
+
+
+def main():
+    """Run the benchmark for both transports and print one line per client count."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--brand", default="Toyota")
+    args = parser.parse_args()
+
+    setups = [
+        ("sse", 8301, 1, "/sse"),
+        ("streamable-http", 8302, 1, "/mcp"),
+        ("streamable-http", 8303, args.workers, "/mcp"),
+    ]
+    filters = {"brand": args.brand}
+
+    print(f"{'transport':<16} {'workers':>7} {'clients':>7} {'req/s':>9} {'p50 ms':>9}")
+
+    for transport, port, workers, path in setups:
+        process = _start_server(transport, port, workers)
+        client = MCPClient(url=f"http://127.0.0.1:{port}{path}", transport=transport)
+        try:
+            for total_clients in args.clients:
+                throughput, median = asyncio.run(
+                    _run_clients(client, total_clients, args.requests, filters)
+                )
+                print(
+                    f"{transport:<16} {workers:>7} {total_clients:>7} "
+                    f"{throughput:>9.1f} {median * 1000:>9.1f}"
+                )
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Wire format benchmark for fetch_data payloads.
+
+This script compares the size on the wire and the client side decode time of the
+default JSON encoding (as serialized by FastMCP, with indentation), plain compact
+JSON and the columnar encoding, for result sets of 10k and 100k cars.
+
+Usage:
+    python -m scripts.benchmark_wire_format [--rows 10000 100000] [--repeat 3]
+
+Dependencies:
+    - codec: Wire format codecs used by the MCP server and client
+    - sample_data: Synthetic car data
+"""
+
+import argparse
+import json
+import time
+
+from car_mcp.mcp import codec
+from scripts.sample_data import sample_cars
+
+
+def _best_of(repeat, func, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _decode(text):
+    return codec.decode_cars(json.loads(text))
+
+
+def main():
+    """Run the benchmark and print one line per encoding and result size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'encoding':<16} {'bytes':>12} {'ratio':>7} {'decode ms':>10}")
+
+    for total in args.rows:
+        rows = sample_cars(total)
+        payloads = {
+            "json (indent=2)": json.dumps({"cars": rows}, indent=2, ensure_ascii=False),
+            "json (compact)": codec.dumps({"cars": rows}),
+            "columnar": codec.dumps(
+                {"encoding": codec.COLUMNAR_ENCODING, "cars": codec.encode_columnar(rows)}
+            ),
+        }
+        baseline = len(payloads["json (indent=2)"].encode())
+
+        for name, text in payloads.items():
+            size = len(text.encode())
+            elapsed = _best_of(args.repeat, _decode, text)
+            print(
+                f"{total:>8} {name:<16} {size:>12} {size / baseline:>7.2f} {elapsed * 1000:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,18 @@ Database initialization script for the car search system.
 
 This script checks if the database is empty and, if so, generates fictional car data
 to populate it. If the database already contains records, it skips the data generation
-process.
+process. The data generator (and with it pandas and Faker) is only imported when data
+actually has to be generated.
 
 Dependencies:
     - data_generator: Provides functions to generate fictional car data
     - db_manager: Handles database operations through DatabaseManager class
+    - partitioned: Splits the data across several files when DB_PARTITIONS is set
+    - snapshot: Publishes the data as a new database snapshot when DB_SNAPSHOT_MODE is set
 """
 
-from car_mcp.database.data_generator import generate_cars
-from car_mcp.database.db_manager import DatabaseManager
+from car_mcp import config
+from car_mcp.database.partitioned import open_catalog
 
 
 def main():
@@ -27,12 +30,23 @@ def main():
     """
     print("Inicializando sistema de busca de automóveis...")
 
-    db_manager = DatabaseManager()
+    db_manager = open_catalog()
 
-    if len(db_manager.get_all_cars()) == 0:
+    if db_manager.count() == 0:
         print("Banco de dados vazio. Gerando dados fictícios...")
+        from car_mcp.database.data_generator import generate_cars
+
         pd_data_frame_cars = generate_cars(total_cars=1000)
-        db_manager.insert(pd_data_frame_cars)
+        if config.DB_SNAPSHOT_MODE:
+            from car_mcp.database.snapshot import publish_snapshot
+
+            if config.DB_PARTITIONS > 1:
+                for url, part in db_manager.split(pd_data_frame_cars):
+                    publish_snapshot(part, url)
+            else:
+                publish_snapshot(pd_data_frame_cars)
+        else:
+            db_manager.insert(pd_data_frame_cars)
         print(f"Banco de dados populado com {len(pd_data_frame_cars)} automóveis.")
     else:
         print("Banco de dados já contém registros. Pulando geração de dados.")
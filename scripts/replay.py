@@ -0,0 +1,257 @@
+"""
+Replay recorded conversations against the MCP server.
+
+This script reads a conversation log written by the virtual agent (see
+car_mcp/agent/recorder.py and AGENT_RECORD_PATH) and replays every session: each
+turn goes through the LLM stage, then the resulting MCP tool calls are sent to the
+server. Turns are paced by the recorded gaps
+between them divided by --speed (0 replays as fast as possible), and up to
+--concurrency sessions run at the same time; --copies replays every session
+several times to scale the load up.
+
+The LLM stage either uses a stub returning the recorded extraction (default,
+optionally sleeping for the recorded LLM time) or the real Ollama model through the
+agent's inference scheduler. With the stub, the tool calls recorded for the turn are
+sent with their original arguments, skipping those answered from the client cache,
+which did not reach the server. With Ollama, the extracted filters are accumulated
+across the session as the agent does and the search they lead to is sent instead,
+so the server sees what the model currently produces.
+
+The script prints, for every stage (llm, each MCP tool, whole turn), the number of
+operations, p50/p95/p99 latency and throughput. Tool calls turned away by the
+server's admission control are counted per reason (`rejected:<reason>`) and other
+failed calls as `errors`, next to the latencies of the calls that succeeded; a
+failed call does not stop its session.
+
+Usage:
+    python -m scripts.replay conversations.jsonl [--speed 1.0] [--concurrency 4]
+        [--copies 1] [--llm stub|ollama] [--stub-latency]
+
+Dependencies:
+    - recorder: For reading the conversation log
+    - admission: For telling the server's rejections from other errors
+    - client: MCPClient used to issue the tool calls
+    - agent: VirtualAgent used for the live LLM stage
+"""
+
+import argparse
+import asyncio
+import math
+import time
+from collections import Counter
+
+from car_mcp.agent.recorder import load_sessions
+from car_mcp.mcp.admission import Rejected
+from car_mcp.mcp.client import MCPClient
+
+
+class StubLLM:
+    """
+    Stand-in for the LLM stage returning the extraction recorded for each turn.
+
+    Attributes:
+        latency (bool): Sleep for the recorded LLM time, divided by the speed.
+        speed (float): Replay speed multiplier.
+        live (bool): False: the recorded tool calls are replayed.
+    """
+
+    live = False
+
+    def __init__(self, latency=False, speed=1.0):
+        self.latency = latency
+        self.speed = speed
+
+    async def extract(self, turn, current_filters):
+        """Return the recorded (new_filters, need_more_info, next_question) of a turn."""
+        if self.latency and self.speed > 0:
+            await asyncio.sleep(turn["timings"]["llm"] / self.speed)
+        extraction = turn["extraction"]
+        return (
+            extraction["new_filters"],
+            extraction["need_more_info"],
+            extraction["next_question"],
+        )
+
+
+class OllamaLLM:
+    """
+    LLM stage running the agent's real extraction chain through its scheduler.
+
+    Attributes:
+        live (bool): True: tool calls are derived from the fresh extraction.
+    """
+
+    live = True
+
+    def __init__(self):
+        from car_mcp.agent.agent import VirtualAgent
+
+        self._agent = VirtualAgent()
+
+    async def extract(self, turn, current_filters):
+        """Extract the filters of a turn with the configured Ollama model."""
+        return await self._agent.extract(turn["user_input"], current_filters)
+
+
+def percentile(values, fraction):
+    """
+    Return the nearest-rank percentile of a list of values.
+
+    Args:
+        values (list[float]): The sorted values.
+        fraction (float): The percentile, between 0 and 1.
+
+    Returns:
+        float: The value at that percentile.
+    """
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+async def replay_session(turns, client, llm, speed, latencies, failures):
+    """
+    Replay the turns of one session, appending every stage's latency to `latencies`
+    and counting the failed tool calls in `failures`.
+
+    Args:
+        turns (list[dict]): The recorded turns, in order.
+        client (MCPClient): Client issuing the tool calls.
+        llm (StubLLM | OllamaLLM): The LLM stage.
+        speed (float): Speed multiplier for the gaps between turns, 0 for no pacing.
+        latencies (dict[str, list[float]]): Latencies in seconds keyed by stage.
+        failures (dict[str, Counter]): Failed calls keyed by stage, counted as
+            'errors' or 'rejected:<reason>'.
+    """
+    started = time.perf_counter()
+    first_offset = turns[0]["offset"] if turns else 0
+    filters = {}
+
+    for turn in turns:
+        if speed > 0:
+            due = started + (turn["offset"] - first_offset) / speed
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+
+        turn_started = time.perf_counter()
+        current_filters = filters if llm.live else turn["current_filters"]
+        new_filters, need_more_info, _ = await llm.extract(turn, current_filters)
+        latencies.setdefault("llm", []).append(time.perf_counter() - turn_started)
+
+        if llm.live:
+            # Search as the agent would with what the model extracted just now.
+            filters = {**filters, **new_filters}
+            calls = []
+            if not need_more_info and filters:
+                arguments = {"filters": filters, "encoding": client.encoding, "relax": True}
+                calls.append({"tool": "fetch_data", "arguments": arguments})
+                filters = {}
+        else:
+            calls = [call for call in turn["tool_calls"] if not call.get("cached")]
+
+        for call in calls:
+            stage = f"mcp:{call['tool']}"
+            call_started = time.perf_counter()
+            try:
+                await client.call_tool(call["tool"], call["arguments"])
+            except Rejected as e:
+                failures.setdefault(stage, Counter())[f"rejected:{e.reason}"] += 1
+            except Exception:
+                failures.setdefault(stage, Counter())["errors"] += 1
+            else:
+                latencies.setdefault(stage, []).append(time.perf_counter() - call_started)
+
+        latencies.setdefault("turn", []).append(time.perf_counter() - turn_started)
+
+
+async def replay(sessions, client, llm, speed=1.0, concurrency=4, copies=1):
+    """
+    Replay recorded sessions concurrently.
+
+    Args:
+        sessions (dict[str, list[dict]]): Turns grouped by session, as returned by
+            `load_sessions`.
+        client (MCPClient): Client issuing the tool calls.
+        llm (StubLLM | OllamaLLM): The LLM stage.
+        speed (float, optional): Speed multiplier, 0 for no pacing. Defaults to 1.
+        concurrency (int, optional): Sessions replayed at the same time. Defaults to 4.
+        copies (int, optional): Times every session is replayed. Defaults to 1.
+
+    Returns:
+        dict: Per stage, the number of successful operations, their p50/p95/p99
+              latency in milliseconds (None without any) and throughput in operations
+              per second, plus the failure counts ('errors', 'rejected:<reason>').
+              Sessions that failed outside a tool call are counted as the 'errors'
+              of the 'session' stage.
+    """
+    latencies = {}
+    failures = {}
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(turns):
+        async with slots:
+            await replay_session(turns, client, llm, speed, latencies, failures)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(run(turns) for _ in range(copies) for turns in sessions.values()),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - started
+
+    failed_sessions = sum(isinstance(result, Exception) for result in results)
+    if failed_sessions:
+        failures.setdefault("session", Counter())["errors"] += failed_sessions
+
+    report = {}
+    for stage in latencies.keys() | failures.keys():
+        values = sorted(latencies.get(stage, []))
+        report[stage] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.50) * 1000 if values else None,
+            "p95_ms": percentile(values, 0.95) * 1000 if values else None,
+            "p99_ms": percentile(values, 0.99) * 1000 if values else None,
+            "throughput": len(values) / elapsed if elapsed else 0.0,
+            **failures.get(stage, {}),
+        }
+    return report
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:.1f}ms"
+
+
+def main():
+    """Replay a conversation log and print one line per stage."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("log")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--copies", type=int, default=1)
+    parser.add_argument("--llm", choices=["stub", "ollama"], default="stub")
+    parser.add_argument("--stub-latency", action="store_true")
+    args = parser.parse_args()
+
+    sessions = load_sessions(args.log)
+    llm = StubLLM(args.stub_latency, args.speed) if args.llm == "stub" else OllamaLLM()
+    client = MCPClient(cache_size=0)
+
+    report = asyncio.run(
+        replay(sessions, client, llm, args.speed, args.concurrency, args.copies)
+    )
+
+    print(
+        f"{'stage':<22} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'ops/s':>8}  failures"
+    )
+    for stage, stats in sorted(report.items()):
+        failed = ", ".join(
+            f"{outcome}={count}"
+            for outcome, count in sorted(stats.items())
+            if outcome == "errors" or outcome.startswith("rejected:")
+        )
+        print(
+            f"{stage:<22} {stats['count']:>6} {_ms(stats['p50_ms']):>9} "
+            f"{_ms(stats['p95_ms']):>9} {_ms(stats['p99_ms']):>9} "
+            f"{stats['throughput']:>8.1f}  {failed}"
+        )
+
+
+if __name__ == "__main__":
+    main()
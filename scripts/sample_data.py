@@ -0,0 +1,53 @@
+"""
+Synthetic car data for benchmarks.
+
+Faker based generation (see car_mcp/database/data_generator.py) is too slow for the
+hundreds of thousands of rows benchmarks need, so this module draws the same kind of
+values directly from the random module.
+
+Dependencies:
+    - random: For random selections
+"""
+
+import random
+
+BRANDS = ["Toyota", "Fiat", "Volkswagen", "Chevrolet", "Honda", "Hyundai", "Ford", "Renault"]
+COLORS = ["Preto", "Branco", "Prata", "Azul", "Vermelho", "Cinza"]
+FUELS = ["Gasolina", "Etanol", "Flex", "Diesel", "Elétrico", "Híbrido"]
+TRANSMISSIONS = ["Manual", "Automática", "CVT", "Semi-automática", "Automatizada", "DCT"]
+
+
+def sample_cars(total, with_ids=True):
+    """
+    Generate car dictionaries with the same fields as `Car.to_dict`.
+
+    Args:
+        total (int): Number of cars to generate.
+        with_ids (bool, optional): Include sequential ids starting at 1. Defaults to True.
+
+    Returns:
+        list[dict]: The generated cars.
+    """
+    rows = []
+
+    for car_id in range(1, total + 1):
+        brand = random.choice(BRANDS)
+        mileage = random.choice([0, 50000, 150000, 200000])
+        row = {
+            "brand": brand,
+            "model": f"{brand} Model {random.randint(1, 40)}",
+            "year": random.randint(1990, 2025),
+            "motorization": random.choice([1.0, 1.3, 1.4, 1.5, 1.6, 1.8, 2.0, 2.5, 3.0]),
+            "fuel": random.choice(FUELS),
+            "color": random.choice(COLORS),
+            "mileage": float(mileage),
+            "doors": random.choice([2, 4]),
+            "transmission": random.choice(TRANSMISSIONS),
+            "price": float(random.randint(5000, 150000)),
+            "air_conditioning": random.random() > 0.1,
+            "electric_steering": random.random() > 0.2,
+            "status": "Novo" if mileage == 0 else "Usado",
+        }
+        rows.append({"id": car_id, **row} if with_ids else row)
+
+    return rows
@@ -0,0 +1,128 @@
+"""
+Test module for admission control.
+
+This module contains tests for the AdmissionController concurrency, rate and cost
+limits and for rebuilding rejections from tool errors.
+"""
+
+import asyncio
+
+import pytest
+
+from car_mcp.mcp.admission import AdmissionController, Rejected
+
+
+@pytest.mark.asyncio
+async def test_queued_call_gets_released_slot():
+    """Test that a waiting call runs once the running call releases its slot."""
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=1)
+    order = []
+
+    async def call(name, delay):
+        async with controller.admit():
+            order.append(name)
+            await asyncio.sleep(delay)
+
+    await asyncio.gather(call("first", 0.02), call("second", 0))
+
+    assert order == ["first", "second"]
+    assert controller.stats()["admitted"] == 2
+    assert controller.stats()["queued"] == 1
+    assert controller.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_calls_are_shed_when_queue_is_full():
+    """Test that calls beyond the wait queue are rejected immediately."""
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+
+    async with controller.admit():
+        with pytest.raises(Rejected) as rejected:
+            async with controller.admit():
+                pass
+
+    assert rejected.value.reason == "overloaded"
+    assert controller.counters["shed_queue_full"] == 1
+
+
+@pytest.mark.asyncio
+async def test_calls_are_shed_after_queue_timeout():
+    """Test that a call waiting longer than the queue timeout is rejected."""
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.01)
+
+    async with controller.admit():
+        with pytest.raises(Rejected):
+            async with controller.admit():
+                pass
+
+    assert controller.counters["shed_queue_timeout"] == 1
+    assert controller.stats()["waiting"] == 0
+
+    async with controller.admit():
+        assert controller.stats()["in_flight"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_per_client():
+    """Test that each client gets its own token bucket."""
+    controller = AdmissionController(rate=0.001, burst=2)
+
+    for _ in range(2):
+        async with controller.admit("a"):
+            pass
+    with pytest.raises(Rejected) as rejected:
+        async with controller.admit("a"):
+            pass
+    async with controller.admit("b"):
+        pass
+
+    assert rejected.value.reason == "rate_limited"
+    assert controller.counters["rate_limited"] == 1
+
+
+def test_row_limit_policies():
+    """Test that expensive searches are limited or rejected per the policy."""
+    limiting = AdmissionController(max_rows=100, policy="limit")
+    rejecting = AdmissionController(max_rows=100, policy="reject")
+
+    assert limiting.row_limit(100) is None
+    assert limiting.row_limit(5000) == 100
+    with pytest.raises(Rejected):
+        limiting.row_limit(5000, can_limit=False)
+    with pytest.raises(Rejected):
+        rejecting.row_limit(5000)
+
+    assert limiting.counters["limited_cost"] == 1
+    assert limiting.counters["rejected_cost"] == 1
+    assert rejecting.counters["rejected_cost"] == 1
+
+
+def test_rejection_from_error_text():
+    """Test that a rejection survives the round trip through a tool error."""
+    rejected = Rejected.from_error(
+        "Error executing tool fetch_data: overloaded: too many calls waiting; retry later"
+    )
+
+    assert rejected.reason == "overloaded"
+    assert rejected.detail == "too many calls waiting; retry later"
+    assert Rejected.from_error("Error executing tool fetch_data: boom") is None
+
+
+@pytest.mark.asyncio
+async def test_slot_handed_over_as_queue_timeout_fires_is_kept(monkeypatch):
+    """Test that a waiter given a slot just as its timeout fires runs instead of leaking it."""
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=1)
+
+    async def handed_over_then_timed_out(waiter, timeout):
+        # The running call finishes and hands its slot over as the timeout fires.
+        controller._release()
+        raise asyncio.TimeoutError
+
+    await controller._acquire()
+    monkeypatch.setattr(asyncio, "wait_for", handed_over_then_timed_out)
+    async with controller.admit():
+        assert controller.stats()["in_flight"] == 1
+    monkeypatch.undo()
+
+    assert controller.stats()["in_flight"] == 0
+    assert controller.counters["shed_queue_timeout"] == 0
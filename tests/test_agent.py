@@ -19,7 +19,7 @@ def virtual_agent():
     """Fixture that returns a VirtualAgent instance with mocked client."""
     with patch("car_mcp.agent.agent.MCPClient") as mock_client:
         agent = VirtualAgent()
-        agent.client.process_query = AsyncMock()
+        agent.client.process_query_relaxed = AsyncMock()
         return agent
 
 
@@ -61,15 +61,15 @@ async def test_start_loop_complete_search(virtual_agent, sample_car):
 
     with patch("builtins.input", input_mock), patch(
         "builtins.print"
-    ) as print_mock, patch("car_mcp.agent.agent.llm"), patch("car_mcp.agent.agent.StrOutputParser") as parser_mock:
+    ) as print_mock, patch("car_mcp.agent.agent.get_llm"), patch("langchain_core.output_parsers.StrOutputParser") as parser_mock:
 
         parser_mock.return_value = MagicMock(return_value=json.dumps(mock_response))
 
-        virtual_agent.client.process_query.return_value = [sample_car]
+        virtual_agent.client.process_query_relaxed.return_value = ([sample_car], [])
 
         await virtual_agent.start_loop()
 
-        virtual_agent.client.process_query.assert_called_once()
+        virtual_agent.client.process_query_relaxed.assert_called_once()
         assert input_mock.call_count == 2
         assert print_mock.call_count > 0
 
@@ -89,7 +89,7 @@ async def test_start_loop_incomplete_search(virtual_agent):
 
     with patch("builtins.input", input_mock), patch(
         "builtins.print"
-    ) as print_mock, patch("car_mcp.agent.agent.llm"), patch("car_mcp.agent.agent.StrOutputParser") as parser_mock:
+    ) as print_mock, patch("car_mcp.agent.agent.get_llm"), patch("langchain_core.output_parsers.StrOutputParser") as parser_mock:
 
         # Setup LLM mock
         parser_mock.return_value = MagicMock(return_value=json.dumps(mock_response))
@@ -98,7 +98,7 @@ async def test_start_loop_incomplete_search(virtual_agent):
         await virtual_agent.start_loop()
 
         # Verify interactions
-        virtual_agent.client.process_query.assert_not_called()
+        virtual_agent.client.process_query_relaxed.assert_not_called()
         assert input_mock.call_count == 2
         assert print_mock.call_count > 0
 
@@ -120,14 +120,62 @@ async def test_start_loop_no_results(virtual_agent):
 
     with patch("builtins.input", input_mock), patch(
         "builtins.print"
-    ) as print_mock, patch("car_mcp.agent.agent.llm"), patch("car_mcp.agent.agent.StrOutputParser") as parser_mock:
+    ) as print_mock, patch("car_mcp.agent.agent.get_llm"), patch("langchain_core.output_parsers.StrOutputParser") as parser_mock:
 
         parser_mock.return_value = MagicMock(return_value=json.dumps(mock_response))
 
-        virtual_agent.client.process_query.return_value = []
+        virtual_agent.client.process_query_relaxed.return_value = ([], [])
 
         await virtual_agent.start_loop()
 
-        virtual_agent.client.process_query.assert_called_once()
+        virtual_agent.client.process_query_relaxed.assert_called_once()
         assert input_mock.call_count == 2
         assert print_mock.call_count > 0
+
+
+@pytest.mark.asyncio
+async def test_start_loop_relaxed_results(virtual_agent, sample_car):
+    """Test start_loop when the server had to relax the filters to find cars."""
+    mock_response = {
+        "new_filters": {"brand": "Toyota", "color": "Rosa"},
+        "need_more_info": False,
+        "next_question": False,
+    }
+
+    inputs = ["Quero um Toyota rosa", "sair"]
+    input_mock = MagicMock(side_effect=inputs)
+
+    with patch("builtins.input", input_mock), patch(
+        "builtins.print"
+    ) as print_mock, patch("car_mcp.agent.agent.get_llm"), patch("langchain_core.output_parsers.StrOutputParser") as parser_mock:
+
+        parser_mock.return_value = MagicMock(return_value=json.dumps(mock_response))
+
+        virtual_agent.client.process_query_relaxed.return_value = ([sample_car], ["color"])
+
+        await virtual_agent.start_loop()
+
+        virtual_agent.client.process_query_relaxed.assert_called_once_with(
+            {"brand": "Toyota", "color": "Rosa"}
+        )
+        printed = " ".join(str(call.args[0]) for call in print_mock.call_args_list)
+        assert "flexibilizei: color" in printed
+
+
+@pytest.mark.asyncio
+async def test_exit_leaves_shared_scheduler_running():
+    """Test that an agent leaving the conversation does not close the shared scheduler."""
+    with patch("car_mcp.agent.agent.MCPClient"), patch(
+        "car_mcp.agent.agent.get_scheduler"
+    ) as get_scheduler_mock, patch("builtins.input", MagicMock(return_value="sair")), patch(
+        "builtins.print"
+    ):
+        shared = get_scheduler_mock.return_value
+        shared.close = AsyncMock()
+        await VirtualAgent().start_loop()
+
+        own = MagicMock(close=AsyncMock())
+        await VirtualAgent(scheduler=own).start_loop()
+
+    shared.close.assert_not_awaited()
+    own.close.assert_awaited_once()
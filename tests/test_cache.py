@@ -0,0 +1,64 @@
+"""
+Test module for the client-side result cache.
+
+This module contains tests for the canonical cache keys and the versioned LRU cache
+used by MCPClient.
+"""
+
+from car_mcp.mcp.cache import ResultCache, cache_key
+
+
+def test_cache_key_is_canonical():
+    """Test that equivalent filters share a key and different ones do not."""
+    key = cache_key("fetch_data", {"filters": {"brand": ["Fiat", "Honda"], "price_max": 50000}})
+
+    assert key == cache_key(
+        "fetch_data",
+        {"filters": {"price_max": 50000.0, "color": None, "brand": ["Honda", "Fiat"]}},
+    )
+    assert key != cache_key("fetch_data", {"filters": {"brand": ["Fiat"], "price_max": 50000}})
+    assert key != cache_key(
+        "fetch_many", {"filters": {"brand": ["Fiat", "Honda"], "price_max": 50000}}
+    )
+
+
+def test_entries_are_tied_to_a_version():
+    """Test that an entry is only served at the version it was fetched at."""
+    cache = ResultCache()
+    cache.put("a", [1], version=3)
+
+    assert cache.get("a", 3) == [1]
+    assert cache.get("a", 4) is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Test that the least recently used entry is evicted when the cache is full."""
+    cache = ResultCache(maxsize=2)
+    cache.put("a", 1, version=0)
+    cache.put("b", 2, version=0)
+    cache.get("a", 0)
+    cache.put("c", 3, version=0)
+
+    assert cache.get("b", 0) is None
+    assert cache.get("a", 0) == 1
+    assert cache.get("c", 0) == 3
+
+
+def test_invalidate_drops_other_versions():
+    """Test that invalidation keeps only the entries of the current version."""
+    cache = ResultCache()
+    cache.put("a", 1, version=1)
+    cache.put("b", 2, version=2)
+
+    assert cache.invalidate(2) == 1
+    assert cache.get("b", 2) == 2
+
+
+def test_disabled_cache():
+    """Test that a cache of size 0 stores nothing."""
+    cache = ResultCache(maxsize=0)
+    cache.put("a", 1, version=0)
+
+    assert len(cache) == 0
@@ -0,0 +1,35 @@
+"""
+Test module for the MCP wire format codecs.
+
+This module contains tests for the columnar encoding used by fetch_data payloads.
+"""
+
+from car_mcp.mcp import codec
+
+
+def test_columnar_round_trip():
+    """Test that encoding and decoding a list of rows returns the same rows."""
+    rows = [
+        {"id": 1, "brand": "Toyota", "fuel": "Flex", "price": 100.0},
+        {"id": 2, "brand": "Fiat", "fuel": "Flex", "price": 50.0},
+        {"id": 3, "brand": "Toyota", "fuel": "Diesel", "price": 75.5},
+    ]
+
+    payload = codec.encode_columnar(rows)
+
+    assert payload["dictionaries"]["brand"] == ["Toyota", "Fiat"]
+    assert payload["columns"]["brand"] == [0, 1, 0]
+    assert payload["columns"]["price"] == [100.0, 50.0, 75.5]
+    assert codec.decode_columnar(payload) == rows
+
+
+def test_decode_cars_handles_every_encoding():
+    """Test decode_cars with plain, columnar and invalid responses."""
+    rows = [{"id": 1, "brand": "Toyota"}]
+
+    assert codec.decode_cars({"cars": rows}) == rows
+    assert codec.decode_cars(
+        {"encoding": "columnar", "cars": codec.encode_columnar(rows)}
+    ) == rows
+    assert codec.decode_cars({"invalid": "response"}) == []
+    assert codec.decode_cars({"encoding": "columnar", "cars": codec.encode_columnar([])}) == []
@@ -0,0 +1,152 @@
+"""
+Test module for DatabaseManager query methods.
+
+This module contains tests for the DatabaseManager class against a small temporary
+SQLite database.
+"""
+
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from car_mcp.database.db_manager import DatabaseManager, QueryTimeout, query_deadline
+
+
+def _car(brand, price, year=2020, mileage=0.0, color="Preto"):
+    return {
+        "brand": brand,
+        "model": f"{brand} Model",
+        "year": year,
+        "motorization": 1.6,
+        "fuel": "Flex",
+        "color": color,
+        "mileage": mileage,
+        "doors": 4,
+        "transmission": "Manual",
+        "price": price,
+        "air_conditioning": True,
+        "electric_steering": True,
+        "status": "Novo" if mileage == 0 else "Usado",
+    }
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    """Fixture that returns a manager over a small temporary database."""
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'cars.db'}")
+    manager.insert(
+        pd.DataFrame(
+            [
+                _car("Toyota", 54000.0),
+                _car("Toyota", 80000.0, year=2022),
+                _car("Fiat", 30000.0, year=2018, mileage=50000.0),
+            ]
+        )
+    )
+    return manager
+
+
+def test_search_many_keyed_by_request(db_manager):
+    """Test that search_many returns each result set under its index."""
+    results = db_manager.search_many(
+        [{"brand": "Toyota"}, {"price_max": 60000}, {"brand": "Tesla"}]
+    )
+
+    assert sorted(car.price for car in results[0]) == [54000.0, 80000.0]
+    assert sorted(car.price for car in results[1]) == [30000.0, 54000.0]
+    assert results[2] == []
+
+
+def test_search_many_shares_cars_between_results(db_manager):
+    """Test that a car matched by several filter sets is loaded once."""
+    results = db_manager.search_many([{"brand": "Toyota", "year_max": 2020}, {"price_max": 60000}])
+
+    shared = [car for car in results[1] if car.brand == "Toyota"]
+    assert results[0] == shared
+    assert results[0][0] is shared[0]
+
+
+def test_search_many_empty(db_manager):
+    """Test search_many without filter sets."""
+    assert db_manager.search_many([]) == {}
+
+
+def test_search_many_treats_none_as_no_filters(db_manager):
+    """Test that a None filter set matches every car instead of failing."""
+    results = db_manager.search_many([None, {"brand": "Toyota"}])
+
+    assert len(results[0]) == 3
+    assert [car.brand for car in results[1]] == ["Toyota"] * len(results[1])
+
+
+def test_insert_bumps_version(db_manager):
+    """Test that every insert bumps the inventory version."""
+    version = db_manager.version()
+
+    db_manager.insert(pd.DataFrame([_car("Honda", 70000.0)]))
+
+    assert db_manager.version() == version + 1
+
+
+def test_search_limit(db_manager):
+    """Test that search returns at most `limit` cars."""
+    assert len(db_manager.search({}, limit=2)) == 2
+    assert len(db_manager.search_relaxed({"brand": "Toyota"}, limit=1)[0]) == 1
+
+
+def test_estimate_rows(db_manager):
+    """Test that row estimates follow the stored value distributions."""
+    assert db_manager.estimate_rows({}) == 3
+    assert db_manager.estimate_rows({"brand": "toy"}) == 2
+    assert db_manager.estimate_rows({"brand": "Tesla"}) == 0
+    assert db_manager.estimate_rows({"year_min": 2020}) == 2
+
+    db_manager.insert(pd.DataFrame([_car("Tesla", 300000.0)]))
+
+    assert db_manager.estimate_rows({"brand": "Tesla"}) == 1
+
+
+def test_estimate_rows_converts_range_bounds(db_manager):
+    """Test that numeric strings are estimated as numbers and other values are not estimated."""
+    assert db_manager.estimate_rows({"year_min": "2020"}) == 2
+    assert db_manager.estimate_rows({"price_max": "abc"}) is None
+    assert db_manager.estimate_many([{"year_min": "2020"}, {"year_min": "new"}]) == [2, None]
+
+
+def test_import_does_not_load_numpy():
+    """Test that numpy is only imported once statistics are gathered."""
+    loaded = subprocess.run(
+        [sys.executable, "-c",
+         "import sys, car_mcp.database.db_manager; print('numpy' in sys.modules)"],
+        capture_output=True, text=True, check=True,
+    ).stdout.strip()
+
+    assert loaded == "False"
+
+
+def test_estimate_many_reads_version_once(db_manager):
+    """Test that several searches are estimated from one lookup of the statistics."""
+    filter_sets = [{}, {"brand": "toy"}, {"brand": "Tesla"}]
+
+    with patch.object(db_manager, "version", wraps=db_manager.version) as version:
+        assert db_manager.estimate_many(filter_sets) == [3, 2, 0]
+
+    assert version.call_count == 1
+
+
+def test_query_deadline_interrupts_query(db_manager):
+    """Test that a query running past its deadline is interrupted."""
+    endless = (
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) "
+        "SELECT count(*) FROM n WHERE i < 1000000000"
+    )
+
+    with pytest.raises(QueryTimeout):
+        with query_deadline(0.05):
+            with db_manager._engine.connect() as connection:
+                connection.exec_driver_sql(endless)
+
+    assert len(db_manager.search({})) == 3
@@ -5,11 +5,14 @@ This module contains tests for the MCPClient class, focusing on the process_quer
 and its interaction with the MCP server.
 """
 
+import asyncio
 import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from car_mcp.mcp import codec
+from car_mcp.mcp.admission import Rejected
 from car_mcp.mcp.client import MCPClient
 from car_mcp.models.car import Car
 
@@ -39,6 +42,7 @@ def mock_response():
     """Fixture that creates a mock response object."""
     mock = MagicMock()
     mock.content = [MagicMock()]
+    mock.isError = False
     return mock
 
 
@@ -120,4 +124,232 @@ async def test_process_query_invalid_response(mock_response):
         client = MCPClient()
         result = await client.process_query({})
 
-        assert len(result) == 0
\ No newline at end of file
+        assert len(result) == 0
+
+
+@pytest.mark.asyncio
+async def test_process_query_columnar_response(sample_car_dict, mock_response):
+    """Test process_query transparently decoding a columnar response."""
+    mock_response.content[0].text = codec.dumps(
+        {"encoding": "columnar", "cars": codec.encode_columnar([sample_car_dict])}
+    )
+
+    mock_session = AsyncMock()
+    mock_session.initialize = AsyncMock()
+    mock_session.call_tool = AsyncMock(return_value=mock_response)
+
+    mock_sse = AsyncMock()
+    mock_sse.__aenter__.return_value = ["stream"]
+    mock_client_session = AsyncMock()
+    mock_client_session.__aenter__.return_value = mock_session
+
+    with patch('car_mcp.mcp.client.sse_client', return_value=mock_sse), \
+         patch('car_mcp.mcp.client.ClientSession', return_value=mock_client_session):
+
+        client = MCPClient(encoding="columnar")
+        result = await client.process_query({"brand": "Toyota"})
+
+        mock_session.call_tool.assert_called_once_with(
+            "fetch_data", arguments={"filters": {"brand": "Toyota"}, "encoding": "columnar"}
+        )
+        assert len(result) == 1
+        assert result[0].brand == "Toyota"
+        assert result[0].status == "Novo"
+
+
+@pytest.mark.asyncio
+async def test_process_query_relaxed(sample_car_dict, mock_response):
+    """Test process_query_relaxed returning the cars and the relaxed constraints."""
+    mock_response.content[0].text = json.dumps(
+        {"cars": [sample_car_dict], "relaxed": ["color"]}
+    )
+
+    mock_session = AsyncMock()
+    mock_session.initialize = AsyncMock()
+    mock_session.call_tool = AsyncMock(return_value=mock_response)
+
+    mock_sse = AsyncMock()
+    mock_sse.__aenter__.return_value = ["stream"]
+    mock_client_session = AsyncMock()
+    mock_client_session.__aenter__.return_value = mock_session
+
+    with patch('car_mcp.mcp.client.sse_client', return_value=mock_sse), \
+         patch('car_mcp.mcp.client.ClientSession', return_value=mock_client_session):
+
+        client = MCPClient(encoding="json")
+        cars, relaxed = await client.process_query_relaxed({"brand": "Toyota", "color": "Rosa"})
+
+        assert mock_session.call_tool.call_args.kwargs["arguments"]["relax"] is True
+        assert len(cars) == 1
+        assert relaxed == ["color"]
+
+
+@pytest.mark.asyncio
+async def test_process_many(sample_car_dict, mock_response):
+    """Test process_many rebuilding each result set from the shared cars."""
+    mock_response.content[0].text = json.dumps(
+        {
+            "cars": [{**sample_car_dict, "id": 1}, {**sample_car_dict, "id": 2, "brand": "Fiat"}],
+            "results": {"0": [1, 2], "1": [1]},
+        }
+    )
+
+    mock_session = AsyncMock()
+    mock_session.initialize = AsyncMock()
+    mock_session.call_tool = AsyncMock(return_value=mock_response)
+
+    mock_sse = AsyncMock()
+    mock_sse.__aenter__.return_value = ["stream"]
+    mock_client_session = AsyncMock()
+    mock_client_session.__aenter__.return_value = mock_session
+
+    with patch('car_mcp.mcp.client.sse_client', return_value=mock_sse), \
+         patch('car_mcp.mcp.client.ClientSession', return_value=mock_client_session):
+
+        client = MCPClient(encoding="json")
+        results = await client.process_many([{}, {"brand": "Toyota"}])
+
+        mock_session.call_tool.assert_called_once()
+        assert [car.brand for car in results[0]] == ["Toyota", "Fiat"]
+        assert results[1][0] is results[0][0]
+
+
+def _versioned_session(mock_response, version):
+    mock_session = AsyncMock()
+    mock_session.initialize = AsyncMock()
+    mock_session.call_tool = AsyncMock(return_value=mock_response)
+    version_result = MagicMock()
+    version_result.contents = [MagicMock(text=json.dumps({"version": version}))]
+    mock_session.read_resource = AsyncMock(return_value=version_result)
+    return mock_session
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_reuses_cached_result(sample_car_dict, mock_response):
+    """Test that a repeated query at the same inventory version skips the tool call."""
+    mock_response.content[0].text = json.dumps({"cars": [sample_car_dict]})
+    mock_session = _versioned_session(mock_response, 7)
+
+    mock_sse = AsyncMock()
+    mock_sse.__aenter__.return_value = ["stream"]
+    mock_client_session = AsyncMock()
+    mock_client_session.__aenter__.return_value = mock_session
+
+    with patch('car_mcp.mcp.client.sse_client', return_value=mock_sse), \
+         patch('car_mcp.mcp.client.ClientSession', return_value=mock_client_session):
+
+        client = MCPClient(encoding="json")
+        first = await client.process_query({"brand": "Toyota", "color": None})
+        second = await client.process_query({"brand": "Toyota"})
+
+        mock_session.call_tool.assert_called_once()
+        assert second is first
+        assert client.cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_version_notification_drops_stale_results(sample_car_dict, mock_response):
+    """Test that watched results are served locally until a new version is notified."""
+    mock_response.content[0].text = json.dumps({"cars": [sample_car_dict]})
+    mock_session = _versioned_session(mock_response, 1)
+
+    mock_sse = AsyncMock()
+    mock_sse.__aenter__.return_value = ["stream"]
+    mock_client_session = AsyncMock()
+    mock_client_session.__aenter__.return_value = mock_session
+
+    with patch('car_mcp.mcp.client.sse_client', return_value=mock_sse) as sse, \
+         patch('car_mcp.mcp.client.ClientSession', return_value=mock_client_session):
+
+        client = MCPClient(encoding="json")
+        client._watching = True
+        client._set_version(1)
+        await client.process_query({"brand": "Toyota"})
+        await client.process_query({"brand": "Toyota"})
+
+        assert sse.call_count == 1
+
+        client._set_version(2)
+
+        assert len(client.cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_rejected_call_raises(mock_response):
+    """Test that a call turned away by the server's admission control raises Rejected."""
+    mock_response.isError = True
+    mock_response.content[0].text = (
+        "Error executing tool fetch_data: too_expensive: the search would return about "
+        "90000 cars (limit 10000); add filters to narrow it down"
+    )
+    mock_session = _versioned_session(mock_response, 3)
+
+    mock_sse = AsyncMock()
+    mock_sse.__aenter__.return_value = ["stream"]
+    mock_client_session = AsyncMock()
+    mock_client_session.__aenter__.return_value = mock_session
+
+    with patch('car_mcp.mcp.client.sse_client', return_value=mock_sse), \
+         patch('car_mcp.mcp.client.ClientSession', return_value=mock_client_session):
+
+        client = MCPClient()
+        with pytest.raises(Rejected) as rejected:
+            await client.process_query({})
+
+        assert rejected.value.reason == "too_expensive"
+        assert len(client.cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_watcher_is_not_trusted_on_streamable_http(sample_car_dict, mock_response):
+    """Test that the stateless transport never serves cached results without a version check."""
+    mock_response.content[0].text = json.dumps({"cars": [sample_car_dict]})
+    mock_session = _versioned_session(mock_response, 4)
+
+    mock_http = AsyncMock()
+    mock_http.__aenter__.return_value = ["read", "write", "session_id"]
+    mock_client_session = AsyncMock()
+    mock_client_session.__aenter__.return_value = mock_session
+
+    with patch('car_mcp.mcp.client.streamablehttp_client', return_value=mock_http) as http, \
+         patch('car_mcp.mcp.client.ClientSession', return_value=mock_client_session):
+
+        client = MCPClient(encoding="json", transport="streamable-http")
+        client.start_watching()
+        await client.process_query({"brand": "Toyota"})
+        await client.process_query({"brand": "Toyota"})
+
+        assert client._watcher is None
+        assert http.call_count == 2
+        assert mock_session.read_resource.call_count == 2
+        mock_session.call_tool.assert_called_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("push", [True, False])
+async def test_watcher_trusts_only_pushing_servers(mock_response, push):
+    """Test that the SSE watcher serves from cache only if the server will push updates."""
+    mock_response.content[0].text = json.dumps({"version": 5, "push": push})
+    mock_session = _versioned_session(mock_response, 5)
+    initialized = MagicMock()
+    initialized.capabilities.resources.subscribe = False
+    mock_session.initialize = AsyncMock(return_value=initialized)
+
+    mock_sse = AsyncMock()
+    mock_sse.__aenter__.return_value = ["stream"]
+    mock_client_session = AsyncMock()
+    mock_client_session.__aenter__.return_value = mock_session
+
+    with patch('car_mcp.mcp.client.sse_client', return_value=mock_sse), \
+         patch('car_mcp.mcp.client.ClientSession', return_value=mock_client_session):
+
+        client = MCPClient(encoding="json", transport="sse")
+        client.start_watching()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        watching = client._watching
+        client.stop_watching()
+
+        mock_session.call_tool.assert_called_once_with("watch_inventory", arguments={})
+        mock_session.subscribe_resource.assert_not_called()
+        assert watching is push
@@ -4,14 +4,38 @@ Test module for MCP server functionality.
 This module contains tests for the MCP server endpoints and data fetching capabilities.
 """
 
+import asyncio
+import json
+import threading
 from unittest.mock import Mock, patch
 
+import pandas as pd
 import pytest
 
-from car_mcp.mcp.server import fetch_data
+from car_mcp.database.db_manager import DatabaseManager, QueryTimeout
+from car_mcp.mcp.admission import AdmissionController, Rejected
+from car_mcp.mcp.server import (
+    _client_id,
+    fetch_best_deals,
+    fetch_data,
+    fetch_facets,
+    fetch_many,
+    inventory_version,
+    ready,
+    similar_cars,
+    watch_inventory,
+)
 from car_mcp.models.car import Car
 
 
+@pytest.fixture(autouse=True)
+def admission():
+    """Fixture giving every test a fresh admission controller without cost checks."""
+    controller = AdmissionController(max_rows=0)
+    with patch("car_mcp.mcp.server._admission", controller):
+        yield controller
+
+
 @pytest.fixture
 def sample_car():
     """Fixture that returns a sample Car object for testing."""
@@ -35,7 +59,7 @@ def sample_car():
 @pytest.mark.asyncio
 async def test_fetch_data_with_empty_filters():
     """Test fetch_data function with empty filters."""
-    with patch("car_mcp.mcp.server.DatabaseManager") as mock_db:
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
         mock_instance = Mock()
         mock_db.return_value = mock_instance
         mock_instance.search.return_value = []
@@ -43,7 +67,7 @@ async def test_fetch_data_with_empty_filters():
         result = await fetch_data({})
 
         assert result == {"cars": []}
-        mock_instance.search.assert_called_once_with({})
+        mock_instance.search.assert_called_once_with({}, limit=None)
 
 
 @pytest.mark.asyncio
@@ -51,7 +75,7 @@ async def test_fetch_data_with_filters(sample_car):
     """Test fetch_data function with specific filters."""
     test_filters = {"brand": "Toyota", "year_min": 2022}
 
-    with patch("car_mcp.mcp.server.DatabaseManager") as mock_db:
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
         mock_instance = Mock()
         mock_db.return_value = mock_instance
         mock_instance.search.return_value = [sample_car]
@@ -59,13 +83,13 @@ async def test_fetch_data_with_filters(sample_car):
         result = await fetch_data(test_filters)
 
         assert result == {"cars": [sample_car.to_dict()]}
-        mock_instance.search.assert_called_once_with(test_filters)
+        mock_instance.search.assert_called_once_with(test_filters, limit=None)
 
 
 @pytest.mark.asyncio
 async def test_fetch_data_with_none_filters():
     """Test fetch_data function with None filters."""
-    with patch("car_mcp.mcp.server.DatabaseManager") as mock_db:
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
         mock_instance = Mock()
         mock_db.return_value = mock_instance
         mock_instance.search.return_value = []
@@ -73,4 +97,314 @@ async def test_fetch_data_with_none_filters():
         result = await fetch_data(None)
 
         assert result == {"cars": []}
-        mock_instance.search.assert_called_once_with({})
+        mock_instance.search.assert_called_once_with({}, limit=None)
+
+
+@pytest.mark.asyncio
+async def test_fetch_data_with_columnar_encoding(sample_car):
+    """Test fetch_data function returning the compact columnar encoding."""
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
+        mock_instance = Mock()
+        mock_db.return_value = mock_instance
+        mock_instance.search.return_value = [sample_car, sample_car]
+
+        result = await fetch_data({"brand": "Toyota"}, encoding="columnar")
+        data = json.loads(result)
+
+        assert data["encoding"] == "columnar"
+        assert data["cars"]["count"] == 2
+        assert data["cars"]["dictionaries"]["brand"] == ["Toyota"]
+        assert data["cars"]["columns"]["brand"] == [0, 0]
+
+
+@pytest.mark.asyncio
+async def test_ready_when_database_has_cars(tmp_path, sample_car):
+    """Test the readiness probe when the car table has rows."""
+    db_url = f"sqlite:///{tmp_path / 'cars.db'}"
+    DatabaseManager(db_url, use_summaries=False).insert(pd.DataFrame([sample_car.to_dict()]))
+
+    with patch("car_mcp.config.DB_URL", db_url), patch("car_mcp.config.DB_PARTITIONS", 1):
+        response = await ready(Mock())
+
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_ready_when_database_is_empty(tmp_path):
+    """Test the readiness probe when the car table has no rows."""
+    db_url = f"sqlite:///{tmp_path / 'cars.db'}"
+    DatabaseManager(db_url, use_summaries=False)
+
+    with patch("car_mcp.config.DB_URL", db_url), patch("car_mcp.config.DB_PARTITIONS", 1):
+        response = await ready(Mock())
+
+    assert response.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_ready_does_not_create_missing_database(tmp_path):
+    """Test that probing a missing database fails without creating the file."""
+    path = tmp_path / "missing.db"
+
+    with patch("car_mcp.config.DB_URL", f"sqlite:///{path}"), \
+         patch("car_mcp.config.DB_PARTITIONS", 1):
+        response = await ready(Mock())
+
+    assert response.status_code == 503
+    assert not path.exists()
+
+
+@pytest.mark.asyncio
+async def test_fetch_facets():
+    """Test fetch_facets function delegating to the database manager."""
+    facets = {"source": "summary", "buckets": [{"brand": "Toyota", "count": 3}]}
+
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
+        mock_db.return_value.facets.return_value = facets
+
+        result = await fetch_facets({"brand": "Toyota"})
+
+        assert result == facets
+        mock_db.return_value.facets.assert_called_once_with({"brand": "Toyota"})
+
+
+@pytest.mark.asyncio
+async def test_fetch_data_with_relaxation(sample_car):
+    """Test fetch_data function relaxing the filters when asked to."""
+    test_filters = {"brand": "Toyota", "color": "Rosa"}
+
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
+        mock_instance = Mock()
+        mock_db.return_value = mock_instance
+        mock_instance.search_relaxed.return_value = ([sample_car], ["color"])
+
+        result = await fetch_data(test_filters, relax=True)
+
+        assert result == {"cars": [sample_car.to_dict()], "relaxed": ["color"]}
+        mock_instance.search_relaxed.assert_called_once_with(test_filters, limit=None)
+        mock_instance.search.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_deduplicates_cars(sample_car):
+    """Test fetch_many sending shared cars once and keying ids by request index."""
+    sample_car.id = 1
+    other_car = Car(**{**sample_car.to_dict(), "id": 2, "brand": "Fiat"})
+
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
+        mock_db.return_value.search_many.return_value = {
+            0: [sample_car, other_car],
+            1: [sample_car],
+        }
+
+        result = await fetch_many([{"price_max": 150000}, {"brand": "Toyota"}])
+
+        assert result == {
+            "cars": [sample_car.to_dict(), other_car.to_dict()],
+            "results": {"0": [1, 2], "1": [1]},
+        }
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_normalises_none_filter_sets(sample_car):
+    """Test that null filter sets are searched as empty ones."""
+    sample_car.id = 1
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
+        mock_db.return_value.search_many.return_value = {0: [sample_car], 1: [sample_car]}
+
+        await fetch_many([None, {"brand": "Toyota"}])
+
+        mock_db.return_value.search_many.assert_called_once_with([{}, {"brand": "Toyota"}])
+
+
+@pytest.mark.asyncio
+async def test_similar_cars(sample_car):
+    """Test similar_cars returning the neighbours with their distances, closest first."""
+    sample_car.id = 7
+    index = Mock()
+    index.nearest.return_value = [(7, 0.5)]
+
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db, patch(
+        "car_mcp.mcp.server._get_similarity_index", return_value=index
+    ):
+        mock_db.return_value.get_cars.return_value = [sample_car]
+
+        result = await similar_cars(3, k=1)
+
+        assert result == {"cars": [sample_car.to_dict()], "distances": [0.5]}
+        index.refresh.assert_called_once_with(mock_db.return_value)
+        index.nearest.assert_called_once_with(3, 1)
+
+
+@pytest.mark.asyncio
+async def test_similar_cars_unknown_car():
+    """Test similar_cars with a car id that does not exist."""
+    index = Mock()
+    index.nearest.side_effect = KeyError(3)
+
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db, patch(
+        "car_mcp.mcp.server._get_similarity_index", return_value=index
+    ):
+        mock_db.return_value.get_cars.return_value = []
+
+        assert await similar_cars(3) == {"cars": [], "distances": []}
+
+
+@pytest.mark.asyncio
+async def test_fetch_best_deals(sample_car):
+    """Test fetch_best_deals returning the ranked cars with their scores."""
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
+        mock_db.return_value.search_ranked.return_value = [(sample_car, 120000.0)]
+
+        result = await fetch_best_deals({"brand": "Toyota"}, k=1, ranking="cheapest")
+
+        assert result == {"cars": [sample_car.to_dict()], "scores": [120000.0]}
+        mock_db.return_value.search_ranked.assert_called_once_with(
+            {"brand": "Toyota"}, 1, "cheapest", None
+        )
+
+
+@pytest.mark.asyncio
+async def test_fetch_best_deals_rejects_negative_k(admission):
+    """Test that a negative k is rejected before it can bypass the cost check."""
+    admission.max_rows = 10
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
+        with pytest.raises(ValueError):
+            await fetch_best_deals({}, k=-1)
+
+        mock_db.return_value.search_ranked.assert_not_called()
+
+
+def test_inventory_version_resource():
+    """Test that the inventory version resource reports the database version."""
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
+        mock_db.return_value.version.return_value = 4
+
+        assert json.loads(inventory_version()) == {"version": 4}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("push", [True, False])
+async def test_watch_inventory_registers_only_when_push_is_possible(push):
+    """Test that sessions are registered for notifications only on a pushing transport."""
+    ctx = Mock()
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db, \
+         patch("car_mcp.mcp.server._push_notifications", push), \
+         patch("car_mcp.mcp.server._subscribers", set()) as subscribers, \
+         patch("car_mcp.mcp.server._watch_version", Mock()), \
+         patch("car_mcp.mcp.server._version_watcher", None), \
+         patch("car_mcp.mcp.server.asyncio.get_running_loop") as loop:
+        mock_db.return_value.version.return_value = 2
+
+        result = await watch_inventory(ctx)
+
+        assert result == {"version": 2, "push": push}
+        assert (ctx.session in subscribers) is push
+        assert loop.return_value.create_task.called is push
+
+
+@pytest.mark.asyncio
+async def test_fetch_data_limits_expensive_search(admission, sample_car):
+    """Test that a search estimated too expensive is limited and flagged as truncated."""
+    admission.max_rows = 1
+
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
+        mock_db.return_value.estimate_rows.return_value = 500
+        mock_db.return_value.search.return_value = [sample_car]
+
+        result = await fetch_data({})
+
+        assert result == {"cars": [sample_car.to_dict()], "truncated": True}
+        mock_db.return_value.search.assert_called_once_with({}, limit=1)
+        assert admission.counters["limited_cost"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_data_rejects_expensive_search(admission):
+    """Test that the reject policy turns expensive searches away before running them."""
+    admission.max_rows = 1
+    admission.policy = "reject"
+
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
+        mock_db.return_value.estimate_rows.return_value = 500
+
+        with pytest.raises(Rejected) as rejected:
+            await fetch_data({})
+
+        assert rejected.value.reason == "too_expensive"
+        mock_db.return_value.search.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fetch_data_estimates_string_range_filters(admission, tmp_path, sample_car):
+    """Test that range bounds sent as strings are estimated, or run unestimated, not crash."""
+    admission.max_rows = 1
+    db_url = f"sqlite:///{tmp_path / 'cars.db'}"
+    car = sample_car.to_dict()
+    DatabaseManager(db_url, use_summaries=False).insert(pd.DataFrame([car, car]))
+
+    with patch("car_mcp.config.DB_URL", db_url), patch("car_mcp.config.DB_PARTITIONS", 1):
+        limited = await fetch_data({"price_max": "150000", "year_min": "2019"}, relax=True)
+        unestimated = await fetch_data({"price_max": "cheap"})
+
+    assert limited["truncated"] is True
+    assert len(limited["cars"]) == 1
+    assert "truncated" not in unestimated
+
+
+@pytest.mark.parametrize(
+    "peer, expected", [("203.0.113.7", "203.0.113.7"), ("10.0.0.2", "alice")]
+)
+def test_client_id_header_only_trusted_from_proxies(peer, expected):
+    """Test that rate limits key on the peer unless a trusted proxy names the client."""
+    request = Mock(headers={"x-client-id": "alice"})
+    request.client.host = peer
+    context = Mock()
+    context.request_context.request = request
+
+    with patch("car_mcp.mcp.server.mcp.get_context", return_value=context), patch(
+        "car_mcp.config.MCP_TRUSTED_PROXIES", ["10.0.0.2"]
+    ):
+        assert _client_id() == expected
+
+
+@pytest.mark.asyncio
+async def test_fetch_data_counts_timeouts(admission):
+    """Test that a query interrupted by the call deadline is reported as a timeout."""
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
+        mock_db.return_value.search.side_effect = QueryTimeout("Query interrupted after 10.0s")
+
+        with pytest.raises(Rejected) as rejected:
+            await fetch_data({"brand": "Toyota"})
+
+        assert rejected.value.reason == "timeout"
+        assert admission.counters["timed_out"] == 1
+        assert admission.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_keeps_slot_until_thread_finishes(admission):
+    """Test that cancelling a tool call frees its slot only once its worker thread is done."""
+    admission.max_concurrent = 1
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_search(filters, limit=None):
+        started.set()
+        release.wait(5)
+        return []
+
+    with patch("car_mcp.database.partitioned.DatabaseManager") as mock_db:
+        mock_db.return_value.search.side_effect = slow_search
+        call = asyncio.ensure_future(fetch_data({}))
+        await asyncio.to_thread(started.wait, 5)
+
+        call.cancel()
+        await asyncio.sleep(0.05)
+        assert admission.stats()["in_flight"] == 1
+
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    assert admission.stats()["in_flight"] == 0
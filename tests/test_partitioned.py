@@ -0,0 +1,142 @@
+"""
+Test module for the partitioned catalog.
+
+This module contains tests for PartitionedCatalog, checking that fanned-out queries
+return the same cars as a single database holding the same data and that partitions
+whose brands cannot match are skipped.
+"""
+
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from car_mcp.database.db_manager import DatabaseManager
+from car_mcp.database.partitioned import PartitionedCatalog, partition_of, partition_urls
+from car_mcp.database.similarity import FEATURES
+from scripts.sample_data import sample_cars
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """Fixture that returns a 3-partition catalog and a single database with the same cars."""
+    cars = pd.DataFrame(sample_cars(300, with_ids=False))
+    catalog = PartitionedCatalog(f"sqlite:///{tmp_path / 'cars.db'}", partitions=3)
+    single = DatabaseManager(f"sqlite:///{tmp_path / 'single.db'}", use_summaries=False)
+    catalog.insert(cars)
+    single.insert(cars)
+    return catalog, single
+
+
+def _ids(cars):
+    return sorted(car.id for car in cars)
+
+
+def test_partition_urls():
+    """Test that partition files are named after the catalog file."""
+    assert partition_urls("sqlite:///data/cars.db", 2) == [
+        "sqlite:///data/cars.p0.db",
+        "sqlite:///data/cars.p1.db",
+    ]
+
+
+def test_cars_are_routed_by_brand(stores):
+    """Test that every partition only holds the brands hashed to it and ids are global."""
+    catalog, single = stores
+
+    for index, partition in enumerate(catalog.partitions):
+        assert {partition_of(brand, 3) for brand in partition.brands()} <= {index}
+    assert catalog.count() == 300
+    assert _ids(catalog.get_all_cars()) == _ids(single.get_all_cars())
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [{}, {"brand": "Toyota"}, {"brand": ["fiat", "Honda"], "price_max": 50000}, {"fuel": "Diesel"}],
+)
+def test_search_matches_single_database(stores, filters):
+    """Test that fanned-out searches return the same cars as a single database."""
+    catalog, single = stores
+
+    assert _ids(catalog.search(filters)) == _ids(single.search(filters))
+
+
+def test_search_many_matches_single_database(stores):
+    """Test that search_many results are keyed by filter set across partitions."""
+    catalog, single = stores
+    filters_list = [{"brand": "Toyota"}, {"price_max": 20000}, {"brand": "Tesla"}, None]
+
+    results = catalog.search_many(filters_list)
+    expected = single.search_many(filters_list)
+
+    assert {index: _ids(cars) for index, cars in results.items()} == {
+        index: _ids(cars) for index, cars in expected.items()
+    }
+
+
+def test_search_relaxed_matches_single_database(stores):
+    """Test that relaxation picks the closest candidate over every partition."""
+    catalog, single = stores
+    filters = {"brand": "Toyota", "price_min": 149990, "price_max": 149995}
+
+    cars, relaxed = catalog.search_relaxed(filters)
+    expected, expected_relaxed = single.search_relaxed(filters)
+
+    assert relaxed == expected_relaxed
+    assert _ids(cars) == _ids(expected)
+
+
+@pytest.mark.parametrize("ranking_name", ["cheapest", "best_value"])
+def test_search_ranked_merges_partition_top_k(stores, ranking_name):
+    """Test that the k-way merge of partition top-k lists equals the global top-k."""
+    catalog, single = stores
+
+    ranked = catalog.search_ranked({}, k=7, ranking_name=ranking_name)
+    expected = single.search_ranked({}, k=7, ranking_name=ranking_name)
+
+    assert [car.id for car, _ in ranked] == [car.id for car, _ in expected]
+
+
+def test_fetch_columns_in_id_order(stores):
+    """Test that column reads are merged back in catalog-wide id order."""
+    catalog, single = stores
+    columns = ("id",) + FEATURES
+
+    assert catalog.fetch_columns(columns, after_id=250) == single.fetch_columns(
+        columns, after_id=250
+    )
+
+
+def test_pinned_brand_prunes_partitions(stores):
+    """Test that a brand filter only queries the partition holding that brand."""
+    catalog, _ = stores
+    holder = catalog.partitions[partition_of("Toyota", 3)]
+
+    with patch.object(DatabaseManager, "search", autospec=True, return_value=[]) as search:
+        catalog.search({"brand": "Toyota"})
+
+    assert [call.args[0] for call in search.call_args_list] == [holder]
+
+
+def test_partial_brand_is_not_pruned_away(stores):
+    """Test that substring brand filters still reach the partition of the full brand."""
+    catalog, single = stores
+
+    assert _ids(catalog.search({"brand": "volks"})) == _ids(single.search({"brand": "volks"}))
+    assert catalog.search({"brand": "volks"})
+
+
+def test_limit_and_estimate_match_single_database(stores):
+    """Test that limits apply to the merged result and estimates add up across partitions."""
+    catalog, single = stores
+
+    assert len(catalog.search({}, limit=7)) == 7
+    assert len(catalog.search_relaxed({"brand": "Toyota"}, limit=2)[0]) == 2
+    for filters in ({}, {"brand": "Toyota"}, {"fuel": "Flex", "price_max": 80000}):
+        assert catalog.estimate_rows(filters) == single.estimate_rows(filters)
+    filter_sets = [{}, {"brand": "Toyota"}, {"fuel": "Flex", "price_max": 80000}]
+    assert catalog.estimate_many(filter_sets) == single.estimate_many(filter_sets)
+    assert catalog.estimate_many([{"price_max": "60000"}, {"year_min": "new"}]) == [
+        single.estimate_rows({"price_max": 60000}),
+        None,
+    ]
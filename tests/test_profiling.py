@@ -0,0 +1,139 @@
+"""
+Test module for on-demand profiling.
+
+This module contains tests for profiling sessions around fetch_data, checking the
+phase timings and the files written when a session ends.
+"""
+
+import json
+import pstats
+import threading
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from car_mcp.database.db_manager import DatabaseManager
+from car_mcp.database.partitioned import PartitionedCatalog
+from car_mcp.mcp import profiling
+from car_mcp.mcp.server import fetch_data, profile_server
+from scripts.sample_data import sample_cars
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    """Fixture that returns a manager over a temporary database with sample cars."""
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'cars.db'}", use_summaries=False)
+    manager.insert(pd.DataFrame(sample_cars(200, with_ids=False)))
+    return manager
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path):
+    """Fixture that writes profiles to a temporary directory and ends any session."""
+    with patch("car_mcp.config.MCP_PROFILE_DIR", str(tmp_path / "profiles")):
+        yield tmp_path / "profiles"
+        profiling.stop()
+
+
+@pytest.mark.asyncio
+async def test_session_stops_after_calls(db_manager, profile_dir):
+    """Test that a session profiles N calls, then writes pstats, stacks and phases."""
+    with patch("car_mcp.database.partitioned.DatabaseManager", return_value=db_manager):
+        await profile_server("start", calls=2)
+
+        profiled = await fetch_data({"brand": "Toyota"})
+        await fetch_data({})
+        unprofiled = await fetch_data({"brand": "Toyota"})
+
+    assert profiled == unprofiled
+    assert profiling.status() == {"active": False}
+
+    files = sorted(path.suffix for path in profile_dir.iterdir())
+    assert files == [".collapsed", ".json", ".pstats"]
+
+    report = json.loads(next(profile_dir.glob("*.json")).read_text())
+    assert report["calls"] == 2
+    assert set(report["phases"]) == {"total", "query", "hydration", "to_dict", "encoding"}
+    assert all(record["query"] > 0 for record in report["records"])
+
+    stats = pstats.Stats(str(next(profile_dir.glob("*.pstats"))))
+    assert any(function == "search" for _, _, function in stats.stats)
+
+
+@pytest.mark.asyncio
+async def test_stop_reports_summary(db_manager):
+    """Test stopping a time-limited session early."""
+    with patch("car_mcp.database.partitioned.DatabaseManager", return_value=db_manager):
+        assert (await profile_server("start", seconds=60))["active"] is True
+        await fetch_data({}, encoding="columnar")
+
+        report = await profile_server("stop")
+
+    assert report["calls"] == 1
+    assert report["phases"]["encoding"]["total_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_profiler_conflict_is_reported(db_manager):
+    """Test that a call is still served and timed when cProfile cannot be enabled."""
+    conflict = ValueError("Another profiling tool is already active")
+    with patch("car_mcp.database.partitioned.DatabaseManager", return_value=db_manager), \
+         patch("cProfile.Profile.enable", side_effect=conflict):
+        await profile_server("start", calls=5)
+        result = await fetch_data({"brand": "Toyota"})
+        status = await profile_server("status")
+
+        report = await profile_server("stop")
+
+    assert "cars" in result
+    assert status["profile_error"] == "Another profiling tool is already active"
+    assert report["calls"] == 1
+    assert report["profile_error"] == "Another profiling tool is already active"
+
+
+def test_concurrent_calls_do_not_add_to_profiled_call(db_manager, tmp_path):
+    """Test that only the profiled call's thread and its partition queries are timed."""
+    catalog = PartitionedCatalog(f"sqlite:///{tmp_path / 'parts.db'}", partitions=2)
+    catalog.insert(pd.DataFrame(sample_cars(50, with_ids=False)))
+    profiling.start(calls=1)
+    session = profiling._session
+    claimed, other_done = threading.Event(), threading.Event()
+
+    def profiled_call():
+        with profiling.profiled():
+            claimed.set()
+            other_done.wait(5)
+            with profiling.phase("search"):
+                catalog.search({})
+
+    def other_call():
+        claimed.wait(5)
+        with profiling.profiled() as profiling_call:
+            assert profiling_call is False
+            with profiling.phase("to_dict"):
+                db_manager.search({})
+        other_done.set()
+
+    threads = [threading.Thread(target=profiled_call), threading.Thread(target=other_call)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    [record] = session.records
+    assert record["to_dict"] == 0
+    assert 0 < record["query"] <= record["total"]
+
+
+@pytest.mark.asyncio
+async def test_invalid_requests():
+    """Test that sessions need a limit and cannot overlap."""
+    with pytest.raises(ValueError):
+        profiling.start()
+
+    profiling.start(calls=1)
+    with pytest.raises(ValueError):
+        profiling.start(calls=1)
+    with pytest.raises(ValueError):
+        await profile_server("restart")
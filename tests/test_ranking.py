@@ -0,0 +1,125 @@
+"""
+Test module for the best deal ranking.
+
+This module contains tests for the ranked search, checking that the SQL top-k and
+the in-memory heap selection agree and that 'cheapest' is served by the price index.
+"""
+
+import pandas as pd
+import pytest
+from sqlalchemy import select, text
+
+from car_mcp.database import ranking
+from car_mcp.database.db_manager import DatabaseManager
+from car_mcp.models.car import Car
+
+
+def _car(brand, price, year=2020, mileage=0.0, air_conditioning=True):
+    return {
+        "brand": brand,
+        "model": f"{brand} Model",
+        "year": year,
+        "motorization": 1.6,
+        "fuel": "Flex",
+        "color": "Preto",
+        "mileage": mileage,
+        "doors": 4,
+        "transmission": "Manual",
+        "price": price,
+        "air_conditioning": air_conditioning,
+        "electric_steering": True,
+        "status": "Novo" if mileage == 0 else "Usado",
+    }
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    """Fixture that returns a manager over a small temporary database."""
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'cars.db'}", use_summaries=False)
+    manager.insert(
+        pd.DataFrame(
+            [
+                _car("Toyota", 60000.0, year=2022),
+                _car("Toyota", 55000.0, year=2015, mileage=120000.0),
+                _car("Fiat", 40000.0, year=2019, mileage=30000.0, air_conditioning=False),
+                _car("Fiat", 40000.0, year=2021),
+                _car("Honda", 90000.0, year=2024),
+            ]
+        )
+    )
+    return manager
+
+
+def test_cheapest(db_manager):
+    """Test that the cheapest ranking orders by price, breaking ties by id."""
+    ranked = db_manager.search_ranked({}, k=3, ranking_name="cheapest")
+
+    assert [car.id for car, _ in ranked] == [3, 4, 2]
+    assert [score for _, score in ranked] == [40000.0, 40000.0, 55000.0]
+
+
+def test_best_value_with_filters(db_manager):
+    """Test that best_value weighs mileage, year and equipment besides the price."""
+    ranked = db_manager.search_ranked({"brand": "Toyota"}, k=1)
+
+    assert [car.id for car, _ in ranked] == [1]
+
+
+@pytest.mark.parametrize(
+    "ranking_name, weights",
+    [("best_value", None), ("cheapest", None), ("cheapest", {"mileage": 2.0, "year": 1.0})],
+)
+def test_heap_selection_matches_sql(db_manager, ranking_name, weights):
+    """Test that top_k over all cars returns what the SQL top-k returns."""
+    resolved = ranking.resolve_weights(ranking_name, weights)
+    expected = db_manager.search_ranked({}, k=3, ranking_name=ranking_name, weights=weights)
+
+    selected = ranking.top_k(db_manager.get_all_cars(), 3, resolved)
+
+    assert [car.id for car, _ in selected] == [car.id for car, _ in expected]
+    assert [score for _, score in selected] == pytest.approx([score for _, score in expected])
+
+
+def test_cheapest_uses_price_index(db_manager):
+    """Test that the cheapest ranking is read in price index order, without sorting."""
+    expression = ranking.score_expression(ranking.resolve_weights("cheapest"))
+    query = select(Car.id).order_by(expression, Car.id).limit(5)
+    sql = str(query.compile(compile_kwargs={"literal_binds": True}))
+
+    with db_manager._engine.connect() as connection:
+        plan = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_car_price" in details
+    assert "TEMP B-TREE FOR ORDER BY" not in details
+
+
+@pytest.mark.parametrize(
+    "ranking_name, weights",
+    [("fastest", None), ("best_value", {"color": 1.0}), ("cheapest", {"price": 0})],
+)
+def test_resolve_weights_rejects_invalid_rankings(ranking_name, weights):
+    """Test that unknown rankings, unknown terms and all-zero weights are rejected."""
+    with pytest.raises(ValueError):
+        ranking.resolve_weights(ranking_name, weights)
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_search_ranked_rejects_non_positive_k(db_manager, k):
+    """Test that k below 1 is rejected instead of becoming an unlimited LIMIT."""
+    with pytest.raises(ValueError):
+        db_manager.search_ranked({}, k=k)
+    with pytest.raises(ValueError):
+        ranking.top_k(db_manager.get_all_cars(), k, ranking.resolve_weights())
+
+
+def test_missing_values_score_as_zero(db_manager):
+    """Test that NULL mileage is scored as 0 in SQL, as in memory, not sorted first."""
+    with db_manager._engine.begin() as connection:
+        connection.execute(text("UPDATE car SET mileage = NULL WHERE id = 2"))
+
+    expected = db_manager.search_ranked({}, k=5)
+    selected = ranking.top_k(db_manager.get_all_cars(), 5, ranking.resolve_weights())
+
+    assert [car.id for car, _ in selected] == [car.id for car, _ in expected]
+    assert [score for _, score in selected] == pytest.approx([score for _, score in expected])
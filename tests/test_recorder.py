@@ -0,0 +1,164 @@
+"""
+Test module for conversation recording and replay.
+
+This module contains tests for the TurnRecorder log format, the recording of agent
+turns with their tool calls, and the replay of recorded sessions.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from car_mcp.agent.agent import VirtualAgent
+from car_mcp.agent.recorder import TurnRecorder, load_sessions
+from car_mcp.mcp.admission import Rejected
+from scripts.replay import StubLLM, replay
+
+
+def _turn(user_input, tool_calls=()):
+    return {
+        "user_input": user_input,
+        "current_filters": {},
+        "extraction": {"new_filters": {"brand": "Toyota"}, "need_more_info": False, "next_question": ""},
+        "tool_calls": list(tool_calls),
+        "timings": {"llm": 0.5, "mcp": 0.01, "turn": 0.51},
+    }
+
+
+def test_recorder_groups_turns_by_session(tmp_path):
+    """Test that recorded turns are read back per session and in order."""
+    path = str(tmp_path / "conversations.jsonl")
+    first = TurnRecorder(path, session="a")
+    second = TurnRecorder(path, session="b")
+
+    first.record(_turn("oi"))
+    second.record(_turn("olá"))
+    first.record(_turn("quero um Toyota"))
+
+    sessions = load_sessions(path)
+
+    assert sorted(sessions) == ["a", "b"]
+    assert [turn["turn"] for turn in sessions["a"]] == [1, 2]
+    assert sessions["a"][1]["user_input"] == "quero um Toyota"
+    assert sessions["a"][1]["offset"] >= sessions["a"][0]["offset"]
+
+
+@pytest.mark.asyncio
+async def test_agent_records_turn_with_tool_calls(tmp_path):
+    """Test that a conversation turn is logged with its extraction and tool calls."""
+    path = str(tmp_path / "conversations.jsonl")
+    extraction = {"new_filters": {"brand": "Toyota"}, "need_more_info": False, "next_question": ""}
+    arguments = {"filters": {"brand": "Toyota"}, "encoding": "json", "relax": True}
+    call = {"tool": "fetch_data", "arguments": arguments, "duration": 0.02, "cached": False}
+
+    with patch("car_mcp.agent.agent.MCPClient"), \
+         patch("car_mcp.agent.agent.config.AGENT_RECORD_PATH", path):
+        agent = VirtualAgent()
+
+    async def fetch(filters):
+        agent._on_tool_call(call)
+        return [], []
+
+    agent.client.process_query_relaxed = AsyncMock(side_effect=fetch)
+    agent.extract = AsyncMock(
+        return_value=(extraction["new_filters"], False, "")
+    )
+
+    with patch("builtins.input", MagicMock(side_effect=["um Toyota", "sair"])), \
+         patch("builtins.print"):
+        await agent.start_loop()
+
+    [turns] = load_sessions(path).values()
+
+    assert len(turns) == 1
+    assert turns[0]["user_input"] == "um Toyota"
+    assert turns[0]["extraction"] == extraction
+    assert turns[0]["tool_calls"] == [call]
+    assert turns[0]["timings"]["mcp"] == pytest.approx(0.02)
+
+
+@pytest.mark.asyncio
+async def test_replay_sends_uncached_tool_calls(tmp_path):
+    """Test that replay reissues only the tool calls that reached the server."""
+    path = str(tmp_path / "conversations.jsonl")
+    recorder = TurnRecorder(path)
+    fetched = {"tool": "fetch_data", "arguments": {"filters": {"brand": "Toyota"}},
+               "duration": 0.01, "cached": False}
+    cached = {**fetched, "cached": True}
+    recorder.record(_turn("um Toyota", [fetched]))
+    recorder.record(_turn("de novo", [cached]))
+
+    client = MagicMock()
+    client.call_tool = AsyncMock(return_value={"cars": []})
+
+    report = await replay(load_sessions(path), client, StubLLM(), speed=0, copies=3)
+
+    assert client.call_tool.await_count == 3
+    client.call_tool.assert_awaited_with("fetch_data", {"filters": {"brand": "Toyota"}})
+    assert report["llm"]["count"] == 6
+    assert report["turn"]["count"] == 6
+    assert report["mcp:fetch_data"]["count"] == 3
+    assert report["turn"]["p99_ms"] >= report["turn"]["p50_ms"]
+
+
+@pytest.mark.asyncio
+async def test_replay_counts_failed_tool_calls(tmp_path):
+    """Test that rejected and failed tool calls are counted per stage, not raised."""
+    path = str(tmp_path / "conversations.jsonl")
+    recorder = TurnRecorder(path)
+    fetched = {"tool": "fetch_data", "arguments": {"filters": {}},
+               "duration": 0.01, "cached": False}
+    recorder.record(_turn("qualquer carro", [fetched]))
+
+    client = MagicMock()
+    client.call_tool = AsyncMock(side_effect=[
+        Rejected("overloaded", "try again later"),
+        ConnectionError("server went away"),
+        {"cars": []},
+    ])
+
+    report = await replay(load_sessions(path), client, StubLLM(), speed=0, copies=3)
+
+    assert report["turn"]["count"] == 3
+    assert report["mcp:fetch_data"]["count"] == 1
+    assert report["mcp:fetch_data"]["rejected:overloaded"] == 1
+    assert report["mcp:fetch_data"]["errors"] == 1
+
+
+def test_offset_is_taken_at_turn_start(tmp_path):
+    """Test that a turn's offset is when it started, not when it was written."""
+    path = str(tmp_path / "conversations.jsonl")
+    recorder = TurnRecorder(path, session="a")
+
+    recorder.record(_turn("oi"), started=recorder._started + 2.5)
+
+    assert load_sessions(path)["a"][0]["offset"] == pytest.approx(2.5)
+
+
+@pytest.mark.asyncio
+async def test_live_replay_sends_freshly_extracted_filters(tmp_path):
+    """Test that a live LLM stage searches with its own filters, not the recorded calls."""
+    path = str(tmp_path / "conversations.jsonl")
+    recorder = TurnRecorder(path)
+    recorded = {"tool": "fetch_data", "arguments": {"filters": {"brand": "Toyota"}},
+                "duration": 0.01, "cached": False}
+    recorder.record(_turn("um carro", []))
+    recorder.record(_turn("da Fiat, a diesel", [recorded]))
+
+    class LiveLLM:
+        live = True
+        extractions = iter([({"brand": "Fiat"}, True, "Qual combustível?"),
+                            ({"fuel": "Diesel"}, False, "")])
+
+        async def extract(self, turn, current_filters):
+            return next(self.extractions)
+
+    client = MagicMock(encoding="json")
+    client.call_tool = AsyncMock(return_value={"cars": []})
+
+    await replay(load_sessions(path), client, LiveLLM(), speed=0)
+
+    client.call_tool.assert_awaited_once_with(
+        "fetch_data",
+        {"filters": {"brand": "Fiat", "fuel": "Diesel"}, "encoding": "json", "relax": True},
+    )
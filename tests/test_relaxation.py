@@ -0,0 +1,86 @@
+"""
+Test module for zero-result filter relaxation.
+
+This module contains tests for relaxation_candidates and DatabaseManager.search_relaxed.
+"""
+
+import pandas as pd
+import pytest
+
+from car_mcp.database.db_manager import DatabaseManager
+from car_mcp.database.relaxation import relaxation_candidates
+
+
+def _car(brand, price, year, color, transmission="Manual"):
+    return {
+        "brand": brand,
+        "model": f"{brand} Model",
+        "year": year,
+        "motorization": 1.6,
+        "fuel": "Flex",
+        "color": color,
+        "mileage": 0,
+        "doors": 4,
+        "transmission": transmission,
+        "price": price,
+        "air_conditioning": True,
+        "electric_steering": True,
+        "status": "Novo",
+    }
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    """Fixture that returns a manager over a small temporary database."""
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'cars.db'}")
+    manager.insert(
+        pd.DataFrame(
+            [
+                _car("Toyota", 54000.0, 2020, "Preto"),
+                _car("Toyota", 80000.0, 2022, "Branco", "Automática"),
+                _car("Fiat", 30000.0, 2018, "Prata"),
+            ]
+        )
+    )
+    return manager
+
+
+def test_relaxation_candidates_skip_unchanged_steps():
+    """Test that steps which do not touch any given filter are skipped."""
+    candidates = relaxation_candidates({"brand": "Toyota", "color": "Azul", "model": None})
+
+    assert candidates == [
+        ({"brand": "Toyota", "color": "Azul"}, []),
+        ({"brand": "Toyota"}, ["color"]),
+    ]
+
+
+def test_search_relaxed_exact_match(db_manager):
+    """Test that matching filters are returned without relaxation."""
+    cars, relaxed = db_manager.search_relaxed({"brand": "Toyota", "color": "Preto"})
+
+    assert [car.price for car in cars] == [54000.0]
+    assert relaxed == []
+
+
+def test_search_relaxed_widens_price(db_manager):
+    """Test that a price just below the cheapest car is widened first."""
+    cars, relaxed = db_manager.search_relaxed({"brand": "Toyota", "price_max": 50000})
+
+    assert [car.price for car in cars] == [54000.0]
+    assert relaxed == ["price_max"]
+
+
+def test_search_relaxed_drops_color_then_transmission(db_manager):
+    """Test that color and transmission are dropped when widening is not enough."""
+    cars, relaxed = db_manager.search_relaxed(
+        {"brand": "Fiat", "color": "Azul", "transmission": "CVT"}
+    )
+
+    assert [car.brand for car in cars] == ["Fiat"]
+    assert relaxed == ["color", "transmission"]
+
+
+def test_search_relaxed_no_match(db_manager):
+    """Test that nothing is returned when even the loosest candidate is empty."""
+    assert db_manager.search_relaxed({"brand": "Tesla"}) == ([], [])
@@ -0,0 +1,119 @@
+"""
+Test module for the inference scheduler.
+
+This module contains tests for the InferenceScheduler class, focusing on priority
+ordering, the in-flight limit and timeout handling.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from car_mcp.agent.scheduler import InferenceScheduler, Priority, get_scheduler
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_result_and_records_timing():
+    """Test that a submitted call returns its value and records its timing."""
+    scheduler = InferenceScheduler(max_in_flight=1, batch_window=0, timeout=5)
+
+    result = await scheduler.submit(lambda a, b: a + b, 1, 2)
+    await scheduler.close()
+
+    assert result == 3
+    assert len(scheduler.timings) == 1
+    assert scheduler.timings[0].priority == Priority.INTERACTIVE
+    assert scheduler.summary()["calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_run_before_background():
+    """Test that interactive requests within a batch window are dispatched first."""
+    scheduler = InferenceScheduler(max_in_flight=1, batch_window=0.05, timeout=5)
+    order = []
+
+    def record(name):
+        order.append(name)
+        return name
+
+    await asyncio.gather(
+        scheduler.submit(record, "background", priority=Priority.BACKGROUND),
+        scheduler.submit(record, "interactive", priority=Priority.INTERACTIVE),
+    )
+    await scheduler.close()
+
+    assert order == ["interactive", "background"]
+
+
+@pytest.mark.asyncio
+async def test_max_in_flight_is_respected():
+    """Test that no more than max_in_flight calls run at the same time."""
+    scheduler = InferenceScheduler(max_in_flight=2, batch_window=0, timeout=5)
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+
+    await asyncio.gather(*(scheduler.submit(work) for _ in range(6)))
+    await scheduler.close()
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_submit_timeout():
+    """Test that a call exceeding its timeout raises TimeoutError."""
+    scheduler = InferenceScheduler(max_in_flight=1, batch_window=0, timeout=5)
+
+    with pytest.raises(TimeoutError):
+        await scheduler.submit(time.sleep, 0.2, timeout=0.01)
+    await scheduler.close()
+
+    assert scheduler.summary()["timed_out"] == 1
+
+
+@pytest.mark.asyncio
+async def test_close_during_window_keeps_slot_and_request():
+    """Test that cancelling the dispatcher mid-window neither leaks a slot nor drops the request."""
+    scheduler = InferenceScheduler(max_in_flight=1, batch_window=5, timeout=5)
+
+    pending = asyncio.ensure_future(scheduler.submit(lambda: "done"))
+    await asyncio.sleep(0.01)
+    scheduler._dispatcher.cancel()
+    await asyncio.sleep(0)
+
+    scheduler._batch_window = 0
+    assert await scheduler.submit(lambda: "next") in ("done", "next")
+    assert await asyncio.wait_for(pending, 1) == "done"
+    await scheduler.close()
+
+    assert scheduler._slots._value == 1
+
+
+@pytest.mark.asyncio
+async def test_close_dispatches_requests_queued_by_other_callers():
+    """Test that closing while B is queued behind A still runs B."""
+    scheduler = InferenceScheduler(max_in_flight=1, batch_window=0, timeout=5)
+
+    first = asyncio.ensure_future(scheduler.submit(time.sleep, 0.1))
+    second = asyncio.ensure_future(scheduler.submit(lambda: "B"))
+    await asyncio.sleep(0.01)
+    await scheduler.close()
+
+    assert await asyncio.wait_for(second, 1) == "B"
+    await asyncio.wait_for(first, 1)
+
+
+def test_agents_share_one_scheduler():
+    """Test that the process-wide scheduler is returned on every call."""
+    assert get_scheduler() is get_scheduler()
@@ -0,0 +1,138 @@
+"""
+Test module for the similar car index.
+
+This module contains tests for SimilarityIndex against a small temporary SQLite
+database, including the incremental refresh after new cars are inserted.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from car_mcp.database.db_manager import DatabaseManager
+from car_mcp.database.similarity import FEATURES, SimilarityIndex
+
+
+def _car(brand, price, year=2020, mileage=0.0, fuel="Flex"):
+    return {
+        "brand": brand,
+        "model": f"{brand} Model",
+        "year": year,
+        "motorization": 1.6,
+        "fuel": fuel,
+        "color": "Preto",
+        "mileage": mileage,
+        "doors": 4,
+        "transmission": "Manual",
+        "price": price,
+        "air_conditioning": True,
+        "electric_steering": True,
+        "status": "Novo" if mileage == 0 else "Usado",
+    }
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    """Fixture that returns a manager over a small temporary database."""
+    manager = DatabaseManager(f"sqlite:///{tmp_path / 'cars.db'}", use_summaries=False)
+    manager.insert(
+        pd.DataFrame(
+            [
+                _car("Toyota", 50000.0),
+                _car("Toyota", 52000.0),
+                _car("Toyota", 120000.0, year=2024),
+                _car("Fiat", 51000.0, year=2012, mileage=90000.0, fuel="Diesel"),
+            ]
+        )
+    )
+    return manager
+
+
+def test_nearest_orders_by_distance(db_manager):
+    """Test that the closest cars come first and the reference car is excluded."""
+    index = SimilarityIndex(capacity=2)
+    index.refresh(db_manager)
+
+    neighbours = index.nearest(1, k=3)
+
+    assert [car_id for car_id, _ in neighbours] == [2, 3, 4]
+    distances = [distance for _, distance in neighbours]
+    assert distances == sorted(distances)
+
+
+def test_nearest_caps_k_and_rejects_unknown_cars(db_manager):
+    """Test k larger than the index and a car id that is not indexed."""
+    index = SimilarityIndex()
+    index.refresh(db_manager)
+
+    assert len(index.nearest(1, k=10)) == 3
+    with pytest.raises(KeyError):
+        index.nearest(99)
+
+
+def test_refresh_appends_inserted_cars(db_manager):
+    """Test that only the cars inserted since the last refresh are read."""
+    index = SimilarityIndex()
+    assert index.refresh(db_manager) == 4
+    assert index.refresh(db_manager) == 0
+
+    db_manager.insert(pd.DataFrame([_car("Fiat", 50500.0, year=2012, mileage=85000.0, fuel="Diesel")]))
+
+    assert index.refresh(db_manager) == 1
+    assert index.refresh(db_manager) == 0
+    assert index.size == 5
+    assert index.nearest(4, k=1)[0][0] == 5
+
+
+def test_refresh_reloads_a_new_snapshot(db_manager, tmp_path):
+    """Test that a database file swapped in place is reloaded, not appended to."""
+    index = SimilarityIndex()
+    index.refresh(db_manager)
+
+    replacement = DatabaseManager(f"sqlite:///{tmp_path / 'next.db'}", use_summaries=False)
+    replacement.insert(pd.DataFrame([_car("Honda", 60000.0 + 1000 * i) for i in range(4)]))
+    replacement.insert(pd.DataFrame([_car("Honda", 64000.0)]))
+    os.replace(tmp_path / "next.db", tmp_path / "cars.db")
+    snapshot = DatabaseManager(f"sqlite:///{tmp_path / 'cars.db'}", read_only=True)
+
+    # Same count plus one newer id as an insert would give, but a different file.
+    assert index.refresh(snapshot) == 5
+    assert index._vocabularies[0] == {"Honda": 0}
+
+
+def test_refresh_drops_deleted_cars(db_manager):
+    """Test that cars removed from the database leave the index on the next version."""
+    index = SimilarityIndex()
+    index.refresh(db_manager)
+
+    with db_manager._engine.begin() as connection:
+        connection.exec_driver_sql("DELETE FROM car WHERE id = 2")
+        connection.exec_driver_sql("PRAGMA user_version = 2")
+    index.refresh(db_manager)
+
+    assert [car_id for car_id, _ in index.nearest(1, k=3)] == [3, 4]
+
+
+def test_missing_values_take_the_feature_mean():
+    """Test that missing numeric values are filled with the feature mean, not NaN."""
+    index = SimilarityIndex()
+    columns = {name: [] for name in ("id",) + FEATURES}
+    for car_id, mileage in ((1, 0.0), (2, None), (3, 20000.0)):
+        car = _car("Toyota", 50000.0, mileage=0.0)
+        car["mileage"] = mileage
+        columns["id"].append(car_id)
+        for name in FEATURES:
+            columns[name].append(car[name])
+
+    index.append(columns)
+
+    neighbours = index.nearest(2, k=2)
+    assert all(np.isfinite(distance) for _, distance in neighbours)
+    assert neighbours[0][1] == pytest.approx(neighbours[1][1])
+
+
+def test_get_cars_keeps_requested_order(db_manager):
+    """Test that get_cars returns the cars in the order of the ids."""
+    assert [car.id for car in db_manager.get_cars([3, 1, 42, 2])] == [3, 1, 2]
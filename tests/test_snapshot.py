@@ -0,0 +1,92 @@
+"""
+Test module for snapshot ingestion and read-only database access.
+
+This module contains tests for publish_snapshot and DatabaseManager in read-only
+mode, focusing on readers switching to a newly published snapshot.
+"""
+
+import threading
+
+import pandas as pd
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from car_mcp.database.db_manager import DatabaseManager
+from car_mcp.database.snapshot import publish_snapshot
+
+
+def _cars(total, brand="Toyota"):
+    return pd.DataFrame(
+        [
+            {
+                "brand": brand,
+                "model": "Corolla",
+                "year": 2022,
+                "motorization": 2.0,
+                "fuel": "Flex",
+                "color": "Preto",
+                "mileage": 0,
+                "doors": 4,
+                "transmission": "Automática",
+                "price": 120000.0,
+                "air_conditioning": True,
+                "electric_steering": True,
+                "status": "Novo",
+            }
+        ]
+        * total
+    )
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    """Fixture that returns the URL of an empty database in a temporary directory."""
+    return f"sqlite:///{tmp_path / 'cars.db'}"
+
+
+def test_publish_snapshot_creates_database(db_url):
+    """Test that publishing into a missing database creates it with the new rows."""
+    publish_snapshot(_cars(3), db_url)
+
+    reader = DatabaseManager(db_url, read_only=True)
+
+    assert len(reader.get_all_cars()) == 3
+
+
+def test_reader_switches_to_new_snapshot(db_url):
+    """Test that read-only managers pick up a snapshot published after them."""
+    DatabaseManager(db_url).insert(_cars(2))
+    reader = DatabaseManager(db_url, read_only=True)
+    assert len(reader.search({"brand": "Toyota"})) == 2
+
+    publish_snapshot(_cars(1, brand="Fiat"), db_url)
+
+    assert len(reader.get_all_cars()) == 2
+    new_reader = DatabaseManager(db_url, read_only=True)
+    assert len(new_reader.get_all_cars()) == 3
+    assert len(new_reader.search({"brand": "Fiat"})) == 1
+
+
+def test_concurrent_publishers_keep_every_row(db_url):
+    """Test that snapshots published at the same time all end up in the database."""
+    DatabaseManager(db_url).insert(_cars(1))
+
+    publishers = [
+        threading.Thread(target=publish_snapshot, args=(_cars(2, brand=brand), db_url))
+        for brand in ("Fiat", "Honda", "Ford", "Jeep")
+    ]
+    for publisher in publishers:
+        publisher.start()
+    for publisher in publishers:
+        publisher.join()
+
+    assert DatabaseManager(db_url, read_only=True).count() == 9
+
+
+def test_read_only_manager_rejects_writes(db_url):
+    """Test that a read-only manager cannot modify the database."""
+    DatabaseManager(db_url).insert(_cars(1))
+    reader = DatabaseManager(db_url, read_only=True)
+
+    with pytest.raises(OperationalError):
+        reader.insert(_cars(1))
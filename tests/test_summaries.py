@@ -0,0 +1,126 @@
+"""
+Test module for the materialized summaries.
+
+This module contains tests for the summary tables maintained by DatabaseManager,
+checking that covered queries answered from them match the base table.
+"""
+
+import pandas as pd
+import pytest
+
+from car_mcp.database.db_manager import DatabaseManager
+
+
+def _car(brand, fuel, price, color="Preto"):
+    return {
+        "brand": brand,
+        "model": f"{brand} Model",
+        "year": 2020,
+        "motorization": 1.6,
+        "fuel": fuel,
+        "color": color,
+        "mileage": 0,
+        "doors": 4,
+        "transmission": "Manual",
+        "price": price,
+        "air_conditioning": True,
+        "electric_steering": True,
+        "status": "Novo",
+    }
+
+
+@pytest.fixture
+def managers(tmp_path):
+    """Fixture that returns a manager with summaries and one without, holding the same cars."""
+    cars = pd.DataFrame(
+        [_car("Toyota", "Flex", 10000.0 + i * 1000) for i in range(30)]
+        + [_car("Fiat", "Diesel", 20000.0 + i * 1000) for i in range(5)]
+    )
+    summarized = DatabaseManager(f"sqlite:///{tmp_path / 'summaries.db'}", use_summaries=True)
+    base = DatabaseManager(f"sqlite:///{tmp_path / 'base.db'}", use_summaries=False)
+    summarized.insert(cars)
+    base.insert(cars)
+    return summarized, base
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"brand": "Toyota", "price_max": 15000},
+        {"brand": "Fiat"},
+        {"brand": "Tesla"},
+        {"fuel": "Diesel", "price_min": 22000},
+        {"brand": "Toyota", "color": "Preto"},
+    ],
+)
+def test_search_matches_base_table(managers, filters):
+    """Test that searches return the same cars with and without summaries."""
+    summarized, base = managers
+
+    expected = sorted(car.id for car in base.search(filters))
+
+    assert sorted(car.id for car in summarized.search(filters)) == expected
+
+
+def test_facets_from_summaries(managers):
+    """Test that covered facet queries are answered from the summaries."""
+    summarized, base = managers
+
+    facets = summarized.facets({"brand": "Toyota"})
+
+    assert facets["source"] == "summary"
+    assert len(facets["buckets"]) == 1
+    bucket = facets["buckets"][0]
+    assert bucket["count"] == 30
+    assert bucket["min_price"] == 10000.0
+    assert bucket["max_price"] == 39000.0
+    assert bucket["cheapest_ids"][:3] == [1, 2, 3]
+    assert base.facets({"brand": "Toyota"})["buckets"] == facets["buckets"]
+
+
+def test_facets_fall_back_to_base_table(managers):
+    """Test that filters outside the summary key aggregate the car table."""
+    summarized, _ = managers
+
+    facets = summarized.facets({"brand": "Toyota", "price_max": 15000})
+
+    assert facets["source"] == "base"
+    assert facets["buckets"][0]["count"] == 6
+
+
+def test_insert_refreshes_summaries(managers):
+    """Test that inserting new cars updates the touched buckets."""
+    summarized, _ = managers
+
+    summarized.insert(pd.DataFrame([_car("Fiat", "Diesel", 1000.0)]))
+
+    bucket = summarized.facets({"brand": "Fiat"})["buckets"][0]
+    assert bucket["count"] == 6
+    assert bucket["min_price"] == 1000.0
+
+
+def test_summaries_rebuilt_after_unsummarized_insert(managers):
+    """Test that cars inserted without maintaining the summaries trigger a rebuild."""
+    summarized, _ = managers
+    writer = DatabaseManager(summarized._db_url, use_summaries=False)
+
+    writer.insert(pd.DataFrame([_car("Fiat", "Diesel", 1000.0)]))
+
+    facets = summarized.facets({"brand": "Fiat"})
+    assert facets["source"] == "summary"
+    assert facets["buckets"][0]["count"] == 6
+    assert facets["buckets"][0]["min_price"] == 1000.0
+
+
+def test_insert_refreshes_bucket_with_null_status(managers):
+    """Test that buckets with a NULL status are replaced, not duplicated, on insert."""
+    summarized, _ = managers
+
+    for price in (5000.0, 4000.0):
+        summarized.insert(pd.DataFrame([{**_car("Honda", "Flex", price), "status": None}]))
+
+    buckets = summarized.facets({"brand": "Honda"})["buckets"]
+    assert len(buckets) == 1
+    assert buckets[0]["status"] is None
+    assert buckets[0]["count"] == 2
+    assert buckets[0]["min_price"] == 4000.0